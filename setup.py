@@ -11,9 +11,6 @@ from distutils.command.clean import clean as clean_
 from distutils import log
 
 
-# Can't use six here
-IS_PY3 = sys.version_info.major == 3
-
 # Check Cython availability
 try:
     from Cython.Distutils import build_ext
@@ -60,14 +57,12 @@ install_requires = [
     'numpy>=1.6',
     'scipy>=0.9',
     'scikit-image>=0.10.0',
-    'requests>=2.3.0'
+    'requests>=2.3.0',
+    # concurrent.futures backport, an environment marker so wheels built
+    # on python 3 still require it on python 2
+    'futures>=2.0.0,<3.0.0; python_version < "3"',
 ]
 
-if IS_PY3:
-    pass
-else:
-    install_requires.append('futures>=2.0.0,<3.0.0')
-
 tests_require = [
     'nose>=1.3.0',
     'coverage>=3.7.0',
@@ -205,6 +200,8 @@ setup(
 
     extras_require={
         'testing': tests_require,
+        # asyncio storages, python 3.5+
+        'aio': ['aiobotocore>=1.0'],
     }
 
 )
@@ -18,6 +18,8 @@ from .main import cli
 from .commands.tileserver import tile_server_command
 from .commands.check import check_command
 from .commands.init import init_theme_root_command
+from .commands.tileexpire import tile_expire_command
+from .commands.tilesort import tile_sort_command
 
 if HAS_GDAL:
     from .commands.tilerenderer import tile_renderer_command
@@ -0,0 +1,88 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.cli.commands.tileexpire
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Retire expired tiles from storage and cache.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import re
+
+import click
+
+from stonemason.mason import Mason
+from stonemason.mason.theme import MemGallery, FileSystemCurator
+from stonemason.tilecache import MemTileCache
+from stonemason.service.renderman.expiry import retire_expired
+
+from ..main import cli
+from ..context import pass_context, Context
+from ..options import parse_levels
+
+
+@cli.command('tileexpire', short_help='retire tiles in a expiry list.')
+@click.option('-l', '--levels', default=None, type=str, callback=parse_levels,
+              help='''specify levels to retire (eg:5,6,7 or 2-10), expiry is
+              propagated up to the lowest level, by default, levels defined
+              in map theme is used.''')
+@click.option('--cache', default=None, type=str,
+              envvar='STONEMASON_CACHE',
+              help='''tile cache configuration, also retire tiles from the
+              cache when given.  Memcache hosts format is:
+              host1:port1;host2:port2.
+              Read from envvar STONEMASON_CACHE.''')
+@click.option('--dry-run', is_flag=True, default=False,
+              help='''only count expired metatiles, retire nothing.''')
+@click.argument('theme_name', type=str)
+@click.argument('schema_tag', type=str)
+@click.argument('expiry_file', type=click.Path(dir_okay=False, exists=True))
+@pass_context
+def tile_expire_command(ctx, theme_name, schema_tag, expiry_file,
+                        levels, cache, dry_run):
+    """Retire metatiles in a tile expiry list from storage and cache.
+
+    Expiry list contains a "z/x/y" tile coordinate per line, eg: generated
+    by "osm2pgsql --expire-tiles".  Expired metatiles and their parents are
+    deleted, render them again using "tilerenderer --expiry", or let the
+    tile server render them on demand.
+    """
+    assert isinstance(ctx, Context)
+
+    gallery = MemGallery()
+    loader = FileSystemCurator(ctx.gallery)
+    loader.add_to(gallery)
+
+    theme = gallery.get(theme_name)
+    if theme is None:
+        raise click.BadParameter('Theme "%s" not found.' % theme_name)
+
+    if cache is not None:
+        cache = MemTileCache(servers=re.split(r'[; ]+', cache))
+
+    mason = Mason(cache=cache)
+    mason.load_map_book_from_theme(theme)
+
+    try:
+        sheet = mason[theme_name][schema_tag]
+    except KeyError:
+        raise click.BadParameter('Schema "%s" not found.' % schema_tag)
+
+    pyramid = sheet.pyramid
+    if levels is None:
+        levels = pyramid.levels
+    levels = sorted(set(levels) & set(pyramid.levels))
+    if not levels:
+        raise click.BadParameter('No level to retire.')
+
+    with open(expiry_file, 'r') as fp:
+        count, retired = retire_expired(mason, theme_name, schema_tag, fp,
+                                        levels, dry_run=dry_run)
+
+    if ctx.verbose:
+        click.secho('Read %d expired tiles.' % count, fg='green')
+
+    click.secho('Retired MetaTiles : %d' % retired, fg='green')
@@ -12,38 +12,46 @@ __date__ = '3/31/15'
 
 import os
 import re
+import sys
 import multiprocessing
 
 import click
 
 from stonemason.util.timer import Timer, human_duration
-from stonemason.service.renderman import renderman, RenderScript, RenderStats
+from stonemason.util.postprocessing.downsample import RESAMPLE_METHODS
+from stonemason.service.renderman import renderman, RenderScript, \
+    RenderStats, ORDER_ROW_MAJOR, ORDER_HILBERT, SCHEDULE_SHARED, \
+    SCHEDULE_CONTIGUOUS
+from stonemason.service.renderman.renderlog import load_render_log, \
+    summarize_render_log
 
 from ..main import cli
 from ..context import pass_context, Context
+from ..options import parse_levels, parse_shard
 
 
-def parse_levels(ctx, param, value):
+def parse_autoscale(ctx, param, value):
     if value is None:
         return None
 
-    levels = []
-    for level in value.split(','):
-        if re.match(r'^\d+$', level):
-            levels.append(int(level))
-        elif re.match(r'^\d+-\d+$', level):
-            start, end = tuple(map(int, level.split('-')))
-            for l in range(start, end + 1):
-                levels.append(l)
-        else:
-            raise click.BadParameter('must be a list of integers or ranges.')
-    return sorted(set(levels))
+    match = re.match(r'^(\d+)-(\d+)$', value)
+    if match is None:
+        raise click.BadParameter('must be in "min-max" format.')
+    min_workers, max_workers = tuple(map(int, match.groups()))
+    if not 1 <= min_workers <= max_workers:
+        raise click.BadParameter('must be 1 <= min <= max.')
+    return min_workers, max_workers
 
 
 @cli.command('tilerenderer', short_help='single node tile renderer.')
 @click.option('-w', '--workers', default=0, type=click.IntRange(0, None),
               help='''number of render worker processes, default is number of
               cpu cores.''')
+@click.option('--uploaders', default=0, type=click.IntRange(0, None),
+              help='''number of background uploader threads per worker,
+              overlaps rendering with storing metatiles, useful for remote
+              storage like s3, default is 0, which stores metatiles
+              synchronously.''')
 @click.option('-l', '--levels', default=None, type=str, callback=parse_levels,
               help='''specify layers to render (eg:5,6,7 or 2-10), by default,
               levels defined in map theme is used.''')
@@ -51,9 +59,93 @@ def parse_levels(ctx, param, value):
               help='''area to render specified as a envelope [left,bottom,right,top],
               in geography coordinate system.  By default, envelope defined
               in map theme is used.''')
+@click.option('-g', '--geometry', default=None,
+              type=click.Path(dir_okay=False, exists=True),
+              help='''area to render specified as a WKT or GeoJSON file,
+              in geography coordinate system, overrides envelope.''')
+@click.option('--coverage', default=None, type=str,
+              help='''only render where source data exists, specified as a
+              feature storage connection string
+              (eg: raster+s3://bucket/prefix?indexname=index.shp), can be
+              combined with envelope or geometry.''')
 @click.option('-c', '--csv', default=None,
               type=click.Path(dir_okay=False, exists=True),
               help='''render according to given CSV tile index list.''')
+@click.option('--work-file', default=None,
+              type=click.Path(dir_okay=False, exists=True),
+              help='''render metatiles in given work file created by
+              tilesort command.''')
+@click.option('--expiry', default=None,
+              type=click.Path(dir_okay=False, exists=True),
+              help='''render tiles in given z/x/y tile expiry list and their
+              parents up to the lowest level.''')
+@click.option('--journal', default=None,
+              type=click.Path(file_okay=False),
+              help='''directory to keep render journal, rerun with same
+              journal to resume a interrupted render.''')
+@click.option('--retry-failed', is_flag=True, default=False,
+              help='''only render metatiles failed in journal.''')
+@click.option('--chunk-size', default=8, type=click.IntRange(1, None),
+              help='''number of metatiles sent to a render worker at once,
+              use larger values for cheap levels, default is 8.''')
+@click.option('--skip-existing', is_flag=True, default=False,
+              help='''list storage before rendering and skip metatiles
+              already exist, much faster than checking each metatile when
+              most of the pyramid is rendered.''')
+@click.option('--downsample', default=None,
+              type=click.Choice(sorted(RESAMPLE_METHODS)),
+              help='''only render the deepest level from source, build
+              upper levels by downsampling the level below using given
+              resampling filter.''')
+@click.option('--order', default=ORDER_ROW_MAJOR,
+              type=click.Choice([ORDER_ROW_MAJOR, ORDER_HILBERT]),
+              help='''order of metatiles in a level, "hilbert" renders
+              metatiles along the Hilbert curve so consecutive metatiles
+              are close to each other, default is "rowmajor".''')
+@click.option('--schedule', default=SCHEDULE_SHARED,
+              type=click.Choice([SCHEDULE_SHARED, SCHEDULE_CONTIGUOUS]),
+              help='''how metatiles are assigned to workers, "contiguous"
+              gives each worker its own contiguous part of every level to
+              keep data caches warm, default is "shared".''')
+@click.option('--shard', default=None, type=str, callback=parse_shard,
+              help='''only render one shard of the job (eg: 0/4, 1/4, 2/4
+              and 3/4 on four nodes), each level is split into contiguous
+              parts so nodes render disjoint areas without coordination.''')
+@click.option('--job-queue', default=None, type=click.Path(dir_okay=False),
+              help='''lease work units from a SQLite job queue on a shared
+              file system, so workers on many nodes render the job
+              together, work units of crashed workers are rendered again
+              after their leases expire.''')
+@click.option('--lease-timeout', default=600., type=float,
+              help='''seconds before a work unit leased from the job queue
+              is given to other workers if its renderer stops renewing the
+              lease, default is 600.''')
+@click.option('--worker-only', is_flag=True, default=False,
+              help='''only render work units in the job queue, let another
+              node walk the pyramid and fill the queue, by default the first
+              node started fills the queue.''')
+@click.option('--render-log', default=None, type=click.Path(dir_okay=False),
+              help='''write elapsed time of each render stage and size of
+              every metatile to given JSON Lines file, and print time
+              percentiles of each level after rendering.''')
+@click.option('--max-tasks', default=0, type=click.IntRange(0, None),
+              help='''replace a worker with a fresh process after it
+              rendered given number of metatiles, default is 0, which
+              keeps workers for the whole render.''')
+@click.option('--max-rss', default=0, type=click.IntRange(0, None),
+              help='''replace a worker with a fresh process after its
+              resident memory exceeds given megabytes, default is 0,
+              which means no limit.''')
+@click.option('--autoscale', default=None, type=str,
+              callback=parse_autoscale,
+              help='''adjust number of workers between given bounds (eg:
+              2-32) by cpu utilization, iowait and available memory,
+              starting from --workers, useful when rendering from or to
+              remote storage.''')
+@click.option('--status-interval', default=10., type=float,
+              help='''seconds between live status lines of throughput,
+              failures and ETA, 0 disables status lines, default is
+              10.''')
 @click.option('--log', default='render.log', type=click.Path(dir_okay=False),
               help='''Specify a file name for render error logs, default
               value is "render.log"''')
@@ -61,8 +153,13 @@ def parse_levels(ctx, param, value):
 @click.argument('schema_tag', type=str)
 @pass_context
 def tile_renderer_command(ctx, theme_name, schema_tag,
-                          levels, envelope,
-                          workers, csv, log):
+                          levels, envelope, geometry, coverage,
+                          workers, uploaders, csv, work_file, expiry,
+                          journal, retry_failed, chunk_size, skip_existing,
+                          downsample, order, schedule, shard, job_queue,
+                          lease_timeout, worker_only, render_log,
+                          status_interval, max_tasks, max_rss, autoscale,
+                          log):
     """Start a tile rendering process on this node.
 
     Specify name of the theme to render, then either use levels and envelope,
@@ -73,6 +170,25 @@ def tile_renderer_command(ctx, theme_name, schema_tag,
     if workers == 0:
         workers = multiprocessing.cpu_count()
 
+    if retry_failed and journal is None:
+        raise click.BadParameter('--retry-failed requires --journal.')
+
+    if shard is not None and downsample is not None:
+        # parents may be built from children rendered by other nodes
+        raise click.BadParameter('--shard can\'t be used with --downsample, '
+                                 'downsample upper levels in a separate '
+                                 'run with --skip-existing.')
+
+    if worker_only and job_queue is None:
+        raise click.BadParameter('--worker-only requires --job-queue.')
+
+    if shard is not None and job_queue is not None:
+        raise click.BadParameter('--shard can\'t be used with --job-queue.')
+
+    if geometry is not None:
+        with open(geometry, 'r') as fp:
+            geometry = fp.read()
+
     script = RenderScript(verbose=ctx.verbose,
                           debug=ctx.debug,
                           gallery=ctx.gallery,
@@ -80,15 +196,37 @@ def tile_renderer_command(ctx, theme_name, schema_tag,
                           schema_tag=schema_tag,
                           levels=levels,
                           envelope=envelope,
+                          geometry=geometry,
+                          coverage=coverage,
                           csv_file=csv,
+                          expiry=expiry,
+                          work_file=work_file,
                           workers=workers,
-                          log_file=log)
+                          log_file=log,
+                          journal=journal,
+                          retry_failed=retry_failed,
+                          chunk_size=chunk_size,
+                          skip_existing=skip_existing,
+                          downsample=downsample,
+                          uploaders=uploaders,
+                          order=order,
+                          schedule=schedule,
+                          shard=shard,
+                          job_queue=job_queue,
+                          lease_timeout=lease_timeout,
+                          worker_only=worker_only,
+                          render_log=render_log,
+                          status_interval=status_interval,
+                          max_tasks=max_tasks,
+                          max_rss=max_rss,
+                          autoscale=autoscale)
     timer = Timer()
     timer.tic()
     stat = renderman(script)
     timer.tac()
 
     click.secho('Succeeded MetaTiles : %d' % stat.rendered, fg='green')
+    click.secho('  Skipped MetaTiles : %d' % stat.skipped, fg='green')
     click.secho('   Failed MetaTiles : %d' % stat.failed, fg='green')
     click.secho('     Total CPU Time : %s' % human_duration(stat.total_time),
                 fg='green')
@@ -98,3 +236,36 @@ def tile_renderer_command(ctx, theme_name, schema_tag,
         click.secho('       Render Speed : %s/MetaTile' % \
                     human_duration(stat.total_time / stat.rendered),
                     fg='green')
+    if uploaders > 0:
+        click.secho(' Uploaded MetaTiles : %d' % stat.uploaded, fg='green')
+        click.secho('     Upload Retries : %d' % stat.upload_retries,
+                    fg='green')
+        click.secho('      Upload Failed : %d' % stat.upload_failed,
+                    fg='green')
+        click.secho('  Total Upload Time : %s' % \
+                    human_duration(stat.upload_time),
+                    fg='green')
+    if render_log is not None:
+        print_render_log_summary(render_log)
+    if stat.lost > 0:
+        click.secho('     Lost MetaTiles : %d' % stat.lost, fg='red')
+        # renderers crashed, let the caller know render is incomplete
+        sys.exit(1)
+
+
+def print_render_log_summary(filename):
+    summary = summarize_render_log(load_render_log(filename))
+    click.secho('      Level Timings : p50 / p90 / p99 / max', fg='green')
+    for level, level_summary in summary.items():
+        time = level_summary['time']
+        click.secho('           Level %2d : %s / %s / %s / %s, %d MetaTiles'
+                    % (level, human_duration(time['p50']),
+                       human_duration(time['p90']),
+                       human_duration(time['p99']),
+                       human_duration(time['max']),
+                       level_summary['count']),
+                    fg='green')
+        click.secho('                     %s' % ', '.join(
+            '%s %s' % (stage, human_duration(stage_summary['p50']))
+            for stage, stage_summary in level_summary['stages'].items()),
+                    fg='green')
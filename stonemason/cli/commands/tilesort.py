@@ -0,0 +1,80 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.cli.commands.tilesort
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Sort a huge tile list into a render work file.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import click
+
+from stonemason.mason import Mason
+from stonemason.mason.theme import MemGallery, FileSystemCurator
+from stonemason.util.timer import Timer, human_duration
+from stonemason.service.renderman.tilesort import sort_tile_list, \
+    FORMAT_TEXT, FORMAT_BINARY
+
+from ..main import cli
+from ..context import pass_context, Context
+from ..options import parse_levels
+
+
+@cli.command('tilesort', short_help='sort tile list into a work file.')
+@click.option('-l', '--levels', default=None, type=str, callback=parse_levels,
+              help='''specify levels to render (eg:5,6,7 or 2-10), by
+              default, only metatiles of listed tiles are rendered.''')
+@click.option('--format', 'fmt', default=None,
+              type=click.Choice([FORMAT_TEXT, FORMAT_BINARY]),
+              help='''format of the tile list, by default, files with
+              ".tiles" extension are binary.''')
+@click.option('--run-size', default=16000000, type=click.IntRange(1, None),
+              help='''number of metatiles sorted in memory at once, uses
+              8 bytes per metatile, default is 16000000.''')
+@click.option('--tmpdir', default=None, type=click.Path(file_okay=False),
+              help='''directory to keep temporary sorted runs.''')
+@click.argument('theme_name', type=str)
+@click.argument('schema_tag', type=str)
+@click.argument('tile_list', type=click.Path(dir_okay=False, exists=True))
+@click.argument('work_file', type=click.Path(dir_okay=False))
+@pass_context
+def tile_sort_command(ctx, theme_name, schema_tag, tile_list, work_file,
+                      levels, fmt, run_size, tmpdir):
+    """Expand a tile list into metatiles of the schema and write them into
+    a work file, sorted in Hilbert order without duplicates.
+
+    Render the work file using "tilerenderer --work-file".
+    """
+    assert isinstance(ctx, Context)
+
+    gallery = MemGallery()
+    loader = FileSystemCurator(ctx.gallery)
+    loader.add_to(gallery)
+
+    theme = gallery.get(theme_name)
+    if theme is None:
+        raise click.BadParameter('Theme "%s" not found.' % theme_name)
+
+    mason = Mason()
+    mason.load_map_book_from_theme(theme)
+
+    try:
+        sheet = mason[theme_name][schema_tag]
+    except KeyError:
+        raise click.BadParameter('Schema "%s" not found.' % schema_tag)
+
+    # renderer uses stride of the storage
+    stride = sheet._storage.stride
+
+    timer = Timer()
+    timer.tic()
+    work = sort_tile_list(tile_list, work_file, stride, levels=levels,
+                          fmt=fmt, run_size=run_size, tmpdir=tmpdir)
+    timer.tac()
+
+    click.secho('Sorted MetaTiles : %d' % len(work), fg='green')
+    click.secho('      Time Taken : %s' % human_duration(timer.get_time()),
+                fg='green')
@@ -0,0 +1,45 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.cli.options
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Option callbacks shared by commands.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import re
+
+import click
+
+
+def parse_levels(ctx, param, value):
+    if value is None:
+        return None
+
+    levels = []
+    for level in value.split(','):
+        if re.match(r'^\d+$', level):
+            levels.append(int(level))
+        elif re.match(r'^\d+-\d+$', level):
+            start, end = tuple(map(int, level.split('-')))
+            for l in range(start, end + 1):
+                levels.append(l)
+        else:
+            raise click.BadParameter('must be a list of integers or ranges.')
+    return sorted(set(levels))
+
+
+def parse_shard(ctx, param, value):
+    if value is None:
+        return None
+
+    match = re.match(r'^(\d+)/(\d+)$', value)
+    if match is None:
+        raise click.BadParameter('must be in "index/count" format.')
+    index, count = tuple(map(int, match.groups()))
+    if not 0 <= index < count:
+        raise click.BadParameter('index must be in [0, count).')
+    return index, count
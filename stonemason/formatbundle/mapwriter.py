@@ -14,6 +14,7 @@ import io
 from PIL import Image
 
 from stonemason.util.postprocessing.gridcrop import shave, grid_crop_into_data
+from stonemason.util.postprocessing.downsample import downsample
 from .exceptions import NoMatchingMapWriter
 from .tileformat import TileFormat
 from .maptype import MapType
@@ -83,6 +84,25 @@ class MapWriter(object):  # pragma: no cover
         """
         raise NotImplementedError
 
+    def downsample_map(self, pieces, size, resample='bilinear'):
+        """ Merge tile data of next zoom level and shrink them into a map
+        of given `size`, then serialize it into tile data.
+
+        :param pieces: A iterator of ``((left, top), data)``, ``(left, top)``
+            is pixel position of the tile data in a map twice of `size`.
+        :type pieces: iterator
+
+        :param size: Size of the result map, ``(width, height)``.
+        :type size: tuple
+
+        :param resample: Name of the resampling filter.
+        :type resample: str
+
+        :return: Serialized data.
+        :rtype: bytes
+        """
+        raise NotImplementedError
+
 
 class ImageMapWriter(MapWriter):
     """Write map image as tile data, use PIL/Pillow as ImageIO."""
@@ -116,6 +136,10 @@ class ImageMapWriter(MapWriter):
                                    format=self._format.format,
                                    parameters=self._format.parameters)
 
+    def downsample_map(self, pieces, size, resample='bilinear'):
+        image = downsample(pieces, size, resample=resample)
+        return self.crop_map(image, buffer=0)
+
 
 def find_writer(map_type, tile_format):
     # TODO: Figure out how to register map writers dynamically until we have more writers
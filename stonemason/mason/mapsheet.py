@@ -6,9 +6,10 @@ __date__ = '4/9/15'
 import time
 
 from stonemason.pyramid import MetaTileIndex, MetaTile, TileCluster
-from stonemason.pyramid.geo import TileMapSystem
+from stonemason.pyramid.geo import get_tile_map_system
 from stonemason.renderer import MasonRenderer, RenderContext
 from stonemason.storage.tilestorage import ClusterStorage, MetaTileStorageConcept
+from stonemason.util.timer import StageTimer
 
 
 class MapSheet(object):
@@ -41,8 +42,106 @@ class MapSheet(object):
     def get_tilecluster(self, meta_index):
         raise NotImplementedError
 
-    def render_metatile(self, meta_index):
-        raise NotImplementedError
+    def get_feature(self, meta_index):
+        tms = get_tile_map_system(self._pyramid)
+
+        context = RenderContext(
+            map_proj=tms.pyramid.projcs,
+            map_bbox=tms.calc_tile_envelope(meta_index),
+            map_size=(meta_index.stride * 256, meta_index.stride * 256),
+            meta_index=meta_index,
+        )
+
+        feature = self._renderer.render(context)
+        if feature is None:
+            return None
+
+        return feature
+
+    def make_metatile(self, meta_index, timer=None):
+        """Render and encode a metatile without storing it, returns ``None``
+        if renderer produced nothing.
+
+        Time of ``render``, ``encode`` and ``hash`` stages are added to
+        `timer` if a :class:`~stonemason.util.timer.StageTimer` is given."""
+        if timer is None:
+            timer = StageTimer()
+
+        with timer.stage('render'):
+            feature = self.get_feature(meta_index)
+        if feature is None:
+            return None
+
+        with timer.stage('encode'):
+            data = self._bundle.writer.crop_map(feature.data, buffer=0)
+
+        with timer.stage('hash'):
+            metatile = MetaTile(
+                index=meta_index,
+                mimetype=self._bundle.tile_format.mimetype,
+                mtime=time.time(),
+                data=data,
+            )
+
+        return metatile
+
+    def make_downsampled_metatile(self, meta_index, resample='bilinear',
+                                  timer=None):
+        """Build a metatile from its children in the storage without
+        storing it, returns ``None`` if none of the children exists.
+
+        Time of ``fetch``, ``downsample`` and ``hash`` stages are added to
+        `timer` if a :class:`~stonemason.util.timer.StageTimer` is given."""
+        if timer is None:
+            timer = StageTimer()
+
+        data = downsample_children(self._storage, self._bundle.writer,
+                                   meta_index, resample, timer)
+        if data is None:
+            return None
+
+        with timer.stage('hash'):
+            metatile = MetaTile(
+                index=meta_index,
+                mimetype=self._bundle.tile_format.mimetype,
+                mtime=time.time(),
+                data=data,
+            )
+
+        return metatile
+
+    def render_metatile(self, meta_index, check_existing=True):
+        if check_existing and self._storage.has(meta_index):
+            return True
+
+        metatile = self.make_metatile(meta_index)
+        if metatile is None:
+            return False
+
+        self._storage.put(metatile)
+
+        return True
+
+    def downsample_metatile(self, meta_index, resample='bilinear',
+                            check_existing=True):
+        if check_existing and self._storage.has(meta_index):
+            return True
+
+        metatile = self.make_downsampled_metatile(meta_index, resample)
+        if metatile is None:
+            return False
+
+        self._storage.put(metatile)
+
+        return True
+
+    def retire_metatile(self, meta_index):
+        """Delete a metatile from the storage so it can be rendered again."""
+        self._storage.retire(meta_index)
+
+    def retire_metatiles(self, meta_indexes):
+        """Delete metatiles from the storage using batched requests."""
+        self._storage.retire_multi(list(meta_indexes))
 
 
 class ClusterMapSheet(MapSheet):
@@ -83,43 +182,6 @@ class ClusterMapSheet(MapSheet):
 
         return cluster
 
-    def get_feature(self, meta_index):
-        tms = TileMapSystem(self._pyramid)
-
-        context = RenderContext(
-            map_proj=tms.pyramid.projcs,
-            map_bbox=tms.calc_tile_envelope(meta_index),
-            map_size=(meta_index.stride * 256, meta_index.stride * 256),
-            meta_index=meta_index,
-        )
-
-        feature = self._renderer.render(context)
-        if feature is None:
-            return None
-
-        return feature
-
-    def render_metatile(self, meta_index):
-        if self._storage.get(meta_index) is not None:
-            return True
-
-        feature = self.get_feature(meta_index)
-        if feature is None:
-            return False
-
-        data = self._bundle.writer.crop_map(feature.data, buffer=0)
-
-        metatile = MetaTile(
-            index=meta_index,
-            mimetype=self._bundle.tile_format.mimetype,
-            mtime=time.time(),
-            data=data,
-        )
-
-        self._storage.put(metatile)
-
-        return True
-
 
 class MetaTileMapSheet(MapSheet):
     def __init__(self, tag, bundle, pyramid, storage, renderer):
@@ -156,39 +218,37 @@ class MetaTileMapSheet(MapSheet):
 
         return cluster
 
-    def get_feature(self, meta_index):
-        tms = TileMapSystem(self._pyramid)
 
-        context = RenderContext(
-            map_proj=tms.pyramid.projcs,
-            map_bbox=tms.calc_tile_envelope(meta_index),
-            map_size=(meta_index.stride * 256, meta_index.stride * 256),
-            meta_index=meta_index,
-        )
-
-        feature = self._renderer.render(context)
-        if feature is None:
-            return None
-
-        return feature
-
-    def render_metatile(self, meta_index):
-        if self._storage.has(meta_index):
-            return True
-
-        feature = self.get_feature(meta_index)
-        if feature is None:
-            return False
-
-        data = self._bundle.writer.crop_map(feature.data, buffer=0)
-
-        metatile = MetaTile(
-            index=meta_index,
-            mimetype=self._bundle.tile_format.mimetype,
-            mtime=time.time(),
-            data=data,
-        )
-
-        self._storage.put(metatile)
-
-        return True
+def downsample_children(storage, writer, meta_index, resample='bilinear',
+                        timer=None):
+    """Build data of a metatile by downsampling its children at next zoom
+    level in the storage, returns ``None`` if none of the children exists."""
+    if timer is None:
+        timer = StageTimer()
+
+    z, x, y, stride = meta_index
+    child_stride = MetaTileIndex(z + 1, 0, 0, storage.stride).stride
+
+    pieces = list()
+    for cx in range(2 * x, 2 * (x + stride), child_stride):
+        for cy in range(2 * y, 2 * (y + stride), child_stride):
+            with timer.stage('fetch'):
+                child = storage.get(MetaTileIndex(z + 1, cx, cy,
+                                                  child_stride))
+            if child is None:
+                continue
+            if isinstance(child, TileCluster):
+                for tile in child.tiles:
+                    position = ((tile.index.x - 2 * x) * 256,
+                                (tile.index.y - 2 * y) * 256)
+                    pieces.append((position, tile.data))
+            else:
+                position = ((cx - 2 * x) * 256, (cy - 2 * y) * 256)
+                pieces.append((position, child.data))
+
+    if not pieces:
+        return None
+
+    with timer.stage('downsample'):
+        return writer.downsample_map(pieces, (stride * 256, stride * 256),
+                                     resample=resample)
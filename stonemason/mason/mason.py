@@ -9,7 +9,7 @@ import logging
 
 from collections import OrderedDict
 
-from stonemason.pyramid import TileIndex, MetaTileIndex
+from stonemason.pyramid import TileIndex, MetaTileIndex, MetaTileIndexArray
 from stonemason.tilecache import TileCache, NullTileCache, TileCacheError
 
 from .mapbook import MapBook
@@ -125,7 +125,8 @@ class Mason(MasonMapLibrary):
 
         return tile
 
-    def render_metatile(self, name, tag, z, x, y, stride):
+    def render_metatile(self, name, tag, z, x, y, stride,
+                        check_existing=True):
         try:
             sheet = self[name][tag]
         except KeyError:
@@ -135,7 +136,64 @@ class Mason(MasonMapLibrary):
         meta_index = MetaTileIndex(z, x, y, stride)
 
         # render the metatile
-        return sheet.render_metatile(meta_index)
+        return sheet.render_metatile(meta_index, check_existing)
+
+    def downsample_metatile(self, name, tag, z, x, y, stride,
+                            resample='bilinear', check_existing=True):
+        try:
+            sheet = self[name][tag]
+        except KeyError:
+            return None
+
+        # create meta index
+        meta_index = MetaTileIndex(z, x, y, stride)
+
+        # build the metatile from its children
+        return sheet.downsample_metatile(meta_index, resample, check_existing)
+
+    def retire_metatile(self, name, tag, z, x, y, stride):
+        try:
+            sheet = self[name][tag]
+        except KeyError:
+            return False
+
+        # create meta index
+        meta_index = MetaTileIndex(z, x, y, stride)
+
+        # delete the metatile from storage
+        sheet.retire_metatile(meta_index)
+
+        # and its tiles from cache
+        key = self._make_cache_key(name, tag)
+        try:
+            self._cache.retire_multi(key, list(meta_index.fission()))
+        except TileCacheError as e:
+            self._logger.warning('Retire from cache failed %r' % e)
+
+        return True
+
+    def retire_metatiles(self, name, tag, indexes):
+        """Retire many metatiles from the storage and their tiles from the
+        cache, using one batched request to each of them.
+
+        :param indexes: Metatile indexes to retire.
+        :type indexes: :class:`~stonemason.pyramid.MetaTileIndexArray`
+        """
+        assert isinstance(indexes, MetaTileIndexArray)
+        try:
+            sheet = self[name][tag]
+        except KeyError:
+            return False
+
+        sheet.retire_metatiles(indexes.tolist())
+
+        key = self._make_cache_key(name, tag)
+        try:
+            self._cache.retire_multi(key, indexes.fission().tolist())
+        except TileCacheError as e:
+            self._logger.warning('Retire from cache failed %r' % e)
+
+        return True
 
     def _make_cache_key(self, name, tag):
         key = '%s%s' % (name, tag)
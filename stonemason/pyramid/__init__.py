@@ -12,7 +12,9 @@ __date__ = '12/26/14'
 
 from .tile import TileIndex, Tile
 from .metatile import MetaTileIndex, MetaTile
+from .indexarray import TileIndexArray, MetaTileIndexArray
 from .cluster import TileCluster
 from .serial import Hilbert, Legacy
 from .pyramid import Pyramid
-from .hilbert import hil_s_from_xy, hil_xy_from_s
+from .hilbert import hil_s_from_xy, hil_xy_from_s, \
+    hil_s_from_xy_array, hil_xy_from_s_array
@@ -64,14 +64,18 @@ class TileCluster(object):
     :type index: :class:`~stonemason.provider.MetaTileIndex`.
     :param tiles: Tiles of this cluster
     :type index: :class:`~stonemason.provider.Tile`.
+    :param etag: ``ETag`` of the stored cluster, if it's loaded from a
+        storage.
+    :type etag: str or ``None``
     """
 
-    def __init__(self, index, tiles):
+    def __init__(self, index, tiles, etag=None):
         assert isinstance(index, MetaTileIndex)
         assert isinstance(tiles, list)
         self._index = index
         self._tiles = sorted(tiles,
                              key=lambda tile: self._tile_key_func(tile.index))
+        self._etag = etag
 
     def _tile_key_func(self, index):
         return (index.x - self._index.x) * self._index.stride + \
@@ -87,6 +91,13 @@ class TileCluster(object):
         """A list of :class:`~stonemason.provider.Tile` in this cluster."""
         return self._tiles
 
+    @property
+    def etag(self):
+        """``ETag`` of the stored cluster, pass it to ``get()`` of the
+        storage to revalidate this cluster, ``None`` if the cluster is not
+        loaded from a storage providing one."""
+        return self._etag
+
     def __getitem__(self, index):
         """Retrieve `Tile` with given index
 
@@ -25,6 +25,23 @@ if not HAS_GDAL:
 
     class Envelope(object):
         pass
+
+    class TileRange(object):
+        pass
+
+    def get_tile_map_system(pyramid):
+        raise TileMapError('GDAL is not available.')
+
+    def get_spatial_reference(crs):
+        raise TileMapError('GDAL is not available.')
+
+    def get_coordinate_transformation(source, target):
+        raise TileMapError('GDAL is not available.')
+
+    def clear_registry():
+        pass
 else:
-    from .tms import TileMapError, TileMapSystem, Envelope
+    from .tms import TileMapError, TileMapSystem, Envelope, TileRange
+    from .registry import get_tile_map_system, get_spatial_reference, \
+        get_coordinate_transformation, clear_registry
 
@@ -0,0 +1,132 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.pyramid.geo.registry
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Cache of geographic objects.
+
+    OSR spatial references and coordinate transformations must not be
+    used by several threads at the same time, so each thread has its own
+    cache, objects are shared by all callers in the same thread.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import threading
+
+import six
+
+from osgeo import osr
+
+from stonemason.pyramid import Pyramid
+
+from .tms import TileMapSystem
+
+osr.UseExceptions()
+
+_local = threading.local()
+
+# bumped by clear_registry() to invalidate caches of all threads
+_generation = 0
+
+
+def _get_cache(name):
+    if getattr(_local, 'generation', None) != _generation:
+        _local.caches = dict(tms=dict(), srs=dict(), ct=dict())
+        _local.generation = _generation
+    return _local.caches[name]
+
+
+def _make_pyramid_key(pyramid):
+    # Pyramid is a namedtuple but may carry lists, which are not hashable
+    return tuple(tuple(v) if isinstance(v, list) else v for v in pyramid)
+
+
+def _make_crs_key(crs):
+    if isinstance(crs, six.string_types):
+        return crs
+    assert isinstance(crs, osr.SpatialReference)
+    return crs.ExportToWkt()
+
+
+def get_tile_map_system(pyramid):
+    """Returns a :class:`~stonemason.pyramid.geo.TileMapSystem` of given
+    `pyramid`, the object is created on first request and then shared by
+    the current thread.
+
+    >>> from stonemason.pyramid import Pyramid
+    >>> from stonemason.pyramid.geo import get_tile_map_system
+    >>> pyramid = Pyramid(geogcs='EPSG:4326', projcs='EPSG:3857')
+    >>> get_tile_map_system(pyramid) is get_tile_map_system(pyramid)
+    True
+
+    .. note:: Returned object is shared, do not modify its spatial references
+        or transformations, or pass it to other threads.
+
+    :param pyramid: The pyramid defines the tile map system.
+    :type pyramid: :class:`~stonemason.pyramid.Pyramid`
+    :rtype: :class:`~stonemason.pyramid.geo.TileMapSystem`
+    """
+    assert isinstance(pyramid, Pyramid)
+    cache = _get_cache('tms')
+    key = _make_pyramid_key(pyramid)
+    try:
+        return cache[key]
+    except KeyError:
+        tms = cache[key] = TileMapSystem(pyramid)
+        return tms
+
+
+def get_spatial_reference(crs):
+    """Returns a :class:`osgeo.osr.SpatialReference` created from `crs`,
+    shared by the current thread.
+
+    :param crs: Any string supported by
+        :func:`~osgeo.osr.SpatialReference.SetFromUserInput`.
+    :type crs: str
+    :rtype: :class:`osgeo.osr.SpatialReference`
+    """
+    assert isinstance(crs, six.string_types)
+    cache = _get_cache('srs')
+    try:
+        return cache[crs]
+    except KeyError:
+        srs = osr.SpatialReference()
+        srs.SetFromUserInput(crs)
+        cache[crs] = srs
+        return srs
+
+
+def get_coordinate_transformation(source, target):
+    """Returns a :class:`osgeo.osr.CoordinateTransformation` which
+    transforms coordinates from `source` to `target`, shared by the
+    current thread.
+
+    :param source: Source coordinate system, either a string supported by
+        :func:`~osgeo.osr.SpatialReference.SetFromUserInput` or a
+        spatial reference object.
+    :type source: str or :class:`osgeo.osr.SpatialReference`
+    :param target: Target coordinate system.
+    :type target: str or :class:`osgeo.osr.SpatialReference`
+    :rtype: :class:`osgeo.osr.CoordinateTransformation`
+    """
+    if isinstance(source, six.string_types):
+        source = get_spatial_reference(source)
+    if isinstance(target, six.string_types):
+        target = get_spatial_reference(target)
+
+    cache = _get_cache('ct')
+    key = (_make_crs_key(source), _make_crs_key(target))
+    try:
+        return cache[key]
+    except KeyError:
+        transformation = osr.CoordinateTransformation(source, target)
+        cache[key] = transformation
+        return transformation
+
+
+def clear_registry():
+    """Drop cached objects of all threads."""
+    global _generation
+    _generation += 1
@@ -11,6 +11,8 @@ __date__ = '3/20/15'
 
 import collections
 
+import numpy as np
+
 from osgeo import osr
 from osgeo import ogr
 
@@ -18,7 +20,8 @@ osr.UseExceptions()
 ogr.UseExceptions()
 
 from stonemason.pyramid import Pyramid
-from stonemason.pyramid import TileIndex, MetaTileIndex
+from stonemason.pyramid import TileIndex, MetaTileIndex, \
+    TileIndexArray, MetaTileIndexArray
 
 
 class TileMapError(RuntimeError):
@@ -44,10 +47,39 @@ class Envelope(_Envelope):
         """Convert the envelope to a :class:`ogr.Geometry` instance, with
         specified spatial reference system"""
         left, bottom, right, top = self
-        bbox = (left, bottom, right, bottom,
-                right, top, left, top, left, bottom)
-        wkt = 'POLYGON((%.9f %.9f, %.9f %.9f, %.9f %.9f, %.9f %.9f, %.9f %.9f))' % bbox
-        return ogr.CreateGeometryFromWkt(wkt, srs)
+        ring = ogr.Geometry(ogr.wkbLinearRing)
+        for x, y in ((left, bottom), (right, bottom), (right, top),
+                     (left, top), (left, bottom)):
+            ring.AddPoint_2D(x, y)
+        polygon = ogr.Geometry(ogr.wkbPolygon)
+        polygon.AddGeometry(ring)
+        if srs is not None:
+            polygon.AssignSpatialReference(srs)
+        return polygon
+
+
+_TileRange = collections.namedtuple('TileRange',
+                                    'z min_x min_y max_x max_y')
+
+
+class TileRange(_TileRange):
+    """A rectangular range of tiles at zoom level ``z``, both minimum and
+    maximum tile coordinates are inclusive.
+    """
+
+    @property
+    def count(self):
+        """Number of tiles in the range."""
+        return (self.max_x - self.min_x + 1) * (self.max_y - self.min_y + 1)
+
+    def to_index_array(self):
+        """Returns all tiles in the range as a
+        :class:`~stonemason.pyramid.TileIndexArray`, in row major order."""
+        x, y = np.meshgrid(np.arange(self.min_x, self.max_x + 1),
+                           np.arange(self.min_y, self.max_y + 1),
+                           indexing='ij')
+        return TileIndexArray(np.repeat(self.z, x.size),
+                              x.ravel(), y.ravel())
 
 
 class TileMapSystem(object):
@@ -116,11 +148,15 @@ class TileMapSystem(object):
         self._backward_projection = None
         self._geogbounds = None
         self._projbounds = None
+        self._max_bbox = None
 
         self._init_spatial_ref(pyramid)
         self._init_projections(pyramid)
         self._init_bounds(pyramid)
 
+        # tile envelope parameters only depend on projection bounds
+        self._max_bbox = self._calc_max_bbox()
+
         # construct a normalized pyramid from calculations above
         self._pyramid = Pyramid(
             levels=pyramid.levels,
@@ -226,8 +262,8 @@ class TileMapSystem(object):
     def _init_projections(self, pyramid):
         self._forward_projection = osr.CoordinateTransformation(self._geogcs,
                                                                 self._projcs)
-        self._backward_projection = osr.CoordinateTransformation(self._geogcs,
-                                                                 self._projcs)
+        self._backward_projection = osr.CoordinateTransformation(self._projcs,
+                                                                 self._geogcs)
 
     def _init_bounds(self, pyramid):
         self._geogbounds = Envelope(*pyramid.geogbounds) \
@@ -279,8 +315,7 @@ class TileMapSystem(object):
 
         assert isinstance(index, TileIndex)
 
-        # XXX: should've cached this
-        offset_x, offset_y, scale = self._calc_max_bbox()
+        offset_x, offset_y, scale = self._max_bbox
 
         z, x, y = index.z, index.x, index.y
 
@@ -299,6 +334,123 @@ class TileMapSystem(object):
 
         return envelope
 
+    def calc_tile_envelopes(self, indexes):
+        """Calculates envelopes of a batch of tile indexes or metatile
+        indexes under projection coordinate system.
+
+        Gives same result as calling :meth:`calc_tile_envelope` on each
+        index, without creating per index objects.
+
+        :param indexes: Given tile indexes or metatile indexes.
+        :type indexes: :class:`~stonemason.pyramid.TileIndexArray` or
+            :class:`~stonemason.pyramid.MetaTileIndexArray`
+
+        :return: Calculated envelopes as a ``(N, 4)`` array, each row is
+            ``(left, bottom, right, top)``.
+        :rtype: :class:`numpy.ndarray`
+        """
+        if isinstance(indexes, MetaTileIndexArray):
+            indexes = indexes.to_tile_index()
+
+        assert isinstance(indexes, TileIndexArray)
+
+        offset_x, offset_y, scale = self._max_bbox
+
+        x = indexes.x.astype(np.float64)
+        y = indexes.y.astype(np.float64)
+
+        norm_factor = np.ldexp(1., indexes.z.astype(np.int32))
+
+        envelopes = np.empty((len(indexes), 4), dtype=np.float64)
+        envelopes[:, 0] = x / norm_factor * scale + offset_x
+        envelopes[:, 1] = (1 - (y + 1) / norm_factor) * scale + offset_y
+        envelopes[:, 2] = (x + 1) / norm_factor * scale + offset_x
+        envelopes[:, 3] = (1 - y / norm_factor) * scale + offset_y
+
+        return envelopes
+
+    def calc_tile_ranges(self, envelope, levels=None):
+        """Calculates ranges of tiles covering given area at each zoom level,
+        levels where the area is outside of the map are skipped.
+
+        :param envelope: The area, either a envelope in projection coordinate
+            system, or a :class:`ogr.Geometry`, which will be transformed
+            to projection coordinate system if its spatial reference is
+            different.
+        :type envelope: :class:`~stonemason.pyramid.geo.Envelope` or
+            :class:`ogr.Geometry`
+
+        :param levels: Zoom levels, default is levels of the pyramid.
+        :type levels: list
+
+        :return: Tile ranges of each level.
+        :rtype: list of :class:`~stonemason.pyramid.geo.TileRange`
+        """
+        if levels is None:
+            levels = self._pyramid.levels
+
+        if isinstance(envelope, ogr.Geometry):
+            srs = envelope.GetSpatialReference()
+            if srs is not None and not srs.IsSame(self._projcs):
+                envelope = envelope.Clone()
+                envelope.TransformTo(self._projcs)
+            envelope = Envelope.from_ogr(envelope.GetEnvelope())
+
+        left, bottom, right, top = envelope
+        offset_x, offset_y, scale = self._max_bbox
+
+        z = np.asarray(levels, dtype=np.int64)
+        dim = np.left_shift(np.int64(1), z)
+        norm_factor = dim.astype(np.float64)
+
+        # normalized coordinates, origin at top left corner
+        norm_min_x = (left - offset_x) / scale
+        norm_max_x = (right - offset_x) / scale
+        norm_min_y = 1 - (top - offset_y) / scale
+        norm_max_y = 1 - (bottom - offset_y) / scale
+
+        # tiles touching the area only by edge are not included
+        min_x = np.floor(norm_min_x * norm_factor).astype(np.int64)
+        min_y = np.floor(norm_min_y * norm_factor).astype(np.int64)
+        max_x = np.ceil(norm_max_x * norm_factor).astype(np.int64) - 1
+        max_y = np.ceil(norm_max_y * norm_factor).astype(np.int64) - 1
+        max_x = np.maximum(max_x, min_x)
+        max_y = np.maximum(max_y, min_y)
+
+        # skip levels the area falls outside of
+        inside = (max_x >= 0) & (max_y >= 0) & (min_x < dim) & (min_y < dim)
+
+        min_x = np.clip(min_x, 0, dim - 1)
+        min_y = np.clip(min_y, 0, dim - 1)
+        max_x = np.clip(max_x, 0, dim - 1)
+        max_y = np.clip(max_y, 0, dim - 1)
+
+        return list(TileRange(*map(int, r)) for r in
+                    zip(z[inside], min_x[inside], min_y[inside],
+                        max_x[inside], max_y[inside]))
+
+    def forward_transform(self, points):
+        """Transforms points from geographic coordinate system to
+        projection coordinate system in one call.
+
+        :param points: A sequence of ``(x, y)`` points, or a ``(N, 2)``
+            array.
+        :return: Transformed points as a ``(N, 2)`` array.
+        :rtype: :class:`numpy.ndarray`
+        """
+        return _transform_points(self._forward_projection, points)
+
+    def backward_transform(self, points):
+        """Transforms points from projection coordinate system to
+        geographic coordinate system in one call.
+
+        :param points: A sequence of ``(x, y)`` points, or a ``(N, 2)``
+            array.
+        :return: Transformed points as a ``(N, 2)`` array.
+        :rtype: :class:`numpy.ndarray`
+        """
+        return _transform_points(self._backward_projection, points)
+
     def __repr__(self):
         return '''GeographicSystem
     projcs: %s
@@ -309,3 +461,11 @@ class TileMapSystem(object):
         self._geogcs.ExportToWkt(),
         self._projbounds.ExportToWkt(),
         self._geogbounds.ExportToWkt())
+
+
+def _transform_points(transformation, points):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0:
+        return points.copy()
+    result = transformation.TransformPoints(points.tolist())
+    return np.array(result, dtype=np.float64)[:, :2]
@@ -17,14 +17,23 @@
 __author__ = 'kotaimen'
 __date__ = '1/9/15'
 
-def hil_xy_from_s(unsigned long long s, int n):
-    assert n < 64
-    assert s < 4 ** n
+cimport cython
 
+import numpy
+
+
+cdef inline int _xy_from_s(unsigned long long s, int n,
+                           unsigned long long *xp,
+                           unsigned long long *yp) nogil:
     cdef int i
     cdef unsigned long long sa, sb
     cdef unsigned long long x, y, swap, cmpl
-    cdef unsigned long long xp, yp
+
+    if n == 0:
+        # order 0 curve has only one point, also avoids shifting by 64 bits
+        xp[0] = 0
+        yp[0] = 0
+        return 0
 
     x = 0
     y = 0
@@ -42,14 +51,15 @@ def hil_xy_from_s(unsigned long long s, int n):
         x = (x >> 1) | (sa << 63)
         y = (y >> 1) | ((sa ^ sb) << 63)
 
-    xp = x >> (64 - n)
-    yp = y >> (64 - n)
+    xp[0] = x >> (64 - n)
+    yp[0] = y >> (64 - n)
 
-    return xp, yp
+    return 0
 
-def hil_s_from_xy(unsigned long long x, unsigned long long y, int n):
-    assert n < 64
 
+cdef inline unsigned long long _s_from_xy(unsigned long long x,
+                                          unsigned long long y,
+                                          int n) nogil:
     cdef int i, xi, yi
     cdef unsigned long long s
 
@@ -68,3 +78,92 @@ def hil_s_from_xy(unsigned long long x, unsigned long long y, int n):
 
     return s
 
+
+def hil_xy_from_s(unsigned long long s, int n):
+    assert n < 64
+    assert s < 4 ** n
+
+    cdef unsigned long long xp, yp
+
+    _xy_from_s(s, n, &xp, &yp)
+
+    return xp, yp
+
+
+def hil_s_from_xy(unsigned long long x, unsigned long long y, int n):
+    assert n < 64
+
+    return _s_from_xy(x, y, n)
+
+
+def _as_orders(n, size):
+    # broadcast a scalar order or a array of orders to given size
+    orders = numpy.ascontiguousarray(
+        numpy.broadcast_to(numpy.asarray(n, dtype=numpy.intc), (size,)))
+    assert numpy.all(orders >= 0) and numpy.all(orders <= 32)
+    return orders
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def hil_xy_from_s_array(s, n):
+    """Batch version of :func:`hil_xy_from_s`.
+
+    :param s: Array of Hilbert curve lengths.
+    :param n: Order of the Hilbert curve, either a scalar or a array
+        which has same size as `s`.
+    :return: Coordinates as a tuple of two ``uint64`` arrays ``(x, y)``.
+    """
+    cdef Py_ssize_t i, size
+
+    s_array = numpy.ascontiguousarray(s, dtype=numpy.uint64).ravel()
+    size = s_array.shape[0]
+    orders = _as_orders(n, size)
+
+    x_array = numpy.empty(size, dtype=numpy.uint64)
+    y_array = numpy.empty(size, dtype=numpy.uint64)
+
+    cdef const unsigned long long[::1] sv = s_array
+    cdef const int[::1] nv = orders
+    cdef unsigned long long[::1] xv = x_array
+    cdef unsigned long long[::1] yv = y_array
+
+    with nogil:
+        for i in range(size):
+            _xy_from_s(sv[i], nv[i], &xv[i], &yv[i])
+
+    return x_array, y_array
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def hil_s_from_xy_array(x, y, n):
+    """Batch version of :func:`hil_s_from_xy`.
+
+    :param x: Array of x coordinates.
+    :param y: Array of y coordinates, must have same size as `x`.
+    :param n: Order of the Hilbert curve, either a scalar or a array
+        which has same size as `x`.
+    :return: Hilbert curve lengths as a ``uint64`` array.
+    """
+    cdef Py_ssize_t i, size
+
+    x_array = numpy.ascontiguousarray(x, dtype=numpy.uint64).ravel()
+    y_array = numpy.ascontiguousarray(y, dtype=numpy.uint64).ravel()
+    assert x_array.shape == y_array.shape
+    size = x_array.shape[0]
+    orders = _as_orders(n, size)
+
+    s_array = numpy.empty(size, dtype=numpy.uint64)
+
+    cdef const unsigned long long[::1] xv = x_array
+    cdef const unsigned long long[::1] yv = y_array
+    cdef const int[::1] nv = orders
+    cdef unsigned long long[::1] sv = s_array
+
+    with nogil:
+        for i in range(size):
+            sv[i] = _s_from_xy(xv[i], yv[i], nv[i])
+
+    return s_array
+
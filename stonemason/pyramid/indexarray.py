@@ -0,0 +1,425 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.pyramid.indexarray
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Columnar containers of tile and metatile indexes.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import numpy as np
+
+from .tile import TileIndex, _TileIndex
+from .metatile import MetaTileIndex, _MetaTileIndex
+from .serial import Hilbert
+
+# Column types, zoom level never exceeds 28 since its limited by the serial
+_LEVEL_TYPE = np.uint8
+_COORD_TYPE = np.uint32
+
+
+def _as_column(values, dtype, size=None):
+    column = np.asarray(values)
+    if size is not None and column.ndim == 0:
+        column = np.repeat(column, size)
+    return np.ascontiguousarray(column.ravel(), dtype=dtype)
+
+
+class _IndexArray(object):
+    """Shared implementation of index arrays, which stores each field of
+    the index as a :class:`numpy.ndarray` column.
+
+    Columns are never modified after creation, derived values like the
+    sorted serials used by membership test are cached lazily."""
+
+    # names of columns
+    _fields = ()
+
+    def __init__(self, *columns):
+        assert len(columns) == len(self._fields)
+        size = len(columns[0])
+        assert all(len(column) == size for column in columns)
+        self._columns = columns
+        self._sorted_serial = None
+
+    @classmethod
+    def _from_columns(cls, *columns):
+        # bypass validation since columns are derived from a valid array
+        array = cls.__new__(cls)
+        _IndexArray.__init__(array, *columns)
+        return array
+
+    def _take(self, indices):
+        return self._from_columns(*(c[indices] for c in self._columns))
+
+    def _make_index(self, *values):  # pragma: no cover
+        raise NotImplementedError
+
+    @property
+    def z(self):
+        """Zoom levels as a ``uint8`` array."""
+        return self._columns[0]
+
+    @property
+    def x(self):
+        """x coordinates as a ``uint32`` array."""
+        return self._columns[1]
+
+    @property
+    def y(self):
+        """y coordinates as a ``uint32`` array."""
+        return self._columns[2]
+
+    @property
+    def serial(self):
+        """Hilbert serials of the indexes as a ``uint64`` array, which
+        is same as what the index uses as hash."""
+        return Hilbert.coord2serial_array(self.z, self.x, self.y)
+
+    @property
+    def nbytes(self):
+        """Number of bytes used by the columns."""
+        return sum(c.nbytes for c in self._columns)
+
+    def argsort(self):
+        """Returns indices which sort the array in Hilbert serial order,
+        ie: by zoom level first, then along the Hilbert curve."""
+        return np.argsort(self.serial, kind='mergesort')
+
+    def sort(self):
+        """Returns a new array sorted in Hilbert serial order."""
+        return self._take(self.argsort())
+
+    def unique(self):
+        """Returns a new array with duplicated indexes removed, the result
+        is sorted in Hilbert serial order."""
+        _, indices = np.unique(self.serial, return_index=True)
+        return self._take(indices)
+
+    def union(self, other):
+        """Returns indexes in either this or `other` array, sorted in Hilbert
+        serial order."""
+        assert isinstance(other, self.__class__)
+        return self.concatenate([self, other]).unique()
+
+    def intersection(self, other):
+        """Returns indexes in both this and `other` array, sorted in Hilbert
+        serial order."""
+        assert isinstance(other, self.__class__)
+        _, indices, _ = np.intersect1d(self.serial, other.serial,
+                                       assume_unique=False,
+                                       return_indices=True)
+        return self._take(indices)
+
+    def difference(self, other):
+        """Returns indexes in this array but not in `other`, sorted in Hilbert
+        serial order."""
+        assert isinstance(other, self.__class__)
+        serial = self.serial
+        mask = np.isin(serial, other.serial, invert=True)
+        return self._take(np.flatnonzero(mask)).unique()
+
+    def isin(self, other):
+        """Returns a boolean mask of whether indexes are in `other`."""
+        assert isinstance(other, self.__class__)
+        return np.isin(self.serial, other.serial)
+
+    @classmethod
+    def concatenate(cls, arrays):
+        """Join a sequence of index arrays into one."""
+        arrays = list(arrays)
+        if not arrays:
+            return cls()
+        columns = zip(*(a._columns for a in arrays))
+        return cls._from_columns(*(np.concatenate(c) for c in columns))
+
+    def tolist(self):
+        """Convert to a list of index objects."""
+        return list(self)
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    def __iter__(self):
+        make_index = self._make_index
+        for values in zip(*(c.tolist() for c in self._columns)):
+            yield make_index(*values)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return self._make_index(*(int(c[item]) for c in self._columns))
+        return self._take(item)
+
+    def __contains__(self, index):
+        # binary search in cached sorted serials, so repeated membership
+        # tests don't recalculate serials of the whole array
+        if self._sorted_serial is None:
+            self._sorted_serial = np.sort(self.serial)
+        sorted_serial = self._sorted_serial
+        serial = np.uint64(Hilbert.coord2serial(index.z, index.x, index.y))
+        pos = np.searchsorted(sorted_serial, serial)
+        return bool(pos < len(sorted_serial) and sorted_serial[pos] == serial)
+
+    def __repr__(self):
+        return '%s(%d indexes)' % (self.__class__.__name__, len(self))
+
+
+class TileIndexArray(_IndexArray):
+    """A compact array of :class:`~stonemason.pyramid.TileIndex`.
+
+    Indexes are stored as packed integer columns and all calculations are
+    vectorized, `TileIndex` objects are only created on iteration or item
+    access.
+
+    >>> from stonemason.pyramid import TileIndexArray, TileIndex
+    >>> indexes = TileIndexArray([2, 2, 3], [1, 3, 4], [2, 0, 5])
+    >>> indexes
+    TileIndexArray(3 indexes)
+    >>> list(indexes)
+    [TileIndex(2/1/2), TileIndex(2/3/0), TileIndex(3/4/5)]
+    >>> list(indexes.parent())
+    [TileIndex(1/0/1), TileIndex(1/1/0), TileIndex(2/2/2)]
+    >>> indexes.serial.tolist()
+    [576460752303423495, 576460752303423503, 864691128455135267]
+
+    :param z: Zoom levels.
+    :type z: array like
+
+    :param x: Coordinates at x axis.
+    :type x: array like
+
+    :param y: Coordinates at y axis.
+    :type y: array like
+    """
+
+    _fields = ('z', 'x', 'y')
+
+    def __init__(self, z=(), x=(), y=()):
+        z = _as_column(z, _LEVEL_TYPE)
+        x = _as_column(x, _COORD_TYPE, len(z))
+        y = _as_column(y, _COORD_TYPE, len(z))
+
+        dim = np.left_shift(np.uint64(1), z.astype(np.uint64))
+        assert np.all(z <= 28)
+        assert np.all(x < dim)
+        assert np.all(y < dim)
+
+        _IndexArray.__init__(self, z, x, y)
+
+    def _make_index(self, z, x, y):
+        return _TileIndex.__new__(TileIndex, z, x, y)
+
+    @classmethod
+    def from_indexes(cls, indexes):
+        """Create from a iterable of :class:`~stonemason.pyramid.TileIndex`.
+        """
+        indexes = list(indexes)
+        if not indexes:
+            return cls()
+        z, x, y = zip(*indexes)
+        return cls(z, x, y)
+
+    @classmethod
+    def from_serial(cls, serial):
+        """Create from a array of Hilbert serials."""
+        z, x, y = Hilbert.serial2coord_array(serial)
+        return cls(z, x, y)
+
+    def parent(self):
+        """Returns parent tiles, all indexes must be above zoom level 0."""
+        assert np.all(self.z > 0)
+        return self._from_columns(self.z - 1, self.x >> 1, self.y >> 1)
+
+    def children(self):
+        """Returns four child tiles of each tile, children of the same parent
+        are grouped together in ``(0, 0), (0, 1), (1, 0), (1, 1)`` order."""
+        z = np.repeat(self.z + 1, 4).astype(_LEVEL_TYPE)
+        x = np.repeat(self.x << 1, 4) + np.tile(
+            np.array([0, 0, 1, 1], dtype=_COORD_TYPE), len(self))
+        y = np.repeat(self.y << 1, 4) + np.tile(
+            np.array([0, 1, 0, 1], dtype=_COORD_TYPE), len(self))
+        assert np.all(z <= 28)
+        return self._from_columns(z, x, y)
+
+    def neighbors(self):
+        """Returns adjacent tiles of each tile at same zoom level, tiles
+        outside the level are dropped.  Note the result may contain duplicates
+        or indexes in this array, use :meth:`difference` or :meth:`unique`
+        to clean up."""
+        z, x, y, _ = _calc_neighbors(self.z, self.x, self.y, 1)
+        return TileIndexArray._from_columns(z, x, y)
+
+
+class MetaTileIndexArray(_IndexArray):
+    """A compact array of :class:`~stonemason.pyramid.MetaTileIndex`.
+
+    Like `MetaTileIndex`, coordinates are snapped to left top tile of the
+    metatile and strides larger than the zoom level are rounded down.
+
+    >>> from stonemason.pyramid import MetaTileIndexArray
+    >>> indexes = MetaTileIndexArray([2, 8], [0, 11], [0, 7], 8)
+    >>> list(indexes)
+    [MetaTileIndex(2/0/0@4), MetaTileIndex(8/8/0@8)]
+    >>> list(indexes.to_tile_index())
+    [TileIndex(0/0/0), TileIndex(5/1/0)]
+    >>> len(indexes.fission())
+    80
+
+    :param z: Zoom levels.
+    :type z: array like
+
+    :param x: Coordinates at x axis.
+    :type x: array like
+
+    :param y: Coordinates at y axis.
+    :type y: array like
+
+    :param stride: Number of tiles per axis, either a scalar or a array.
+    :type stride: int or array like
+    """
+
+    _fields = ('z', 'x', 'y', 'stride')
+
+    def __init__(self, z=(), x=(), y=(), stride=1):
+        z = _as_column(z, _LEVEL_TYPE)
+        x = _as_column(x, _COORD_TYPE, len(z))
+        y = _as_column(y, _COORD_TYPE, len(z))
+        stride = _as_column(stride, _COORD_TYPE, len(z))
+
+        assert np.all(stride & (stride - 1) == 0)
+        assert np.all(z <= 28)
+        dim = np.left_shift(np.uint64(1), z.astype(np.uint64))
+        assert np.all(x < dim)
+        assert np.all(y < dim)
+
+        # adjust if stride is too large for the level
+        stride = np.minimum(stride, dim).astype(_COORD_TYPE)
+
+        # round coordinate to left top tile in the meta tile
+        x = x - x % stride
+        y = y - y % stride
+
+        _IndexArray.__init__(self, z, x, y, stride)
+
+    def _make_index(self, z, x, y, stride):
+        return _MetaTileIndex.__new__(MetaTileIndex, z, x, y, stride)
+
+    @property
+    def stride(self):
+        """Strides as a ``uint32`` array."""
+        return self._columns[3]
+
+    @classmethod
+    def from_indexes(cls, indexes):
+        """Create from a iterable of
+        :class:`~stonemason.pyramid.MetaTileIndex`."""
+        indexes = list(indexes)
+        if not indexes:
+            return cls()
+        z, x, y, stride = zip(*indexes)
+        return cls(z, x, y, stride)
+
+    @classmethod
+    def from_serial(cls, serial, stride):
+        """Create from a array of Hilbert serials and stride."""
+        z, x, y = Hilbert.serial2coord_array(serial)
+        return cls(z, x, y, stride)
+
+    @classmethod
+    def from_tile_index(cls, indexes, stride):
+        """Create metatile indexes covering given tile indexes, same as
+        :meth:`~stonemason.pyramid.MetaTileIndex.from_tile_index`.
+
+        :param indexes: Given tile indexes.
+        :type indexes: :class:`~stonemason.pyramid.TileIndexArray`
+
+        :param stride: Stride of the metatiles.
+        :type stride: int
+        """
+        assert isinstance(indexes, TileIndexArray)
+        return cls(indexes.z, indexes.x, indexes.y, stride)
+
+    def to_tile_index(self):
+        """Returns corresponding tile indexes which covers same area, see
+        :meth:`~stonemason.pyramid.MetaTileIndex.to_tile_index`."""
+        shift = _log2(self.stride)
+        return TileIndexArray._from_columns(
+            (self.z - shift).astype(_LEVEL_TYPE),
+            self.x >> shift, self.y >> shift)
+
+    def fission(self):
+        """Fission metatiles into tiles, tiles of a metatile are grouped
+        together in same order as
+        :meth:`~stonemason.pyramid.MetaTileIndex.fission`.
+
+        :rtype: :class:`~stonemason.pyramid.TileIndexArray`
+        """
+        stride = self.stride.astype(np.int64)
+        counts = stride * stride
+
+        # offset of each tile inside its metatile
+        starts = np.cumsum(counts) - counts
+        local = np.arange(counts.sum(), dtype=np.int64) - \
+                np.repeat(starts, counts)
+        repeated_stride = np.repeat(stride, counts)
+
+        z = np.repeat(self.z, counts)
+        x = np.repeat(self.x, counts) + \
+            (local // repeated_stride).astype(_COORD_TYPE)
+        y = np.repeat(self.y, counts) + \
+            (local % repeated_stride).astype(_COORD_TYPE)
+
+        return TileIndexArray._from_columns(z, x, y)
+
+    def parent(self):
+        """Returns metatiles covering parent tiles of each metatile, using
+        same stride."""
+        assert np.all(self.z > 0)
+        return MetaTileIndexArray(self.z - 1, self.x >> 1, self.y >> 1,
+                                  self.stride)
+
+    def children(self):
+        """Returns metatiles covering child tiles of each metatile, using
+        same stride, four children are always returned per metatile."""
+        stride = self.stride
+        z = np.repeat(self.z + 1, 4).astype(_LEVEL_TYPE)
+        dx = np.tile(np.array([0, 0, 1, 1], dtype=_COORD_TYPE), len(self))
+        dy = np.tile(np.array([0, 1, 0, 1], dtype=_COORD_TYPE), len(self))
+        x = np.repeat(self.x << 1, 4) + dx * np.repeat(stride, 4)
+        y = np.repeat(self.y << 1, 4) + dy * np.repeat(stride, 4)
+        assert np.all(z <= 28)
+        return self._from_columns(z, x, y, np.repeat(stride, 4))
+
+    def neighbors(self):
+        """Returns adjacent metatiles of each metatile at same zoom level,
+        metatiles outside the level are dropped."""
+        return MetaTileIndexArray._from_columns(
+            *_calc_neighbors(self.z, self.x, self.y, self.stride))
+
+
+def _log2(values):
+    # exact log2 of power of two integers
+    return np.round(np.log2(values)).astype(_COORD_TYPE)
+
+
+def _calc_neighbors(z, x, y, stride):
+    # returns neighbor columns (z, x, y, stride) of each index
+    stride = np.broadcast_to(np.asarray(stride, dtype=np.int64), z.shape)
+    dim = np.left_shift(np.int64(1), z.astype(np.int64))
+
+    columns = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            if dx == 0 and dy == 0:
+                continue
+            nx = x.astype(np.int64) + dx * stride
+            ny = y.astype(np.int64) + dy * stride
+            mask = (nx >= 0) & (nx < dim) & (ny >= 0) & (ny < dim)
+            columns.append((z[mask],
+                            nx[mask].astype(_COORD_TYPE),
+                            ny[mask].astype(_COORD_TYPE),
+                            stride[mask].astype(_COORD_TYPE)))
+
+    return tuple(np.concatenate(c) for c in zip(*columns))
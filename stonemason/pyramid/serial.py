@@ -12,7 +12,22 @@ __date__ = '1/10/15'
 
 import math
 
-from .hilbert import hil_s_from_xy, hil_xy_from_s
+import numpy as np
+
+from .hilbert import hil_s_from_xy, hil_xy_from_s, \
+    hil_s_from_xy_array, hil_xy_from_s_array
+
+#: Bits used by hilbert length in a serial, zoom level takes the rest
+SERIAL_SHIFT = np.uint64(58)
+SERIAL_MASK = np.uint64((1 << 58) - 1)
+
+
+def _as_coords(*arrays):
+    return tuple(np.asarray(a, dtype=np.uint64).ravel() for a in arrays)
+
+
+def _split_hex(hex_str):
+    return [hex_str[i:i + 2] for i in range(0, len(hex_str), 2)]
 
 
 class Hilbert(object):
@@ -29,6 +44,44 @@ class Hilbert(object):
 
         return (z << 58) | hil_s_from_xy(x, y, z)
 
+    @staticmethod
+    def serial2coord(serial):
+        """ Convert a serial back to tile coordinate ``(z, x, y)``, this is
+        the reverse operation of :meth:`coord2serial`.
+        """
+        z = serial >> 58
+        x, y = hil_xy_from_s(serial & ((1 << 58) - 1), z)
+        return z, x, y
+
+    @staticmethod
+    def coord2serial_array(z, x, y):
+        """ Batch version of :meth:`coord2serial`.
+
+        Accepts array likes of tile coordinates and returns serials as
+        a ``uint64`` :class:`numpy.ndarray`, per tile calculation is done
+        in Cython without touching Python objects.
+
+        >>> from stonemason.pyramid import Hilbert
+        >>> Hilbert.coord2serial_array([3, 8], [4, 8], [5, 8]).tolist()
+        [864691128455135267, 2305843009213694080]
+        """
+        z, x, y = _as_coords(z, x, y)
+        assert np.all(z <= 28)
+
+        return (z << SERIAL_SHIFT) | hil_s_from_xy_array(x, y, z)
+
+    @staticmethod
+    def serial2coord_array(serial):
+        """ Batch version of :meth:`serial2coord`.
+
+        :return: Tile coordinates as a tuple of ``uint64`` arrays
+            ``(z, x, y)``.
+        """
+        serial, = _as_coords(serial)
+        z = serial >> SERIAL_SHIFT
+        x, y = hil_xy_from_s_array(serial & SERIAL_MASK, z)
+        return z, x, y
+
     @staticmethod
     def coord2dir(z, x, y):
         """ Return a directory name for a given tile coordinate.
@@ -54,6 +107,30 @@ class Hilbert(object):
 
         return dirs
 
+    @staticmethod
+    def coord2dir_array(z, x, y):
+        """ Batch version of :meth:`coord2dir`.
+
+        Hilbert lengths are calculated in one batch, only the final string
+        formatting is done per tile.
+
+        :return: A list of directory name lists.
+        """
+        z, x, y = _as_coords(z, x, y)
+        assert np.all(z <= 28)
+
+        blocks = hil_s_from_xy_array(x, y, z) // np.uint64(4096)
+
+        result = []
+        for zi, block in zip(z.tolist(), blocks.tolist()):
+            dirs = ['%02d' % zi, ]
+            if zi > 6:
+                digits = (zi - 5) // 2
+                hex_str = ('%X' % block).zfill(digits % 2 + digits)
+                dirs.extend(_split_hex(hex_str))
+            result.append(dirs)
+        return result
+
 
 class Legacy(object):
     """ Legacy serial used in Mason and older Pathologist systems.
@@ -90,6 +167,20 @@ class Legacy(object):
 
         return (4 ** z - 1) // 3 + y * dim + x
 
+    @staticmethod
+    def coord2serial_array(z, x, y):
+        """ Batch version of :meth:`coord2serial`.
+
+        :return: Serials as a ``uint64`` :class:`numpy.ndarray`.
+        """
+        z, x, y = _as_coords(z, x, y)
+        assert np.all(z <= 31)
+        one = np.uint64(1)
+        dim = one << z
+        assert np.all(x < dim) and np.all(y < dim)
+
+        return ((one << (z + z)) - one) // np.uint64(3) + y * dim + x
+
     @staticmethod
     def coord2dir(z, x, y):
 
@@ -129,3 +220,39 @@ class Legacy(object):
         dirs.insert(0, '%02d' % z)
 
         return dirs
+
+    @staticmethod
+    def coord2dir_array(z, x, y):
+        """ Batch version of :meth:`coord2dir`.
+
+        :return: A list of directory name lists.
+        """
+        z, x, y = _as_coords(z, x, y)
+        assert np.all(z <= 31)
+        assert np.all(x < (np.uint64(1) << z))
+        assert np.all(y < (np.uint64(1) << z))
+
+        # same as coord2dir, group 4096 tiles
+        m = np.uint64(64)
+        zdiff = 6
+
+        mz = np.where(z > zdiff, z - np.uint64(zdiff), 0).astype(np.uint64)
+        mn = (np.uint64(1) << mz) * (y // m) + (x // m)
+
+        # hex formats by level
+        formats = dict()
+
+        result = []
+        for zi, mzi, mni in zip(z.tolist(), mz.tolist(), mn.tolist()):
+            if zi <= zdiff:
+                result.append(['%02d' % zi, ])
+                continue
+            try:
+                fmt = formats[zi]
+            except KeyError:
+                digits = len('%x' % (4 ** mzi - 1))
+                fmt = formats[zi] = '%%0%dX' % (digits + digits % 2)
+            dirs = ['%02d' % zi, ]
+            dirs.extend(_split_hex(fmt % mni))
+            result.append(dirs)
+        return result
@@ -10,13 +10,15 @@ __date__ = '6/17/15'
 
 import math
 import logging
+import collections
 import numpy as np
 import skimage
 import skimage.exposure
 from PIL import Image, ImageOps
 from scipy import ndimage
-from osgeo import gdal, osr, gdalconst
-from stonemason.pyramid.geo import Envelope
+from osgeo import gdal, gdalconst
+from stonemason.pyramid.geo import Envelope, get_spatial_reference, \
+    get_coordinate_transformation
 from stonemason.renderer.engine.rendernode import TermNode
 from stonemason.renderer.engine.context import RenderContext
 from stonemason.storage.featurestorage import create_feature_storage
@@ -497,6 +499,10 @@ class ElevationDataDomain(RasterDataDomain):
 
 
 class ReliefNodeImpl(TermNode):
+    #: Max number of opened feature storages, least recently used ones are
+    #: closed, so long running renderers don't keep growing.
+    STORAGE_CACHE_SIZE = 4
+
     def __init__(self, name,
                  domain,
                  postprocessor,
@@ -517,16 +523,21 @@ class ReliefNodeImpl(TermNode):
         self._rasterizer = rasterizer
 
         self._buffer = buffer
-        self._storage_cache = dict()
+        self._storage_cache = collections.OrderedDict()
 
     def _create_storage(self, resolution):
         connection_string = self._connection_string(resolution)
 
         if connection_string in self._storage_cache:
-            storage = self._storage_cache[connection_string]
+            # move to most recently used
+            storage = self._storage_cache.pop(connection_string)
         else:
             storage = create_feature_storage(connection_string)
-            self._storage_cache[connection_string] = storage
+        self._storage_cache[connection_string] = storage
+
+        while len(self._storage_cache) > self.STORAGE_CACHE_SIZE:
+            _, expired = self._storage_cache.popitem(last=False)
+            expired.close()
 
         return storage
 
@@ -566,8 +577,7 @@ class ReliefNodeImpl(TermNode):
         # create target raster dataset
         driver = gdal.GetDriverByName('MEM')
 
-        target_crs = osr.SpatialReference()
-        target_crs.SetFromUserInput(crs)
+        target_crs = get_spatial_reference(crs)
         target_projection = target_crs.ExportToWkt()
 
         target_transform = GeoTransform.from_envelope(envelope, size)
@@ -596,7 +606,8 @@ class ReliefNodeImpl(TermNode):
             ctl_envelope = Envelope(*target_transform.make_envelope(size))
             ctl_envelope_geom = ctl_envelope.to_geometry(srs=target_crs)
             if not target_crs.IsSame(storage.crs):
-                ctl_envelope_geom.TransformTo(storage.crs)
+                ctl_envelope_geom.Transform(
+                    get_coordinate_transformation(target_crs, storage.crs))
             ctl_envelope = Envelope.from_ogr(ctl_envelope_geom.GetEnvelope())
             ctl_transform = GeoTransform.from_envelope(ctl_envelope, size)
 
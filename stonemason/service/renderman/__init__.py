@@ -11,5 +11,9 @@ __date__ = '4/3/15'
 
 from .renderman import renderman
 from .script import RenderScript, RenderStats
-from .walkers import create_walker, PyramidWalker, CompleteWalker, TileListWalker
+from .walkers import create_walker, PyramidWalker, CompleteWalker, \
+    TileListWalker, EnvelopeWalker, CoverageWalker, ExpiryWalker, \
+    HilbertOrderWalker, WorkFileWalker, ShardWalker
+from .workunit import ORDER_ROW_MAJOR, ORDER_HILBERT, SCHEDULE_SHARED, \
+    SCHEDULE_CONTIGUOUS
 
@@ -0,0 +1,169 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.service.renderman.autoscale
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Grow or shrink the renderer pool by CPU, I/O and memory saturation.
+
+    A renderer spends its time either computing (rendering, encoding,
+    downsampling) or waiting for the storage (checking, fetching and
+    storing metatiles).  CPU bound renderers saturate cores with one
+    renderer per core, while renderers waiting on a remote storage need
+    more renderers than cores to keep cores busy.  The autoscaler samples
+    host CPU utilization, iowait and available memory, together with share
+    of time renderers spend in storage stages, and decides how many
+    renderers should be running.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import collections
+import math
+import multiprocessing
+
+from stonemason.util.timer import perf_counter
+from stonemason.util.sysinfo import get_cpu_times, get_memory
+
+#: Render stages waiting for the storage instead of computing.
+IO_STAGES = ('check', 'fetch', 'store', 'queue')
+
+#: Load measured between two samples, `cpu` and `iowait` are fractions of
+#: host CPU time, `io_share` is fraction of render time spent in
+#: :data:`IO_STAGES`, `available` and `total` are host memory and
+#: `worker_rss` is the largest resident memory of a renderer, in bytes.
+LoadSample = collections.namedtuple(
+    'LoadSample', 'cpu iowait io_share available total worker_rss')
+
+
+class Autoscaler(object):
+    """Decide number of renderers within ``[min_workers, max_workers]``.
+
+    - Renderers are added while there is idle CPU, proportional to the
+      idle part, as long as a new renderer fits in available memory.
+    - A renderer is removed when cores are saturated by more renderers
+      than needed to keep them busy, given the share of time renderers
+      wait for the storage.
+    - A renderer is removed when the local disk is saturated (high
+      iowait) or when available memory is below reserved memory.
+
+    >>> from stonemason.service.renderman.autoscale import Autoscaler, \\
+    ...     LoadSample
+    >>> scaler = Autoscaler(1, 16, cores=4)
+    >>> scaler.decide(2, LoadSample(0.45, 0., 0.1, 2 ** 33, 2 ** 34, 0))
+    4
+
+    :param min_workers: Minimum number of renderers.
+    :type min_workers: int
+    :param max_workers: Maximum number of renderers.
+    :type max_workers: int
+    :param interval: Seconds between two decisions.
+    :type interval: float
+    :param cpu_high: CPU utilization considered as saturated.
+    :type cpu_high: float
+    :param iowait_high: Fraction of CPU time waiting for local disk
+        considered as saturated.
+    :type iowait_high: float
+    :param memory_reserve: Fraction of host memory kept available.
+    :type memory_reserve: float
+    :param cores: Number of CPU cores, default is cores of the host.
+    :type cores: int
+    """
+
+    def __init__(self, min_workers, max_workers, interval=10.,
+                 cpu_high=0.9, iowait_high=0.25, memory_reserve=0.1,
+                 cores=None):
+        assert 1 <= min_workers <= max_workers
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.interval = interval
+        self.cpu_high = cpu_high
+        self.iowait_high = iowait_high
+        self.memory_reserve = memory_reserve
+        if cores is None:
+            cores = multiprocessing.cpu_count()
+        self.cores = cores
+        #: Last measured :class:`LoadSample`.
+        self.sample = None
+        self._last = None
+        self._when = None
+
+    def clamp(self, workers):
+        """Limit number of renderers to configured bounds."""
+        return max(self.min_workers, min(self.max_workers, workers))
+
+    def decide(self, workers, sample):
+        """Number of renderers should be running given `workers` running
+        renderers and a measured :class:`LoadSample`."""
+        reserve = self.memory_reserve * sample.total
+
+        if sample.total and sample.available < reserve:
+            # about to swap
+            return self.clamp(workers - 1)
+
+        if sample.iowait >= self.iowait_high:
+            # local disk can't keep up, more renderers only queue on it
+            return self.clamp(workers - 1)
+
+        if sample.cpu < self.cpu_high:
+            # grow proportional to idle cpu, at most doubling at once
+            target = int(math.ceil(workers * self.cpu_high /
+                                   max(sample.cpu, 0.05)))
+            target = min(target, workers * 2)
+            if sample.total and sample.worker_rss > 0:
+                affordable = (sample.available - reserve) // \
+                             sample.worker_rss
+                target = min(target, workers + int(affordable))
+            return self.clamp(max(target, workers))
+
+        # cpu is saturated, renderers waiting for the storage still need
+        # company to keep cores busy
+        needed = int(math.ceil(self.cores /
+                               max(1. - sample.io_share, 0.1)))
+        if workers > needed:
+            return self.clamp(workers - 1)
+        return self.clamp(workers)
+
+    def measure(self, board):
+        """Take a sample of the host and renderer counters on the `board`,
+        returns a :class:`LoadSample` measured since last call, or
+        ``None`` on first call or if host load is not available."""
+        cpu_times = get_cpu_times()
+        memory = get_memory()
+        stats = board.summary()
+        if cpu_times is None:
+            return None
+
+        last = self._last
+        self._last = (cpu_times, stats.total_time, stats.io_time)
+        if last is None:
+            return None
+        last_cpu_times, last_render_time, last_io_time = last
+
+        elapsed = max(cpu_times.total - last_cpu_times.total, 1)
+        render_time = stats.total_time - last_render_time
+        io_share = 0.
+        if render_time > 0:
+            io_share = min((stats.io_time - last_io_time) / render_time, 1.)
+        available, total = memory if memory is not None else (0, 0)
+        return LoadSample(
+            cpu=float(cpu_times.busy - last_cpu_times.busy) / elapsed,
+            iowait=float(cpu_times.iowait - last_cpu_times.iowait) / elapsed,
+            io_share=io_share,
+            available=available,
+            total=total,
+            worker_rss=board.max_rss())
+
+    def update(self, board, workers, now=None):
+        """Returns number of renderers should be running, or ``None`` if
+        it's not time to decide yet, call this frequently."""
+        if now is None:
+            now = perf_counter()
+        if self._when is not None and now - self._when < self.interval:
+            return None
+        self._when = now
+        sample = self.measure(board)
+        if sample is None:
+            return None
+        self.sample = sample
+        return self.decide(workers, sample)
@@ -0,0 +1,221 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.service.renderman.expiry
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Tile expiry list ingestion.
+
+    Expiry lists are generated by upstream data updates, eg: ``osm2pgsql
+    --expire-tiles``, each line contains a ``z/x/y`` tile coordinate.
+    Expired tiles are mapped to metatiles of the storage and deduplicated,
+    then propagated to parent levels since a changed tile also changes its
+    parents.  Lists are read in chunks so a very large list only costs
+    memory of unique metatiles.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import re
+
+import numpy as np
+
+from stonemason.pyramid import TileIndexArray, MetaTileIndexArray
+
+_LINE_PATTERN = re.compile(r'^\s*(\d+)\s*[/,\s]\s*(\d+)\s*[/,\s]\s*(\d+)\s*$')
+
+
+def parse_tile_list(lines, chunk_size=100000):
+    """Parse tile coordinates in ``z/x/y`` format, ``z,x,y`` and ``z x y``
+    are also accepted.
+
+    Empty lines, malformed lines and lines with tile coordinate out of
+    range are skipped.
+
+    >>> from stonemason.service.renderman.expiry import parse_tile_list
+    >>> list(parse_tile_list(['3/1/2', '4,5,6', '', '1/2/0']))
+    [TileIndexArray(2 indexes)]
+
+    :param lines: Lines of the list, eg: an opened file.
+    :type lines: iterator
+    :param chunk_size: Number of lines processed at once.
+    :type chunk_size: int
+    :return: Tiles in chunks.
+    :rtype: iterator of :class:`~stonemason.pyramid.TileIndexArray`
+    """
+    chunk = list()
+    for line in lines:
+        match = _LINE_PATTERN.match(line)
+        if match is None:
+            continue
+        chunk.append(tuple(map(int, match.groups())))
+        if len(chunk) >= chunk_size:
+            yield _make_tiles(chunk)
+            chunk = list()
+    if chunk:
+        yield _make_tiles(chunk)
+
+
+def _make_tiles(chunk):
+    z, x, y = np.array(chunk, dtype=np.int64).T
+    valid = (z <= 28) & (x < 2 ** np.minimum(z, 28)) & \
+            (y < 2 ** np.minimum(z, 28))
+    return TileIndexArray(z[valid], x[valid], y[valid])
+
+
+class ExpiryList(object):
+    """Expired metatiles collected from tile expiry lists.
+
+    >>> from stonemason.pyramid import TileIndex
+    >>> from stonemason.service.renderman.expiry import ExpiryList
+    >>> expiry = ExpiryList(stride=2, min_level=2)
+    >>> expiry.read(['4/5/6', '4/4/7', '3/2/3'])
+    3
+    >>> list(expiry.metatiles())
+    [MetaTileIndex(4/4/6@2), MetaTileIndex(3/2/2@2), MetaTileIndex(2/0/0@2)]
+
+    :param stride: Stride of metatiles in the storage.
+    :type stride: int
+    :param min_level: Expiry is propagated up to this level, tiles above this
+        level are ignored.
+    :type min_level: int
+    """
+
+    def __init__(self, stride=1, min_level=0):
+        self._stride = stride
+        self._min_level = min_level
+        # sorted unique metatile serials of each level
+        self._levels = dict()
+
+    @property
+    def stride(self):
+        return self._stride
+
+    @property
+    def min_level(self):
+        return self._min_level
+
+    @property
+    def levels(self):
+        """Levels contain expired metatiles, deepest level first."""
+        return sorted(self._levels, reverse=True)
+
+    def add(self, tiles):
+        """Expire given tiles.
+
+        :param tiles: Expired tiles.
+        :type tiles: :class:`~stonemason.pyramid.TileIndexArray`
+        """
+        assert isinstance(tiles, TileIndexArray)
+        tiles = tiles[tiles.z >= self._min_level]
+        metatiles = MetaTileIndexArray.from_tile_index(tiles, self._stride)
+        for level in np.unique(metatiles.z).tolist():
+            self._merge(level, metatiles.serial[metatiles.z == level])
+
+    def read(self, lines, chunk_size=100000):
+        """Read expired tiles from an expiry list.
+
+        Lines are in ``z/x/y`` format, empty lines and lines with tile
+        coordinate out of range are skipped.
+
+        :param lines: Lines of the list, eg: an opened file.
+        :type lines: iterator
+        :param chunk_size: Number of lines processed at once.
+        :type chunk_size: int
+        :return: Number of tiles read.
+        :rtype: int
+        """
+        count = 0
+        for tiles in parse_tile_list(lines, chunk_size):
+            self.add(tiles)
+            count += len(tiles)
+        return count
+
+    def _merge(self, level, serials):
+        serials = np.unique(serials)
+        try:
+            self._levels[level] = np.union1d(self._levels[level], serials)
+        except KeyError:
+            self._levels[level] = serials
+
+    def propagate(self):
+        """Expire parents of expired metatiles up to `min_level`."""
+        if not self._levels:
+            return
+        for level in range(max(self._levels), self._min_level, -1):
+            if level not in self._levels:
+                continue
+            metatiles = MetaTileIndexArray.from_serial(self._levels[level],
+                                                       self._stride)
+            self._merge(level - 1, metatiles.parent().serial)
+
+    def metatiles(self, level=None):
+        """Expired metatiles, including parents, deepest level first.
+
+        :param level: Only returns metatiles at this level.
+        :type level: int
+        :rtype: :class:`~stonemason.pyramid.MetaTileIndexArray`
+        """
+        self.propagate()
+        if level is not None:
+            levels = [level] if level in self._levels else []
+        else:
+            levels = self.levels
+        return MetaTileIndexArray.concatenate(
+            MetaTileIndexArray.from_serial(self._levels[l], self._stride)
+            for l in levels)
+
+    def __len__(self):
+        return sum(len(serials) for serials in self._levels.values())
+
+    def __repr__(self):
+        return 'ExpiryList(%d metatiles@%d)' % (len(self), self._stride)
+
+
+def retire_expired(mason, theme_name, schema_tag, lines, levels,
+                   dry_run=False, chunk_size=100000, batch_size=1000):
+    """Retire metatiles of tiles in an expiry list from storage and cache
+    of a map sheet.
+
+    Expired tiles are mapped to metatiles using stride of the storage,
+    which may differ from stride of the render pyramid.
+
+    :param mason: The mason owns the map sheet.
+    :type mason: :class:`~stonemason.mason.Mason`
+    :param theme_name: Name of the theme.
+    :type theme_name: str
+    :param schema_tag: Tag of the map sheet.
+    :type schema_tag: str
+    :param lines: Lines of the expiry list, eg: an opened file.
+    :type lines: iterator
+    :param levels: Levels to retire, expiry is propagated up to the lowest
+        level.
+    :type levels: list
+    :param dry_run: Only count expired metatiles, retire nothing.
+    :type dry_run: bool
+    :param chunk_size: Number of lines processed at once.
+    :type chunk_size: int
+    :param batch_size: Number of metatiles retired by one batched call to
+        the storage and the cache.
+    :type batch_size: int
+    :return: Number of expired tiles read and metatiles retired.
+    :rtype: tuple
+    """
+    assert levels
+    sheet = mason[theme_name][schema_tag]
+    expiry = ExpiryList(sheet._storage.stride, min_level=min(levels))
+    count = expiry.read(lines, chunk_size=chunk_size)
+    # expire parents before listing levels
+    expiry.propagate()
+
+    retired = 0
+    for level in expiry.levels:
+        if level not in levels:
+            continue
+        metatiles = expiry.metatiles(level)
+        if not dry_run:
+            for start in range(0, len(metatiles), batch_size):
+                mason.retire_metatiles(theme_name, schema_tag,
+                                       metatiles[start:start + batch_size])
+        retired += len(metatiles)
+    return count, retired
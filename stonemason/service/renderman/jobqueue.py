@@ -0,0 +1,299 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.service.renderman.jobqueue
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Job queues shared by renderers on many nodes.
+
+    A job queue works like :class:`multiprocessing.JoinableQueue`, but
+    items are leased instead of removed when taken, a leased item is
+    taken by others again if it is not acknowledged before its lease
+    expires, so work units of a crashed or preempted renderer are
+    eventually rendered by someone else.  Renderers renew their leases
+    while working on long work units.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import time
+import socket
+import sqlite3
+import logging
+
+from six.moves import cPickle as pickle
+
+#: Item is waiting or leased.
+_PENDING = 0
+#: Item is acknowledged.
+_DONE = 1
+#: Item is given up after too many leases.
+_DEAD = 2
+
+
+class JobQueue(object):  # pragma: no cover
+    """A queue of work units shared by renderers.
+
+    Producer puts items into the queue then calls :meth:`seal`, renderers
+    get items until :meth:`get` returns ``None``, which means the queue is
+    sealed and everything is acknowledged.
+    """
+
+    def put(self, item, block=True, timeout=None):
+        """Put an item into the queue."""
+        raise NotImplementedError
+
+    def get(self):
+        """Lease an item, blocks until an item is available, returns
+        ``None`` if the queue is sealed and all items are done."""
+        raise NotImplementedError
+
+    def task_done(self):
+        """Acknowledge the earliest item leased by this process."""
+        raise NotImplementedError
+
+    def renew(self):
+        """Extend leases held by this process, call this periodically
+        while working on leased items."""
+        raise NotImplementedError
+
+    def claim_producer(self):
+        """Claim the producer role, returns ``False`` if another process
+        already claimed it, so only one of many nodes fills the queue."""
+        raise NotImplementedError
+
+    def join(self):
+        """Block until all items are acknowledged."""
+        raise NotImplementedError
+
+    def seal(self):
+        """Mark the queue as complete, no more items will be put."""
+        raise NotImplementedError
+
+    def empty(self):
+        """Whether no item is waiting or leased."""
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class SQLiteJobQueue(JobQueue):
+    """A job queue stored in a SQLite database.
+
+    The database file can be put on a shared file system (eg: NFS) with
+    working file locks, or on local disk for single node use and testing.
+
+    >>> import os, tempfile
+    >>> from stonemason.service.renderman.jobqueue import SQLiteJobQueue
+    >>> queue = SQLiteJobQueue(os.path.join(tempfile.mkdtemp(), 'job.db'))
+    >>> queue.put(('render', 'unit1'))
+    >>> queue.seal()
+    >>> queue.get()
+    ('render', 'unit1')
+    >>> queue.task_done()
+    >>> queue.get() is None
+    True
+
+    :param filename: File name of the database, created if not exists.
+    :type filename: str
+    :param lease_timeout: Seconds before a leased item is visible again.
+    :type lease_timeout: float
+    :param max_leases: Max times an item is leased before its given up.
+    :type max_leases: int
+    :param poll_interval: Seconds to wait when there is no visible item.
+    :type poll_interval: float
+    """
+
+    def __init__(self, filename, lease_timeout=600., max_leases=3,
+                 poll_interval=0.5):
+        self._filename = filename
+        self._lease_timeout = lease_timeout
+        self._max_leases = max_leases
+        self._poll_interval = poll_interval
+        self._owner = None
+        self._connection = None
+        self._pid = None
+        self._leases = list()
+        self._renewed = 0.
+        self._logger = logging.getLogger(__name__)
+
+        # create tables
+        self.connection
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def connection(self):
+        # sqlite connections can't be shared by processes
+        if self._connection is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._owner = '%s.%d' % (socket.gethostname(), self._pid)
+            self._leases = list()
+            self._connection = sqlite3.connect(self._filename, timeout=60,
+                                               isolation_level=None)
+            self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload BLOB NOT NULL,
+                status INTEGER NOT NULL DEFAULT 0,
+                owner TEXT,
+                leases INTEGER NOT NULL DEFAULT 0,
+                expires REAL NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            ''')
+        return self._connection
+
+    def put(self, item, block=True, timeout=None):
+        payload = pickle.dumps(item, protocol=2)
+        self.connection.execute('INSERT INTO jobs (payload) VALUES (?)',
+                                (sqlite3.Binary(payload),))
+
+    def get(self):
+        while True:
+            item = self._lease()
+            if item is not None:
+                return item
+            if self.sealed and self.empty():
+                return None
+            time.sleep(self._poll_interval)
+
+    def _lease(self):
+        connection = self.connection
+        now = time.time()
+        # take the write lock first so only one process leases an item
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            while True:
+                row = connection.execute(
+                    'SELECT id, payload, leases FROM jobs '
+                    'WHERE status = ? AND expires < ? ORDER BY id LIMIT 1',
+                    (_PENDING, now)).fetchone()
+                if row is None:
+                    item = None
+                    break
+                job_id, payload, leases = row
+                if leases >= self._max_leases:
+                    self._logger.error('Giving up job #%d after %d leases.',
+                                       job_id, leases)
+                    connection.execute(
+                        'UPDATE jobs SET status = ? WHERE id = ?',
+                        (_DEAD, job_id))
+                    continue
+                connection.execute(
+                    'UPDATE jobs SET owner = ?, leases = leases + 1, '
+                    'expires = ? WHERE id = ?',
+                    (self._owner, now + self._lease_timeout, job_id))
+                self._leases.append(job_id)
+                self._renewed = now
+                item = pickle.loads(bytes(payload))
+                break
+        except:
+            connection.execute('ROLLBACK')
+            raise
+        else:
+            connection.execute('COMMIT')
+        return item
+
+    def task_done(self):
+        job_id = self._leases.pop(0)
+        # only acknowledge if the lease is not taken over by others
+        cursor = self.connection.execute(
+            'UPDATE jobs SET status = ? WHERE id = ? AND owner = ?',
+            (_DONE, job_id, self._owner))
+        if cursor.rowcount == 0:
+            self._logger.warning('Lease of job #%d is taken over by others.',
+                                 job_id)
+
+    def renew(self):
+        """Extend leases held by this process by `lease_timeout`.
+
+        Leases are written at most once per quarter of `lease_timeout`, so
+        this is cheap to call after every metatile.  A lease already taken
+        over by others is not renewed.
+        """
+        now = time.time()
+        if not self._leases or now - self._renewed < self._lease_timeout / 4:
+            return
+        self._renewed = now
+        self.connection.execute(
+            'UPDATE jobs SET expires = ? WHERE owner = ? AND status = ? '
+            'AND id IN (%s)' % ','.join('?' * len(self._leases)),
+            [now + self._lease_timeout, self._owner, _PENDING] +
+            self._leases)
+
+    def claim_producer(self):
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            cursor = connection.execute(
+                'INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)',
+                ('producer', self._owner))
+            claimed = cursor.rowcount == 1
+        except:
+            connection.execute('ROLLBACK')
+            raise
+        else:
+            connection.execute('COMMIT')
+        return claimed
+
+    @property
+    def producer(self):
+        """Owner claimed the producer role, ``None`` if not claimed."""
+        row = self.connection.execute(
+            'SELECT value FROM meta WHERE key = ?', ('producer',)).fetchone()
+        return None if row is None else row[0]
+
+    def join(self):
+        while not self.empty():
+            time.sleep(self._poll_interval)
+
+    def seal(self):
+        self.connection.execute(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+            ('sealed', '1'))
+
+    @property
+    def sealed(self):
+        """Whether producer completed putting items."""
+        row = self.connection.execute(
+            'SELECT value FROM meta WHERE key = ?', ('sealed',)).fetchone()
+        return row is not None
+
+    def empty(self):
+        return self.pending() == 0
+
+    def pending(self):
+        """Number of items waiting or leased."""
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM jobs WHERE status = ?',
+            (_PENDING,)).fetchone()[0]
+
+    def dead(self):
+        """Number of items given up."""
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM jobs WHERE status = ?',
+            (_DEAD,)).fetchone()[0]
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __getstate__(self):
+        # connection is reopened in the new process
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        state['_pid'] = None
+        return state
+
+    def __repr__(self):
+        return 'SQLiteJobQueue(%s)' % self._filename
@@ -0,0 +1,196 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.service.renderman.journal
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Durable record of rendered metatiles, so a render job can be resumed.
+
+    Each renderer process appends fixed size binary records to its own
+    journal file in the journal directory, a record is a ``(serial, status)``
+    pair packed as ``<QB``, where ``serial`` is Hilbert serial of the
+    :class:`~stonemason.pyramid.MetaTileIndex`.  Journal files are never
+    rewritten, a truncated record at the end of file (eg: process killed
+    while writing) is ignored.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import glob
+import time
+import struct
+import socket
+import threading
+
+import numpy as np
+
+from stonemason.pyramid import MetaTileIndex
+
+#: Metatile is rendered or already exists in the storage.
+STATUS_COMPLETED = 1
+#: Renderer produced nothing for the metatile.
+STATUS_EMPTY = 2
+#: Failed to render the metatile.
+STATUS_FAILED = 3
+
+_RECORD = struct.Struct('<QB')
+_RECORD_DTYPE = np.dtype([('serial', '<u8'), ('status', 'u1')])
+
+assert _RECORD.size == _RECORD_DTYPE.itemsize
+
+
+class JournalWriter(object):
+    """Append render results to a journal file.
+
+    Records are buffered and written to disk when `flush_interval` seconds
+    passed since last flush, or when buffer is full.  The writer can be
+    shared by threads, eg: background uploaders.
+
+    :param filename: Journal file name.
+    :type filename: str
+    :param flush_interval: Max seconds to keep records in buffer.
+    :type flush_interval: float
+    :param buffer_size: Max records to keep in buffer.
+    :type buffer_size: int
+    """
+
+    def __init__(self, filename, flush_interval=5., buffer_size=1000):
+        self._fp = open(filename, 'ab')
+        self._flush_interval = flush_interval
+        self._buffer_size = buffer_size
+        self._buffer = list()
+        self._last_flush = time.time()
+        self._lock = threading.RLock()
+
+    def record(self, index, status):
+        """Record render result of a metatile.
+
+        :param index: Rendered metatile index.
+        :type index: :class:`~stonemason.pyramid.MetaTileIndex`
+        :param status: One of ``STATUS_COMPLETED``, ``STATUS_EMPTY``,
+            ``STATUS_FAILED``.
+        :type status: int
+        """
+        assert isinstance(index, MetaTileIndex)
+        with self._lock:
+            self._buffer.append(_RECORD.pack(hash(index), status))
+            if len(self._buffer) >= self._buffer_size or \
+                    time.time() - self._last_flush >= self._flush_interval:
+                self.flush()
+
+    def flush(self):
+        """Write buffered records to disk."""
+        with self._lock:
+            if self._buffer:
+                self._fp.write(b''.join(self._buffer))
+                self._fp.flush()
+                os.fsync(self._fp.fileno())
+                del self._buffer[:]
+            self._last_flush = time.time()
+
+    def close(self):
+        self.flush()
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class JournalSummary(object):
+    """Completed and failed metatiles read from a journal.
+
+    A metatile is considered completed if it was completed in any record,
+    even if it failed before, so retrying a failed metatile works as
+    expected.
+
+    :param serials: Hilbert serials of recorded metatiles.
+    :type serials: :class:`numpy.ndarray`
+    :param status: Status of each record.
+    :type status: :class:`numpy.ndarray`
+    """
+
+    def __init__(self, serials=(), status=()):
+        serials = np.asarray(serials, dtype=np.uint64)
+        status = np.asarray(status, dtype=np.uint8)
+
+        #: Sorted serials of completed metatiles, including empty ones.
+        self.completed = np.unique(serials[status != STATUS_FAILED])
+        #: Sorted serials of metatiles only failed.
+        self.failed = np.setdiff1d(np.unique(serials[status == STATUS_FAILED]),
+                                   self.completed, assume_unique=True)
+
+    def is_completed(self, index):
+        """Whether given metatile index is completed."""
+        serial = np.uint64(hash(index))
+        n = np.searchsorted(self.completed, serial)
+        return n < len(self.completed) and self.completed[n] == serial
+
+    def is_failed(self, index):
+        """Whether given metatile index is failed and never completed."""
+        serial = np.uint64(hash(index))
+        n = np.searchsorted(self.failed, serial)
+        return n < len(self.failed) and self.failed[n] == serial
+
+    def __repr__(self):
+        return 'JournalSummary(%d completed, %d failed)' % \
+               (len(self.completed), len(self.failed))
+
+
+class RenderJournal(object):
+    """A directory of journal files written by renderer processes.
+
+    >>> import tempfile
+    >>> from stonemason.pyramid import MetaTileIndex
+    >>> from stonemason.service.renderman.journal import RenderJournal, \\
+    ...     STATUS_COMPLETED, STATUS_FAILED
+    >>> journal = RenderJournal(tempfile.mkdtemp())
+    >>> with journal.writer() as writer:
+    ...     writer.record(MetaTileIndex(3, 0, 0, 2), STATUS_COMPLETED)
+    ...     writer.record(MetaTileIndex(3, 2, 0, 2), STATUS_FAILED)
+    >>> journal.load()
+    JournalSummary(1 completed, 1 failed)
+
+    :param directory: Journal directory, created if not exists.
+    :type directory: str
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def writer(self, flush_interval=5.):
+        """Create a new journal writer for current process."""
+        filename = os.path.join(self._directory,
+                                '%s.%d.journal' % (socket.gethostname(),
+                                                   os.getpid()))
+        return JournalWriter(filename, flush_interval=flush_interval)
+
+    def load(self):
+        """Read all journal files in the directory.
+
+        :rtype: :class:`~stonemason.service.renderman.journal.JournalSummary`
+        """
+        serials = list()
+        status = list()
+        for filename in sorted(glob.glob(os.path.join(self._directory,
+                                                      '*.journal'))):
+            with open(filename, 'rb') as fp:
+                data = fp.read()
+            # ignore truncated record at the end of file
+            count = len(data) // _RECORD_DTYPE.itemsize
+            records = np.frombuffer(data, dtype=_RECORD_DTYPE, count=count)
+            serials.append(records['serial'])
+            status.append(records['status'])
+
+        if not serials:
+            return JournalSummary()
+        return JournalSummary(np.concatenate(serials), np.concatenate(status))
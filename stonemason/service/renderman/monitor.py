@@ -0,0 +1,223 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.service.renderman.monitor
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Render counters shared by processes and live progress reporting.
+
+    Every renderer process owns a slot of counters in shared memory and is
+    the only writer of it, so counters are updated without locks and
+    never lost by racing ``+=`` of different processes.  The monitor sums
+    up all slots when it reports.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import ctypes
+import threading
+import multiprocessing.sharedctypes
+
+import numpy as np
+
+from stonemason.util.timer import human_duration, perf_counter
+
+from .script import RenderStats
+
+#: Number of zoom levels counted in progress of each level.
+MAX_LEVELS = 29
+
+
+class StatsBoard(object):
+    """Per worker render counters in shared memory.
+
+    Must be created before worker processes are started.
+
+    >>> from stonemason.service.renderman.monitor import StatsBoard
+    >>> board = StatsBoard(2)
+    >>> board.slot(0).rendered += 2
+    >>> board.slot(1).rendered += 1
+    >>> board.summary().rendered
+    3
+
+    :param slots: Number of slots, one for each worker.
+    :type slots: int
+    """
+
+    def __init__(self, slots):
+        self._slots = multiprocessing.sharedctypes.RawArray(RenderStats,
+                                                            slots)
+        self._levels = multiprocessing.sharedctypes.RawArray(
+            ctypes.c_longlong, slots * MAX_LEVELS)
+        self._total = multiprocessing.sharedctypes.RawValue(
+            ctypes.c_longlong, -1)
+        self._retire = multiprocessing.sharedctypes.RawArray(
+            ctypes.c_byte, slots)
+        self._rss = multiprocessing.sharedctypes.RawArray(
+            ctypes.c_longlong, slots)
+        self._held = multiprocessing.sharedctypes.RawArray(
+            ctypes.c_longlong, [-1] * slots)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def slot(self, n):
+        """Counters of the `n` th worker, a
+        :class:`~stonemason.service.renderman.RenderStats` backed by
+        shared memory."""
+        return self._slots[n]
+
+    def count_level(self, n, level):
+        """Count a metatile at given level completed by `n` th worker."""
+        if level < MAX_LEVELS:
+            self._levels[n * MAX_LEVELS + level] += 1
+
+    def retire(self, n, retire=True):
+        """Ask the `n` th worker to quit after current work unit."""
+        self._retire[n] = 1 if retire else 0
+
+    def retiring(self, n):
+        """Whether the `n` th worker is asked to quit."""
+        return self._retire[n] != 0
+
+    def set_rss(self, n, rss):
+        """Report resident memory of the `n` th worker in bytes, ``0``
+        if the worker is not running."""
+        self._rss[n] = rss
+
+    def hold(self, n, count):
+        """Report number of metatiles left in the work unit taken by the
+        `n` th worker, ``None`` after the work unit is acknowledged."""
+        self._held[n] = -1 if count is None else count
+
+    def held(self, n):
+        """Number of metatiles left in the work unit taken by the `n` th
+        worker, ``None`` if it's not holding a work unit."""
+        count = self._held[n]
+        return None if count < 0 else count
+
+    def max_rss(self):
+        """Largest resident memory of running workers in bytes."""
+        return max(self._rss) if len(self._rss) else 0
+
+    @property
+    def total(self):
+        """Expected number of metatiles to render, ``None`` if unknown."""
+        total = self._total.value
+        return None if total < 0 else total
+
+    @total.setter
+    def total(self, total):
+        self._total.value = -1 if total is None else total
+
+    def level_progress(self):
+        """Number of completed metatiles of each level.
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        levels = np.ctypeslib.as_array(self._levels)
+        return levels.reshape(-1, MAX_LEVELS).sum(axis=0)
+
+    def summary(self):
+        """Sum up counters of all workers.
+
+        :rtype: :class:`~stonemason.service.renderman.RenderStats`
+        """
+        stats = RenderStats()
+        for slot in self._slots:
+            for name, _ in RenderStats._fields_:
+                setattr(stats, name, getattr(stats, name) +
+                        getattr(slot, name))
+        # metatiles stored in background are counted by uploaders
+        stats.rendered += stats.uploaded
+        stats.failed += stats.upload_failed
+        return stats
+
+
+class StatusMonitor(threading.Thread):
+    """Report render throughput and ETA periodically.
+
+    Each report is a line like::
+
+        1840/16384 (11.2%) 24.3/s [13: 20.1/s, 14: 4.2/s] 1.52MB/s,
+        0 failed, ETA 9.97m
+
+    Throughput is measured between two reports, and ETA is estimated
+    from smoothed throughput and expected number of metatiles.
+
+    :param board: Shared render counters.
+    :type board: :class:`~stonemason.service.renderman.monitor.StatsBoard`
+    :param writer: A function to write status lines.
+    :type writer: callable
+    :param interval: Seconds between two reports.
+    :type interval: float
+    :param smoothing: Weight of latest throughput in the smoothed
+        throughput used to estimate ETA.
+    :type smoothing: float
+    """
+
+    def __init__(self, board, writer, interval=10., smoothing=0.3):
+        threading.Thread.__init__(self, name='monitor')
+        self.daemon = True
+        self._board = board
+        self._writer = writer
+        self._interval = interval
+        self._smoothing = smoothing
+        self._stopped = threading.Event()
+        self._last = None
+        self._speed = None
+
+    def run(self):
+        self.sample()
+        while not self._stopped.wait(self._interval):
+            self._writer(self.sample())
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def sample(self, now=None):
+        """Take a sample of the counters and format a status line."""
+        if now is None:
+            now = perf_counter()
+        stats = self._board.summary()
+        levels = self._board.level_progress()
+        sample = (now, stats.progress, stats.bytes, levels)
+
+        if self._last is None:
+            self._last = sample
+            return ''
+        last_time, last_progress, last_bytes, last_levels = self._last
+        self._last = sample
+
+        elapsed = max(now - last_time, 1e-6)
+        speed = (stats.progress - last_progress) / elapsed
+        if self._speed is None:
+            self._speed = speed
+        else:
+            self._speed += self._smoothing * (speed - self._speed)
+
+        total = self._board.total
+        if total is None:
+            line = '%d' % stats.progress
+        else:
+            line = '%d/%d (%.1f%%)' % (stats.progress, total,
+                                       100. * stats.progress / max(total, 1))
+
+        line += ' %.1f/s' % speed
+        level_speeds = list('%d: %.1f/s' % (level, count / elapsed)
+                            for level, count in
+                            enumerate((levels - last_levels).tolist())
+                            if count > 0)
+        if level_speeds:
+            line += ' [%s]' % ', '.join(level_speeds)
+        line += ' %.2fMB/s, %d failed' % (
+            (stats.bytes - last_bytes) / elapsed / 1048576., stats.failed)
+
+        if total is not None and self._speed > 0:
+            remaining = max(total - stats.progress, 0)
+            line += ', ETA %s' % human_duration(remaining / self._speed)
+        else:
+            line += ', ETA unknown'
+        return line
+
@@ -0,0 +1,179 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.service.renderman.renderlog
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Per metatile timing records of a render job.
+
+    The render log is a `JSON Lines` file, each renderer process appends a
+    record per metatile, eg::
+
+        {"level": 12, "index": "12/2048/1024@8", "action": "render",
+         "result": "completed", "bytes": 182301, "time": 1.52,
+         "stages": {"check": 0.01, "render": 1.32, "encode": 0.15,
+                    "hash": 0.001, "store": 0.04}}
+
+    Lines are short and each is written with a single ``write()`` as soon
+    as it's recorded to a file opened in append mode, so processes can
+    share one log file, and records of a crashed renderer are not lost.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import json
+import array
+import threading
+import collections
+
+import numpy as np
+
+from stonemason.pyramid import MetaTileIndex
+
+from .journal import STATUS_COMPLETED, STATUS_EMPTY, STATUS_FAILED
+
+#: Name of status in the render log.
+RESULT_NAMES = {
+    STATUS_COMPLETED: 'completed',
+    STATUS_EMPTY: 'empty',
+    STATUS_FAILED: 'failed',
+}
+
+
+class RenderLogWriter(object):
+    """Append per metatile timing records to a render log.
+
+    :param filename: Render log file name.
+    :type filename: str
+    """
+
+    def __init__(self, filename):
+        self._fp = open(filename, 'a')
+        self._lock = threading.Lock()
+
+    def record(self, index, action, status, stages, size=0):
+        """Record timing of a metatile.
+
+        :param index: Rendered metatile index.
+        :type index: :class:`~stonemason.pyramid.MetaTileIndex`
+        :param action: ``render`` or ``downsample``.
+        :type action: str
+        :param status: Render status.
+        :type status: int
+        :param stages: Elapsed seconds of each stage.
+        :type stages: dict
+        :param size: Size of encoded metatile in bytes.
+        :type size: int
+        """
+        assert isinstance(index, MetaTileIndex)
+        record = collections.OrderedDict([
+            ('level', index.z),
+            ('index', '%d/%d/%d@%d' % index),
+            ('action', action),
+            ('result', RESULT_NAMES.get(status, 'queued')),
+            ('bytes', size),
+            ('time', round(sum(stages.values()), 6)),
+            ('stages', collections.OrderedDict(
+                (k, round(v, 6)) for k, v in stages.items())),
+        ])
+        line = json.dumps(record) + '\n'
+        with self._lock:
+            self._fp.write(line)
+            self._fp.flush()
+
+    def close(self):
+        with self._lock:
+            self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def load_render_log(filename):
+    """Iterate records in a render log, ignores broken lines.
+
+    :rtype: iterator of dict
+    """
+    with open(filename, 'r') as fp:
+        for line in fp:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class _LevelSummary(object):
+    """Accumulates elapsed time of records at one level."""
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.time = array.array('d')
+        self.stages = collections.OrderedDict()
+
+    def add(self, record):
+        for stage in record['stages']:
+            if stage not in self.stages:
+                # records before the stage first appears took no time on it
+                self.stages[stage] = array.array('d', [0.]) * self.count
+        for stage, values in self.stages.items():
+            values.append(record['stages'].get(stage, 0.))
+        self.time.append(record['time'])
+        self.bytes += record['bytes']
+        self.count += 1
+
+
+def summarize_render_log(records, percentiles=(50, 90, 99)):
+    """Summarize render log records by level.
+
+    Records are consumed one by one, only elapsed time of each record is
+    kept in memory, so `records` can be a :func:`load_render_log` iterator
+    of a large render log.
+
+    >>> from stonemason.service.renderman.renderlog import \\
+    ...     summarize_render_log
+    >>> records = [dict(level=3, bytes=10, time=t, stages=dict(render=t))
+    ...            for t in [0.1, 0.2, 0.3]]
+    >>> summary = summarize_render_log(records)
+    >>> summary[3]['count'], summary[3]['time']['p50']
+    (3, 0.2)
+
+    :param records: Render log records.
+    :type records: iterable of dict
+    :param percentiles: Percentiles of elapsed time to calculate.
+    :type percentiles: tuple
+    :return: Summary of each level, ordered by level, contains ``count``,
+        total ``bytes``, percentiles of ``time`` and of each ``stages``.
+    :rtype: :class:`collections.OrderedDict`
+    """
+    levels = dict()
+    for record in records:
+        level = record['level']
+        if level not in levels:
+            levels[level] = _LevelSummary()
+        levels[level].add(record)
+
+    def describe(values):
+        values = np.frombuffer(values, dtype=np.float64)
+        result = collections.OrderedDict(
+            ('p%d' % p, round(float(np.percentile(values, p)), 6))
+            for p in percentiles)
+        result['max'] = round(float(values.max()), 6)
+        result['total'] = round(float(values.sum()), 6)
+        return result
+
+    summary = collections.OrderedDict()
+    for level in sorted(levels):
+        group = levels[level]
+        summary[level] = collections.OrderedDict([
+            ('count', group.count),
+            ('bytes', group.bytes),
+            ('time', describe(group.time)),
+            ('stages', collections.OrderedDict(
+                (stage, describe(values))
+                for stage, values in group.stages.items())),
+        ])
+    return summary
@@ -17,23 +17,43 @@ import multiprocessing
 import multiprocessing.pool
 import multiprocessing.sharedctypes
 import multiprocessing.queues
+import sys
 import time
 import logging
+import threading
+import collections
+
+import numpy as np
+from six.moves import queue as queue_
 
 from stonemason.mason import Mason, MapBook, MapSheet
 from stonemason.mason.theme import MemGallery, FileSystemCurator, Theme
-from stonemason.pyramid import Pyramid, MetaTileIndex
+from stonemason.pyramid import Pyramid, MetaTileIndex, MetaTileIndexArray
 from stonemason.pyramid.geo import TileMapSystem
-from stonemason.util.timer import Timer, human_duration
+from stonemason.util.timer import Timer, StageTimer, human_duration
+from stonemason.util.sysinfo import get_rss
 
 from .script import RenderScript, RenderStats
-from .walkers import create_walker
+from .walkers import create_walker, partition_sequences
+from .journal import RenderJournal, STATUS_COMPLETED, STATUS_EMPTY, \
+    STATUS_FAILED
+from .workunit import WorkUnit, chunk_indexes, split_range, ACTION_RENDER, \
+    ACTION_DOWNSAMPLE, SCHEDULE_CONTIGUOUS
+from .uploader import Uploader
+from .monitor import StatsBoard, StatusMonitor
+from .jobqueue import JobQueue, SQLiteJobQueue
+from .renderlog import RenderLogWriter
+from .autoscale import Autoscaler, IO_STAGES
 
 #
 # Constants
 #
 CPU_COUNT = multiprocessing.cpu_count()
 QUEUE_LIMIT = 100
+#: Exit code of a renderer recycled by `max_tasks` or `max_rss`.
+EXIT_RECYCLED = 75
+#: Max times a crashed renderer is restarted in the same slot.
+MAX_RESTARTS = 3
 
 #
 # Global logger
@@ -91,18 +111,135 @@ def setup_logger(log_file='render.log', debug=False, verbose=False):
     logger.addHandler(handler)
 
 
+def list_existing(storage, levels):
+    """Returns sorted Hilbert serials of metatiles already in the `storage`
+    at given `levels`, using bulk storage listing."""
+    serials = list()
+    for level in levels:
+        indexes = MetaTileIndexArray.from_indexes(storage.list_indexes(level))
+        logger.info('Found %d existing metatiles at level %d.',
+                    len(indexes), level)
+        serials.append(indexes.serial)
+
+    if not serials:
+        return np.array([], dtype=np.uint64)
+    return np.unique(np.concatenate(serials))
+
+
+def plan_stages(script, pyramid):
+    """Split the render job into a list of ``(action, levels)`` stages,
+    a stage can only start after previous stage completes.
+
+    Normally there is only one stage which renders all levels, when
+    `downsample` is set, only the deepest level is rendered from source,
+    and each upper level is downsampled from the level below it.
+    """
+    if not script.downsample:
+        return [(ACTION_RENDER, script.levels)]
+
+    levels = sorted(script.levels or pyramid.levels, reverse=True)
+    stages = [(ACTION_RENDER, levels[:1])]
+    stages.extend((ACTION_DOWNSAMPLE, [level]) for level in levels[1:])
+    return stages
+
+
+def create_work_units(script, tms, summary, partitions=1):
+    """Create work units from walker or failed metatiles in the journal,
+    returns a list of `partitions` iterators of work units, each renderer
+    works on one of them when `schedule` is ``contiguous``, and number of
+    metatiles, which is ``None`` if unknown before walking."""
+    stride = tms.pyramid.stride
+    if summary is not None and script.retry_failed:
+        indexes = MetaTileIndexArray.from_serial(summary.failed, stride)
+        if script.levels is not None:
+            indexes = indexes[np.in1d(indexes.z, script.levels)]
+        serials = indexes.serial
+        if script.shard:
+            index, count = script.shard
+            start, stop = split_range(len(serials), count)[index]
+            serials = serials[start:stop]
+        return list(
+            chunk_indexes(MetaTileIndexArray.from_serial(serials[start:stop],
+                                                         stride),
+                          stride, script.chunk_size)
+            for start, stop in split_range(len(serials), partitions)), \
+               len(serials)
+    else:
+        walker = create_walker(script, tms)
+        logger.debug('Created walker: %r', walker)
+        if walker.sized:
+            sequences = walker.sequences()
+            return list(partition_sequences(sequences, i, partitions,
+                                            script.chunk_size)
+                        for i in range(partitions)), \
+                   sum(size for size, _ in sequences)
+        if partitions == 1:
+            return [walker.work_units(script.chunk_size)], None
+        return walker.partitions(partitions, script.chunk_size), None
+
+
+def dispatch(queues, partitions):
+    """Put work units in each partition into the queue of same position.
+
+    A renderer finished its own partition takes work units from the next
+    unfinished partition, so no renderer is idle while there are still
+    metatiles to render.
+    """
+    assert len(queues) == len(partitions)
+    partitions = list(iter(partition) for partition in partitions)
+    pending = [None] * len(queues)
+
+    def next_item(n):
+        for m in list(range(n, len(partitions))) + list(range(n)):
+            if partitions[m] is None:
+                continue
+            try:
+                return next(partitions[m])
+            except StopIteration:
+                partitions[m] = None
+        return None
+
+    while True:
+        busy = False
+        for n, queue in enumerate(queues):
+            if pending[n] is None:
+                pending[n] = next_item(n)
+            if pending[n] is None:
+                continue
+            busy = True
+            try:
+                queue.put(pending[n], timeout=0.01)
+            except queue_.Full:
+                continue
+            pending[n] = None
+        if not busy:
+            break
+
+
 #
 # Process modules
 #
 
-def walker(script, queue, stats):
-    """ Spawn MetaTileIndexes into the queue using specified walker"""
+def walker(script, queues, board):
+    """ Spawn MetaTileIndexes into the queues using specified walker, there
+    is one queue per renderer when `schedule` is ``contiguous``, otherwise
+    only one shared queue, which can be a job queue shared by nodes.
+
+    Expected number of metatiles is published to the `board` as soon as
+    it's known."""
     assert isinstance(script, RenderScript)
-    assert isinstance(queue, multiprocessing.queues.Queue)
-    # assert isinstance(stats, Stats)
+    assert all(isinstance(queue, (multiprocessing.queues.Queue, JobQueue))
+               for queue in queues)
+    assert isinstance(board, StatsBoard)
 
     setup_logger(script.log_file, script.debug)
 
+    if script.job_queue and not queues[0].claim_producer():
+        # another node or a previous run fills the queue
+        logger.info('Job queue %r is filled by %s.', queues[0],
+                    queues[0].producer)
+        return
+
     mason = create_mason(script)
 
     # get map sheet
@@ -120,64 +257,419 @@ def walker(script, queue, stats):
     tms = TileMapSystem(pyramid)
     logger.debug('Created TMS: %r', tms)
 
-    # walk the pyramid
-    walker = create_walker(script, tms)
-    logger.debug('Created walker: %r', walker)
+    # load journal of previous runs
+    summary = None
+    excluded = None
+    if script.journal:
+        summary = RenderJournal(script.journal).load()
+        logger.info('Loaded journal: %r', summary)
+        excluded = summary.completed
+
+    # list metatiles already in the storage
+    if script.skip_existing:
+        existing = list_existing(map_sheet._storage,
+                                 script.levels or pyramid.levels)
+        if excluded is None:
+            excluded = existing
+        else:
+            excluded = np.union1d(excluded, existing)
+
+    logger.info('Started spawning metatiles.')
+
+    # spawned and excluded metatiles, and metatiles in walked stages,
+    # which is None if any of the walkers is not sized
+    counter = dict(spawned=0, excluded=0, expected=0)
+
+    def spawn(action, work_units):
+        for work_unit in work_units:
+            size = len(work_unit)
+            if excluded is not None:
+                work_unit = work_unit.exclude(excluded)
+                counter['excluded'] += size - (len(work_unit)
+                                               if work_unit else 0)
+                if work_unit is None:
+                    continue
+            counter['spawned'] += len(work_unit)
+            if counter['expected'] is not None:
+                board.total = counter['expected'] - counter['excluded']
+            yield action, work_unit
+
+    # walk the pyramid and put work units into the queue
+    for action, levels in plan_stages(script, pyramid):
+        logger.info('Spawning %s stage of levels %r.', action, levels)
+        partitions, size = create_work_units(script._replace(levels=levels),
+                                             tms, summary, len(queues))
+        if size is None or counter['expected'] is None:
+            counter['expected'] = None
+        else:
+            counter['expected'] += size
+        dispatch(queues, list(spawn(action, partition)
+                              for partition in partitions))
 
-    logger.info('Started spawning metatiles from #%d.' % stats.progress)
+        if script.downsample:
+            # children must be in the storage before parents are built
+            for queue in queues:
+                queue.join()
 
-    # put indexes into the queue
-    n = 0
-    for n, index in enumerate(walker, start=1):
-        # if n < stats.progress:
-        # continue
-        queue.put(index)
-    else:
-        logger.info('Stopped after spawn #%d metatiles.' % n)
+    if script.job_queue:
+        queues[0].seal()
 
+    board.total = counter['spawned']
+    logger.info('Stopped after spawn #%d metatiles.' % counter['spawned'])
 
-def renderer(script, queue, stats):
+
+def make_metatile(script, map_sheet, index, action, timer):
+    """Render or downsample a metatile without storing it."""
+    if action == ACTION_DOWNSAMPLE:
+        return map_sheet.make_downsampled_metatile(index, script.downsample,
+                                                   timer)
+    else:
+        return map_sheet.make_metatile(index, timer)
+
+
+def store_metatile(script, mason, index, action, timer):
+    """Render and store a metatile synchronously, returns status and size
+    of the metatile."""
+    map_sheet = mason[script.theme_name][script.schema_tag]
+    storage = map_sheet._storage
+
+    with timer.stage('check'):
+        if not script.skip_existing and storage.has(index):
+            return STATUS_COMPLETED, 0
+
+    metatile = make_metatile(script, map_sheet, index, action, timer)
+    if metatile is None:
+        return STATUS_EMPTY, 0
+
+    with timer.stage('store'):
+        storage.put(metatile)
+    return STATUS_COMPLETED, len(metatile.data)
+
+
+def upload_metatile(script, mason, index, action, uploader, timer):
+    """Render a metatile and queue it for background uploading, returns
+    ``None`` status if the metatile is queued, whose status and render log
+    record are written by the uploader callback later."""
+    with timer.stage('check'):
+        if not script.skip_existing and uploader.storage.has(index):
+            return STATUS_COMPLETED, 0
+
+    map_sheet = mason[script.theme_name][script.schema_tag]
+    metatile = make_metatile(script, map_sheet, index, action, timer)
+    if metatile is None:
+        return STATUS_EMPTY, 0
+
+    # stages so far, the uploader callback adds store time to them
+    context = (action, collections.OrderedDict(timer.stages))
+    # time blocked by a full upload queue
+    with timer.stage('queue'):
+        uploader.put(metatile, context)
+    return None, len(metatile.data)
+
+
+def render_metatile(script, mason, index, journal, stats,
+                    action=ACTION_RENDER, uploader=None, render_log=None):
+    assert isinstance(index, MetaTileIndex)
+
+    logger.info('Rendering %s', repr(index))
+
+    status = STATUS_FAILED
+    size = 0
+    stages = StageTimer()
+    with Timer('  %s rendered in %%(time)s' % repr(index),
+               writer=logger.info, newline=False) as timer:
+        try:
+            if uploader is not None:
+                status, size = upload_metatile(script, mason, index, action,
+                                               uploader, stages)
+            else:
+                status, size = store_metatile(script, mason, index, action,
+                                              stages)
+        except Exception as e:
+            stats.failed += 1
+            logger.exception('Error while rendering %s' % repr(index))
+        finally:
+            if journal is not None and status is not None:
+                journal.record(index, status)
+            if status != STATUS_FAILED:
+                stats.bytes += size
+            stats.io_time += sum(stages.stages.get(stage, 0.)
+                                 for stage in IO_STAGES)
+            if render_log is not None and status is not None:
+                render_log.record(index, action, status, stages.stages,
+                                  size)
+            stats.progress += 1
+
+    stats.total_time += timer.get_time()
+    if status == STATUS_COMPLETED:
+        stats.rendered += 1
+    elif status == STATUS_EMPTY:
+        stats.skipped += 1
+
+
+def renderer(script, queue, board, slot):
     assert isinstance(script, RenderScript)
-    assert isinstance(queue, multiprocessing.queues.Queue)
-    # assert isinstance(stats, Stats)
+    assert isinstance(queue, (multiprocessing.queues.Queue, JobQueue))
+    assert isinstance(board, StatsBoard)
+
+    # only this process writes to its slot
+    stats = board.slot(slot)
 
     setup_logger(script.log_file, script.debug)
 
     mason = create_mason(script)
     logger.debug('Created Mason from render script.')
 
+    journal = None
+    if script.journal:
+        journal = RenderJournal(script.journal).writer()
+
+    render_log = None
+    if script.render_log:
+        render_log = RenderLogWriter(script.render_log)
+
+    uploader = None
+    if script.uploaders > 0:
+        def uploaded(metatile, error, elapsed, context):
+            # counted by uploader as uploaded or upload_failed
+            if error is None:
+                status = STATUS_COMPLETED
+            else:
+                status = STATUS_FAILED
+                logger.error('Error while uploading %s: %s',
+                             repr(metatile.index), error)
+            if journal is not None:
+                journal.record(metatile.index, status)
+            if render_log is not None:
+                action, stages = context
+                stages['store'] = elapsed
+                render_log.record(metatile.index, action, status, stages,
+                                  len(metatile.data))
+
+        map_sheet = mason[script.theme_name][script.schema_tag]
+        uploader = Uploader(map_sheet._storage,
+                            threads=script.uploaders,
+                            callback=uploaded,
+                            stats=stats)
+        logger.debug('Started %d uploaders.', script.uploaders)
+
+    recycled = False
+    tasks = 0
+    board.set_rss(slot, get_rss())
     while True:
-        index = queue.get()
+        item = queue.get()
 
         # render completed
-        if index is None:
+        if item is None:
             break
 
-        assert isinstance(index, MetaTileIndex)
+        action, work_unit = item
+        assert isinstance(work_unit, WorkUnit)
+
+        # supervisor acknowledges the rest if this renderer crashes
+        remaining = len(work_unit)
+        board.hold(slot, remaining)
+        try:
+            for index in work_unit:
+                render_metatile(script, mason, index, journal, stats,
+                                action, uploader, render_log)
+                board.count_level(slot, index.z)
+                remaining -= 1
+                board.hold(slot, remaining)
+                if script.job_queue:
+                    # keep the lease while rendering a long work unit
+                    queue.renew()
+            if uploader is not None and \
+                    (script.downsample or script.job_queue):
+                # parents are built from stored children, and a lease
+                # can't be acknowledged before metatiles are stored
+                uploader.flush()
+        finally:
+            queue.task_done()
+            board.hold(slot, None)
+
+        # only quit between work units so no queued item is lost
+        tasks += len(work_unit)
+        if 0 < script.max_tasks <= tasks:
+            logger.info('Recycling after rendering %d metatiles.', tasks)
+            recycled = True
+            break
+        rss = get_rss()
+        board.set_rss(slot, rss)
+        if 0 < script.max_rss * 1048576 <= rss:
+            logger.info('Recycling after using %dMB memory.', rss // 1048576)
+            recycled = True
+            break
+        if board.retiring(slot):
+            logger.info('Retired by autoscaler.')
+            break
+
+    if uploader is not None:
+        uploader.close()
+    if journal is not None:
+        journal.close()
+    if render_log is not None:
+        render_log.close()
+
+    if recycled:
+        # supervisor replaces this renderer with a fresh one
+        sys.exit(EXIT_RECYCLED)
+
+
+def start_renderer(script, queue, board, slot):
+    """Start a renderer process working on given `queue` and `slot`."""
+    worker = multiprocessing.Process(name='renderer#%d' % slot,
+                                     target=renderer,
+                                     args=(script, queue, board, slot))
+    worker.daemon = True
+    worker.start()
+    return worker
+
+
+def recover(script, queue, board, n):
+    """Count metatiles left in the work unit held by the crashed `n` th
+    renderer as lost, and acknowledge the work unit on its behalf so
+    nobody waits for it forever."""
+    held = board.held(n)
+    if held is None:
+        return
+    board.hold(n, None)
+    if script.job_queue:
+        # lease expires and the work unit is taken by others
+        return
+    # the slot is not written by anyone else until a new renderer starts
+    stats = board.slot(n)
+    stats.lost += held
+    stats.failed += held
+    stats.progress += held
+    logger.error('Lost %d metatiles with renderer#%d.', held, n)
+    queue.task_done()
+
+
+def supervise(script, queues, board, workers, interval=0.5,
+              scaler=None, stopping=None):
+    """Block until all renderers exit, recycled renderers are replaced by
+    new ones taking the same queue and stats slot, and so are crashed
+    renderers, for at most `MAX_RESTARTS` times in each slot.  Work units
+    in a queue left without renderers are counted as lost.
+
+    When a `scaler` is given, renderers are started in free slots or
+    retired after current work unit to follow its decision, until
+    `stopping` is set."""
+    restarts = [0] * len(workers)
+    gave_up = set()
+    while True:
+        running = False
+        for n, worker in enumerate(workers):
+            if worker is None:
+                continue
+            queue = queues[n % len(queues)]
+            if worker.is_alive():
+                running = True
+                continue
+            crashed = worker.exitcode not in (0, EXIT_RECYCLED)
+            if crashed:
+                logger.error('Renderer#%d exited with code %r.', n,
+                             worker.exitcode)
+                recover(script, queue, board, n)
+            if board.retiring(n) or \
+                    (stopping is not None and stopping.is_set()):
+                replace = False
+            elif crashed:
+                restarts[n] += 1
+                replace = restarts[n] <= MAX_RESTARTS
+                if not replace:
+                    logger.error('Renderer#%d crashed %d times, giving up.',
+                                 n, restarts[n])
+                    gave_up.add(n)
+            else:
+                replace = worker.exitcode == EXIT_RECYCLED
+            if replace:
+                if crashed:
+                    logger.info('Restarting crashed renderer#%d.', n)
+                else:
+                    logger.info('Replacing recycled renderer#%d.', n)
+                workers[n] = start_renderer(script, queue, board, n)
+                running = True
+            else:
+                if worker.exitcode == 0 and not board.retiring(n) and \
+                        stopping is not None:
+                    # nothing left in the queue for new renderers
+                    stopping.set()
+                workers[n] = None
+                board.set_rss(n, 0)
+                board.retire(n, False)
+        if not script.job_queue:
+            # eg: private queue of a contiguous schedule
+            for n in gave_up:
+                queue = queues[n % len(queues)]
+                if not any(worker is not None and
+                           queues[m % len(queues)] is queue
+                           for m, worker in enumerate(workers)):
+                    abandon(queue, board, n)
+        if not running:
+            break
+        if scaler is not None and not stopping.is_set():
+            scale(script, queues, board, workers, scaler)
+        time.sleep(interval)
 
-        logger.info('Rendering %s', repr(index))
 
-        with Timer('  %s rendered in %%(time)s' % repr(index),
-                   writer=logger.info, newline=False) as timer:
-            try:
-                result = mason.render_metatile(script.theme_name,
-                                               script.schema_tag,
-                                               index.z,
-                                               index.x,
-                                               index.y,
-                                               index.stride)
-            except Exception as e:
-                stats.failed += 1
-                logger.exception('Error while rendering %s' % repr(index))
-            finally:
-                queue.task_done()
-                stats.progress += 1
-
-        stats.total_time += timer.get_time()
-        if result:
-            stats.rendered += 1
-        else:
-            stats.skipped += 1
+def scale(script, queues, board, workers, scaler):
+    """Start or retire renderers as decided by the `scaler`."""
+    active = list(n for n, worker in enumerate(workers)
+                  if worker is not None and not board.retiring(n))
+    target = scaler.update(board, len(active))
+    if target is None or target == len(active):
+        return
+
+    sample = scaler.sample
+    logger.info('Scaling from %d to %d renderers, cpu %.0f%%, '
+                'iowait %.0f%%, storage %.0f%% of render time.',
+                len(active), target, sample.cpu * 100,
+                sample.iowait * 100, sample.io_share * 100)
+    if target > len(active):
+        free = list(n for n, worker in enumerate(workers) if worker is None)
+        for n in free[:target - len(active)]:
+            workers[n] = start_renderer(script, queues[n % len(queues)],
+                                        board, n)
+    else:
+        # retire renderers started last
+        for n in active[target - len(active):]:
+            board.retire(n)
+
+
+def finish(script, queues, producer, workers, stopping):
+    """Wait for the producer and all queued work units, then stop
+    renderers."""
+    if producer is not None:
+        producer.join()
+    if not script.job_queue:
+        for queue in queues:
+            queue.join()
+        # no new renderers after this so each takes one sentinel
+        stopping.set()
+        # stop workers so they can flush journals
+        for n in range(len(workers)):
+            queues[n % len(queues)].put(None)
+    # otherwise workers stop after the job queue is drained
+
+
+def abandon(queue, board, n):
+    """Count work units left in the `queue` as lost, for queues nobody
+    is taking from, counters are written to the slot of the `n` th
+    renderer which must have exited."""
+    stats = board.slot(n)
+    while True:
+        try:
+            item = queue.get(timeout=0.1)
+        except queue_.Empty:
+            break
+        if item is not None:
+            _, work_unit = item
+            stats.lost += len(work_unit)
+            stats.failed += len(work_unit)
+            stats.progress += len(work_unit)
+        queue.task_done()
 
 
 #
@@ -196,48 +688,93 @@ def renderman(script):
     assert isinstance(script, RenderScript)
     setup_logger(script.log_file, script.debug)
 
-    # shared stats
-    stats = multiprocessing.sharedctypes.Value(RenderStats)
-    # job queue
-    queue = multiprocessing.JoinableQueue(maxsize=QUEUE_LIMIT)
+    if script.render_log:
+        # renderers append to the log of this run
+        open(script.render_log, 'w').close()
+
+    scaler = None
+    initial = slots = script.workers
+    if script.autoscale:
+        scaler = Autoscaler(*script.autoscale)
+        initial = scaler.clamp(script.workers)
+        slots = scaler.max_workers
+
+    # shared stats, one slot per renderer
+    board = StatsBoard(slots)
+    # job queues
+    if script.job_queue:
+        queues = [SQLiteJobQueue(script.job_queue,
+                                 lease_timeout=script.lease_timeout)]
+        if script.schedule == SCHEDULE_CONTIGUOUS:
+            logger.warning('Contiguous schedule is ignored by job queue.')
+    elif script.schedule == SCHEDULE_CONTIGUOUS and scaler is None:
+        queues = list(multiprocessing.JoinableQueue(
+            maxsize=max(2, QUEUE_LIMIT // script.workers))
+                      for _ in range(script.workers))
+    else:
+        if script.schedule == SCHEDULE_CONTIGUOUS:
+            # partitions can't follow a changing number of renderers
+            logger.warning('Contiguous schedule is ignored by autoscaling.')
+        queues = [multiprocessing.JoinableQueue(maxsize=QUEUE_LIMIT)]
 
     # start the tileindex spawner as producer
-    producer = multiprocessing.Process(name='producer',
-                                       target=walker,
-                                       args=(script, queue, stats))
-
-    producer.daemon = True
-    producer.start()
+    producer = None
+    if not script.worker_only:
+        producer = multiprocessing.Process(name='producer',
+                                           target=walker,
+                                           args=(script, queues, board))
+        producer.daemon = True
+        producer.start()
 
-    # create all renderer processes
     logging.info('Stonemason Renderman')
-    workers = []
-    for n in range(script.workers):
-        logging.info('Creating renderer#%d', n)
-        worker = multiprocessing.Process(name='renderer#%d' % n,
-                                         target=renderer,
-                                         args=(script, queue, stats))
-        worker.daemon = True
-        workers.append(worker)
 
     # wait until the queue is well populated
     for i in range(10):
+        if producer is None:
+            break
         time.sleep(0.1)
-        if not queue.empty():
+        if not queues[0].empty():
             break
 
-    # start all workers, one by one to avoid stashing io
-    for n, worker in enumerate(workers):
-        worker.start()
+    # start all workers, one by one to avoid stashing io, free slots are
+    # filled by autoscaling
+    workers = [None] * slots
+    for n in range(initial):
+        workers[n] = start_renderer(script, queues[n % len(queues)],
+                                    board, n)
         logging.info('Started renderer#%d', n)
         time.sleep(0.1)
+
+    monitor = None
+    if script.status_interval > 0:
+        monitor = StatusMonitor(board, logger.info, script.status_interval)
+        monitor.start()
     try:
-        producer.join()
-        queue.join()
+        stopping = threading.Event()
+        finisher = threading.Thread(target=finish,
+                                    args=(script, queues, producer, workers,
+                                          stopping))
+        finisher.daemon = True
+        finisher.start()
+        supervise(script, queues, board, workers, scaler=scaler,
+                  stopping=stopping)
+        finisher.join(1.)
+        if finisher.is_alive():
+            # renderers gave up, nobody is taking queued work units
+            logger.error('Renderers exited before render completes.')
+            while finisher.is_alive():
+                for queue in queues:
+                    abandon(queue, board, 0)
+                finisher.join(0.1)
     except KeyboardInterrupt:
         logger.info('Interrupted.')
     else:
-        logger.info('Completed.')
+        lost = board.summary().lost
+        if lost > 0:
+            logger.error('Completed with %d metatiles lost.', lost)
+        else:
+            logger.info('Completed.')
     finally:
-        # return unwrapped ctypes object
-        return stats.get_obj()
+        if monitor is not None:
+            monitor.stop()
+        return board.summary()
@@ -18,9 +18,20 @@ _RenderScript = collections.namedtuple(
     '''
     verbose debug
     gallery theme_name schema_tag
-    levels envelope csv_file
+    levels envelope geometry coverage csv_file expiry work_file
     workers log_file
     progress
+    journal retry_failed
+    chunk_size
+    skip_existing
+    downsample
+    uploaders
+    order schedule
+    shard
+    job_queue lease_timeout worker_only
+    render_log status_interval
+    max_tasks max_rss
+    autoscale
     ''')
 
 
@@ -59,9 +70,24 @@ class RenderScript(_RenderScript):
         a rectangular area to render.
     :type envelope: tuple
 
+    :param geometry: A `WKT` or `GeoJSON` geometry in geographic coordinate
+        system defines the area to render, overrides `envelope`.
+    :type geometry: str
+
+    :param coverage: Connection string of a feature storage, only MetaTiles
+        intersects with its data coverage are rendered.
+    :type coverage: str
+
     :param csv: A CSV file contains list of MetaTiles to render.
     :type csv: str
 
+    :param expiry: A tile expiry list file in ``z/x/y`` format, expired
+        MetaTiles and their parents are rendered.
+    :type expiry: str
+
+    :param work_file: A sorted work file created by ``tilesort`` command.
+    :type work_file: str
+
     :param workers: Number of renderer workers.
     :type workers: int
 
@@ -70,17 +96,113 @@ class RenderScript(_RenderScript):
 
     :param progress: Start render from given progress.
     :type progress: int
+
+    :param journal: Directory to keep render journal, metatiles completed
+        in journal are skipped.
+    :type journal: str
+
+    :param retry_failed: Only render metatiles failed in journal.
+    :type retry_failed: bool
+
+    :param chunk_size: Max number of metatiles sent to a renderer at once.
+    :type chunk_size: int
+
+    :param skip_existing: List the storage before rendering and skip
+        metatiles already exist, instead of checking them one by one.
+    :type skip_existing: bool
+
+    :param downsample: Only render the deepest level from source, upper
+        levels are built by downsampling metatiles of the level below
+        using given resampling filter, eg: ``bilinear``.
+    :type downsample: str
+
+    :param uploaders: Number of uploader threads in each renderer process,
+        rendered metatiles are uploaded in background so rendering and
+        uploading overlaps, ``0`` means store metatiles synchronously.
+    :type uploaders: int
+
+    :param order: Order of metatiles in a level, ``rowmajor`` or
+        ``hilbert``, the later keeps consecutive metatiles close to each
+        other.
+    :type order: str
+
+    :param schedule: How metatiles are assigned to renderers, ``shared``
+        hands work units to whichever renderer is free, ``contiguous``
+        gives each renderer its own contiguous part of every level, so
+        renderers keep spatial locality in their data caches.
+    :type schedule: str
+
+    :param shard: Only render one shard of the job as a ``(index, count)``
+        tuple, where `index` starts from ``0``, so several nodes can render
+        a job together without coordination.
+    :type shard: tuple
+
+    :param job_queue: File name of a SQLite job queue on a shared file
+        system, work units are leased from the queue so renderers on many
+        nodes render a job together, see
+        :class:`~stonemason.service.renderman.jobqueue.SQLiteJobQueue`.
+    :type job_queue: str
+
+    :param lease_timeout: Seconds a work unit leased from the job queue is
+        hidden from others, a unit not completed in time is rendered
+        again by other renderers.
+    :type lease_timeout: float
+
+    :param worker_only: Only render work units in the job queue, without
+        walking the pyramid and filling the queue.
+    :type worker_only: bool
+
+    :param render_log: File name of a `JSON Lines` log to record elapsed
+        time of each render stage and size of every metatile, see
+        :mod:`~stonemason.service.renderman.renderlog`.
+    :type render_log: str
+
+    :param status_interval: Seconds between two live status reports of
+        throughput and ETA, ``0`` disables reporting.
+    :type status_interval: float
+
+    :param max_tasks: Replace a renderer process with a new one after it
+        rendered given number of metatiles, ``0`` means never.
+    :type max_tasks: int
+
+    :param max_rss: Replace a renderer process with a new one after its
+        resident memory exceeds given megabytes, ``0`` means never.
+    :type max_rss: int
+
+    :param autoscale: A ``(min_workers, max_workers)`` tuple, adjusts
+        number of renderers within given bounds by CPU, I/O and memory
+        saturation, starting from `workers` renderers, see
+        :class:`~stonemason.service.renderman.autoscale.Autoscaler`.
+    :type autoscale: tuple
     """
 
     def __new__(cls, verbose=0, debug=False,
                 gallery='', theme_name='', schema_tag='',
-                levels=None, envelope=(), csv_file=None,
-                workers=1, log_file=None, progress=0):
+                levels=None, envelope=(), geometry=None, coverage=None,
+                csv_file=None, expiry=None, work_file=None,
+                workers=1, log_file=None, progress=0,
+                journal=None, retry_failed=False, chunk_size=8,
+                skip_existing=False, downsample=None, uploaders=0,
+                order='rowmajor', schedule='shared', shard=None,
+                job_queue=None, lease_timeout=600., worker_only=False,
+                render_log=None, status_interval=10.,
+                max_tasks=0, max_rss=0, autoscale=None):
         return _RenderScript.__new__(cls,
                                      verbose,debug,
                                      gallery, theme_name, schema_tag,
-                                     levels, envelope, csv_file,
-                                     workers, log_file, progress)
+                                     levels, envelope, geometry, coverage,
+                                     csv_file, expiry, work_file,
+                                     workers, log_file, progress,
+                                     journal, retry_failed,
+                                     chunk_size,
+                                     skip_existing, downsample,
+                                     uploaders,
+                                     order, schedule,
+                                     shard,
+                                     job_queue, lease_timeout, worker_only,
+                                     render_log, status_interval,
+                                     max_tasks, max_rss,
+                                     autoscale)
 
 
 class RenderStats(ctypes.Structure):
@@ -95,7 +217,15 @@ class RenderStats(ctypes.Structure):
         ('progress', ctypes.c_longlong),
         ('rendered', ctypes.c_longlong),
         ('failed', ctypes.c_longlong),
+        ('skipped', ctypes.c_longlong),
         ('total_time', ctypes.c_float),
+        ('uploaded', ctypes.c_longlong),
+        ('upload_retries', ctypes.c_longlong),
+        ('upload_failed', ctypes.c_longlong),
+        ('upload_time', ctypes.c_float),
+        ('bytes', ctypes.c_longlong),
+        ('io_time', ctypes.c_float),
+        ('lost', ctypes.c_longlong),
     ]
 
     def __init__(self):
@@ -107,5 +237,22 @@ class RenderStats(ctypes.Structure):
         self.rendered = 0
         #: Number of `MetaTiles` failed to render.
         self.failed = 0
+        #: Number of `MetaTiles` renderer produced nothing.
+        self.skipped = 0
         #: Total CPU time taken by renderers in seconds.
         self.total_time = 0
+        #: Number of `MetaTiles` stored by background uploaders.
+        self.uploaded = 0
+        #: Number of upload retries.
+        self.upload_retries = 0
+        #: Number of `MetaTiles` failed to upload after all retries.
+        self.upload_failed = 0
+        #: Total time spent by background uploaders in seconds.
+        self.upload_time = 0
+        #: Total size of rendered `MetaTiles` in bytes.
+        self.bytes = 0
+        #: Time renderers spent waiting for the storage in seconds.
+        self.io_time = 0
+        #: Number of `MetaTiles` lost with crashed renderers, also counted
+        #: as failed.
+        self.lost = 0
@@ -0,0 +1,314 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.service.renderman.tilesort
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Sort huge tile lists into compact work files.
+
+    A tile list is expanded into metatiles to render, which are sorted by
+    Hilbert serial and deduplicated using a external merge sort, so memory
+    usage is bounded by `run_size` no matter how large the list is.
+
+    A work file contains a header followed by sorted unique metatile
+    serials as little endian ``uint64``, so metatiles of a level is a
+    contiguous slice of the file, which is memory mapped by the walker and
+    can be easily split between renderers or nodes.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+from six.moves import xrange
+
+from stonemason.pyramid import TileIndexArray, Hilbert
+from stonemason.pyramid.serial import SERIAL_SHIFT
+
+from .expiry import parse_tile_list
+
+#: Tile list is a text file contains ``z/x/y`` or ``z,x,y`` per line.
+FORMAT_TEXT = 'text'
+#: Tile list is a binary file of packed ``(z, x, y)`` records, see
+#: :data:`TILE_RECORD`.
+FORMAT_BINARY = 'binary'
+
+#: Record of a binary tile list, ``uint8`` zoom level followed by
+#: ``uint32`` x and y, little endian and packed.
+TILE_RECORD = np.dtype([('z', 'u1'), ('x', '<u4'), ('y', '<u4')])
+
+_HEADER = struct.Struct('<8sII')
+_MAGIC = b'SMWORK\x00\x00'
+_VERSION = 1
+_SERIAL_DTYPE = np.dtype('<u8')
+
+
+class WorkFileError(Exception):
+    pass
+
+
+class WorkFile(object):
+    """A sorted work file created by :func:`sort_tile_list`.
+
+    :param filename: File name of the work file.
+    :type filename: str
+    """
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as fp:
+            header = fp.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise WorkFileError('Invalid work file "%s".' % filename)
+        magic, version, stride = _HEADER.unpack(header)
+        if magic != _MAGIC or version != _VERSION:
+            raise WorkFileError('Invalid work file "%s".' % filename)
+
+        self._filename = filename
+        self._stride = stride
+        if os.path.getsize(filename) > _HEADER.size:
+            self._serials = np.memmap(filename, dtype=_SERIAL_DTYPE,
+                                      mode='r', offset=_HEADER.size)
+        else:
+            self._serials = np.array([], dtype=_SERIAL_DTYPE)
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def stride(self):
+        return self._stride
+
+    @property
+    def serials(self):
+        """Sorted serials of metatiles, memory mapped."""
+        return self._serials
+
+    @property
+    def levels(self):
+        """Levels contain metatiles."""
+        return list(level for level in range(29)
+                    if self.level_range(level)[0] < self.level_range(level)[1])
+
+    def level_range(self, level):
+        """Position range ``(start, stop)`` of metatiles at given level."""
+        start, stop = np.searchsorted(
+            self._serials,
+            np.array([level, level + 1], dtype=np.uint64) << SERIAL_SHIFT)
+        return int(start), int(stop)
+
+    def __len__(self):
+        return len(self._serials)
+
+    def __repr__(self):
+        return 'WorkFile(%d metatiles@%d)' % (len(self), self._stride)
+
+
+def read_tile_list(filename, fmt=None, chunk_size=1000000):
+    """Read tiles in a tile list in chunks.
+
+    :param filename: File name of the tile list.
+    :type filename: str
+    :param fmt: ``text`` or ``binary``, by default, files with ``.tiles``
+        extension are binary.
+    :type fmt: str
+    :param chunk_size: Number of tiles read at once.
+    :type chunk_size: int
+    :rtype: iterator of :class:`~stonemason.pyramid.TileIndexArray`
+    """
+    if fmt is None:
+        if filename.endswith('.tiles'):
+            fmt = FORMAT_BINARY
+        else:
+            fmt = FORMAT_TEXT
+
+    if fmt == FORMAT_TEXT:
+        with open(filename, 'r') as fp:
+            for tiles in parse_tile_list(fp, chunk_size):
+                yield tiles
+    elif fmt == FORMAT_BINARY:
+        with open(filename, 'rb') as fp:
+            while True:
+                records = np.fromfile(fp, dtype=TILE_RECORD, count=chunk_size)
+                if len(records) == 0:
+                    break
+                z = records['z'].astype(np.int64)
+                valid = (z <= 28) & (records['x'] < 2 ** np.minimum(z, 28)) \
+                        & (records['y'] < 2 ** np.minimum(z, 28))
+                records = records[valid]
+                yield TileIndexArray(records['z'], records['x'],
+                                     records['y'])
+    else:
+        raise ValueError('Invalid tile list format "%s"' % fmt)
+
+
+def expand_tiles(tiles, stride, levels=None, block_size=1000000):
+    """Expand tiles into serials of metatiles covering them, same as
+    :class:`~stonemason.service.renderman.TileListWalker`.
+
+    Metatiles at each level in `levels` covering the tile is rendered,
+    if `levels` is ``None``, only metatiles of the tile at level
+    :math:`z + log_2(stride)` is rendered.
+
+    >>> from stonemason.pyramid import TileIndexArray, MetaTileIndexArray
+    >>> from stonemason.service.renderman.tilesort import expand_tiles
+    >>> for serials in expand_tiles(TileIndexArray([1], [0], [1]), 2, [3]):
+    ...     MetaTileIndexArray.from_serial(serials, 2).tolist()
+    [MetaTileIndex(3/0/4@2), MetaTileIndex(3/0/6@2), MetaTileIndex(3/2/4@2), MetaTileIndex(3/2/6@2)]
+
+    :param tiles: Tiles to expand.
+    :type tiles: :class:`~stonemason.pyramid.TileIndexArray`
+    :param stride: Stride of metatiles.
+    :type stride: int
+    :param levels: Levels to render.
+    :type levels: list or None
+    :param block_size: Max number of serials generated at once.
+    :type block_size: int
+    :return: Unsorted serials in blocks.
+    :rtype: iterator of :class:`numpy.ndarray`
+    """
+    depth = len(bin(stride)) - 3
+    for tz in np.unique(tiles.z).tolist():
+        tx = tiles.x[tiles.z == tz].astype(np.uint64)
+        ty = tiles.y[tiles.z == tz].astype(np.uint64)
+        for z in (levels if levels else [tz + depth]):
+            if z - tz < depth or z > 28:
+                continue
+            dim = np.uint64(2 ** (z - tz))
+            offsets = np.arange(0, dim, stride, dtype=np.uint64)
+            n = len(offsets)
+            if n * n <= block_size:
+                # expand many tiles at once
+                batch = block_size // (n * n)
+                for start in xrange(0, len(tx), batch):
+                    x = tx[start:start + batch, None] * dim + offsets
+                    y = ty[start:start + batch, None] * dim + offsets
+                    x, y = np.repeat(x, n, axis=1), np.tile(y, (1, n))
+                    yield Hilbert.coord2serial_array(np.repeat(z, x.size),
+                                                     x, y)
+            else:
+                # expand a few rows of a tile at once
+                rows = max(1, block_size // n)
+                for i in xrange(len(tx)):
+                    for start in xrange(0, n, rows):
+                        x = tx[i] * dim + offsets[start:start + rows]
+                        y = ty[i] * dim + offsets
+                        x, y = np.repeat(x, n), np.tile(y, len(x))
+                        yield Hilbert.coord2serial_array(
+                            np.repeat(z, len(x)), x, y)
+
+
+def sort_tile_list(filename, work_file, stride, levels=None, fmt=None,
+                   run_size=16000000, tmpdir=None):
+    """Expand a tile list into metatiles and write them into a work file,
+    sorted by Hilbert serial without duplicates.
+
+    Serials are sorted in runs of `run_size`, and runs are merged in
+    blocks, so memory usage is about ``run_size * 8`` bytes.
+
+    :param filename: File name of the tile list.
+    :type filename: str
+    :param work_file: File name of the work file to write.
+    :type work_file: str
+    :param stride: Stride of metatiles, must be same as the storage.
+    :type stride: int
+    :param levels: Levels to render, see :func:`expand_tiles`.
+    :type levels: list or None
+    :param fmt: Format of the tile list, see :func:`read_tile_list`.
+    :type fmt: str
+    :param run_size: Max number of serials sorted in memory.
+    :type run_size: int
+    :param tmpdir: Directory to keep temporary runs, default is system
+        temporary directory.
+    :type tmpdir: str
+    :return: The work file.
+    :rtype: :class:`~stonemason.service.renderman.tilesort.WorkFile`
+    """
+    rundir = tempfile.mkdtemp(prefix='tilesort', dir=tmpdir)
+    try:
+        runs = list()
+        buffer = list()
+        buffered = 0
+
+        def flush():
+            serials = np.unique(np.concatenate(buffer))
+            name = os.path.join(rundir, '%d.run' % len(runs))
+            serials.astype(_SERIAL_DTYPE).tofile(name)
+            runs.append(name)
+            del buffer[:]
+
+        for tiles in read_tile_list(filename, fmt):
+            for serials in expand_tiles(tiles, stride, levels,
+                                        min(run_size, 1000000)):
+                buffer.append(serials)
+                buffered += len(serials)
+                if buffered >= run_size:
+                    flush()
+                    buffered = 0
+        if buffer:
+            flush()
+
+        temp_name = work_file + '.tmp'
+        with open(temp_name, 'wb') as fp:
+            fp.write(_HEADER.pack(_MAGIC, _VERSION, stride))
+            arrays = list(np.memmap(name, dtype=_SERIAL_DTYPE, mode='r')
+                          for name in runs if os.path.getsize(name) > 0)
+            merge_runs(arrays, fp, max(1, run_size // max(1, len(arrays))))
+        os.rename(temp_name, work_file)
+    finally:
+        shutil.rmtree(rundir, ignore_errors=True)
+
+    return WorkFile(work_file)
+
+
+def merge_runs(runs, fp, block_size):
+    """Merge sorted unique serial arrays into a file without duplicates.
+
+    Each round reads a block from each run, everything not greater than
+    the smallest last serial of all blocks is safe to be merged.
+
+    :param runs: Sorted unique serial arrays.
+    :type runs: list of :class:`numpy.ndarray`
+    :param fp: File to write.
+    :type fp: file
+    :param block_size: Number of serials read from each run in a round.
+    :type block_size: int
+    :return: Number of serials written.
+    :rtype: int
+    """
+    positions = [0] * len(runs)
+    last = None
+    count = 0
+    while True:
+        active = list(n for n in range(len(runs))
+                      if positions[n] < len(runs[n]))
+        if not active:
+            break
+
+        blocks = dict((n, runs[n][positions[n]:positions[n] + block_size])
+                      for n in active)
+        # a run with all remaining serials in the block does not bound
+        bounds = list(blocks[n][-1] for n in active
+                      if positions[n] + block_size < len(runs[n]))
+
+        parts = list()
+        for n in active:
+            block = blocks[n]
+            if bounds:
+                block = block[:np.searchsorted(block, min(bounds), 'right')]
+            parts.append(block)
+            positions[n] += len(block)
+
+        merged = np.unique(np.concatenate(parts))
+        if last is not None and len(merged) > 0 and merged[0] == last:
+            merged = merged[1:]
+        if len(merged) > 0:
+            merged.astype(_SERIAL_DTYPE).tofile(fp)
+            last = merged[-1]
+            count += len(merged)
+
+    return count
@@ -0,0 +1,157 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.service.renderman.uploader
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Background metatile uploading.
+
+    Storing a metatile in a remote storage (eg: a S3 PUT) is mostly waiting
+    for network, so renderer processes hand encoded metatiles to a few
+    uploader threads and continue rendering, the upload queue is bounded
+    so a slow storage blocks the renderer instead of eating up memory.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import time
+import logging
+import threading
+
+from six.moves import queue as queue_
+
+from stonemason.pyramid import MetaTile
+
+
+class Uploader(object):
+    """Store metatiles using a pool of background threads.
+
+    `callback` is called as ``callback(metatile, error, elapsed, context)``
+    after a metatile is stored or finally failed, where `error` is ``None``
+    on success, `elapsed` is seconds spent storing the metatile including
+    retries, and `context` is what's given to :meth:`put`.  Callbacks are
+    serialized so they don't need to be thread safe.
+
+    >>> from stonemason.pyramid import MetaTile, MetaTileIndex
+    >>> from stonemason.service.renderman.uploader import Uploader
+    >>> class Storage(object):
+    ...     def put(self, metatile):
+    ...         print('Stored %s' % repr(metatile))
+    >>> with Uploader(Storage(), threads=1) as uploader:
+    ...     uploader.put(MetaTile(MetaTileIndex(3, 2, 2, 2)))
+    Stored MetaTile(3/2/2@2)
+
+    :param storage: Metatile storage.
+    :type storage: :class:`~stonemason.storage.tilestorage.MetaTileStorageConcept`
+    :param threads: Number of uploader threads.
+    :type threads: int
+    :param queue_size: Max number of metatiles waiting for upload,
+        :meth:`put` blocks when the queue is full, default is twice of
+        `threads`.
+    :type queue_size: int
+    :param retries: Number of retries before giving up a metatile.
+    :type retries: int
+    :param backoff: Seconds to wait before first retry, doubled on each
+        following retry.
+    :type backoff: float
+    :param callback: Called with result of each metatile.
+    :type callback: callable
+    :param stats: Optional :class:`~stonemason.service.renderman.RenderStats`
+        to update upload counters.
+    """
+
+    def __init__(self, storage, threads=4, queue_size=None, retries=3,
+                 backoff=0.5, callback=None, stats=None):
+        assert threads > 0
+        self._storage = storage
+        self._retries = retries
+        self._backoff = backoff
+        self._callback = callback
+        self._stats = stats
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(__name__)
+
+        if queue_size is None:
+            queue_size = threads * 2
+        self._queue = queue_.Queue(maxsize=queue_size)
+
+        self._threads = list()
+        for n in range(threads):
+            thread = threading.Thread(target=self._run,
+                                      name='uploader#%d' % n)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def storage(self):
+        return self._storage
+
+    def put(self, metatile, context=None):
+        """Queue a metatile for upload, blocks if the queue is full,
+        `context` is passed to the callback."""
+        assert isinstance(metatile, MetaTile)
+        self._queue.put((metatile, context))
+
+    def flush(self):
+        """Block until all queued metatiles are uploaded or failed."""
+        self._queue.join()
+
+    def close(self):
+        """Flush queued metatiles and stop uploader threads."""
+        self.flush()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        del self._threads[:]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                self._upload(*item)
+            finally:
+                self._queue.task_done()
+
+    def _upload(self, metatile, context):
+        error = None
+        start = time.time()
+        for attempt in range(self._retries + 1):
+            if attempt > 0:
+                self._logger.warning('Retry uploading %r after %s.',
+                                     metatile, error)
+                self._update_stats(upload_retries=1)
+                time.sleep(self._backoff * 2 ** (attempt - 1))
+            try:
+                self._storage.put(metatile)
+            except Exception as e:
+                error = e
+            else:
+                error = None
+                break
+
+        elapsed = time.time() - start
+        if error is None:
+            self._update_stats(uploaded=1, upload_time=elapsed)
+        else:
+            self._update_stats(upload_failed=1)
+
+        if self._callback is not None:
+            with self._lock:
+                self._callback(metatile, error, elapsed, context)
+
+    def _update_stats(self, **deltas):
+        if self._stats is None:
+            return
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self._stats, name, getattr(self._stats, name) + delta)
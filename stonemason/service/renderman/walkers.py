@@ -12,40 +12,161 @@ __author__ = 'kotaimen'
 __date__ = '4/3/15'
 
 import csv
+import json
+import functools
 import itertools
 
 import six
 from six.moves import xrange
 
-from stonemason.pyramid import MetaTileIndex
-from stonemason.pyramid.geo import TileMapSystem
+import numpy as np
+
+from stonemason.pyramid import MetaTileIndex, TileIndexArray
+from stonemason.pyramid.geo import HAS_GDAL, TileMapSystem, Envelope
+
+if HAS_GDAL:
+    from osgeo import ogr
 
 from .script import RenderScript
+from .workunit import MetaTileRange, MetaTileBlock, chunk_indexes, \
+    level_size, group_by_level, split_range, ORDER_ROW_MAJOR, ORDER_HILBERT
+from .expiry import ExpiryList
+from .tilesort import WorkFile
 
 
 class PyramidWalker(object):  # pragma: no cover
     """Walk through the pyramid and generate
     :class:`~stonemason.pyramid.MetaTileIndex` to render."""
 
+    #: Whether :meth:`work_units` is built upon :meth:`sequences`, so
+    #: number of metatiles is known before walking without extra cost.
+    sized = False
+
     def __iter__(self):
         raise StopIteration
 
+    def work_units(self, chunk_size):
+        """Generate metatiles in batches of work units, in same order as
+        iterating the walker.
+
+        :param chunk_size: Max number of metatiles in a work unit.
+        :type chunk_size: int
+        :rtype: iterator of
+            :class:`~stonemason.service.renderman.workunit.WorkUnit`
+        """
+        return chunk_indexes(self, self.stride, chunk_size)
+
+    def sequences(self):
+        """Metatiles as a list of sequences, one for each level, in same
+        order as iterating the walker.
+
+        A sequence is a ``(size, take)`` pair, where ``take(start, stop)``
+        creates a work unit of metatiles at position ``[start, stop)`` of
+        the sequence.
+
+        Default implementation keeps all metatiles in memory as serials.
 
-class CompleteWalker(object):
-    """Walk the complete pyramid."""
+        :rtype: list
+        """
+        levels = group_by_level(self.work_units(4096))
+        return list((len(serials), functools.partial(_take_block, self.stride,
+                                                      serials))
+                    for serials in levels.values())
+
+    def partitions(self, n, chunk_size):
+        """Split metatiles into `n` partitions of work units, each level
+        is split into `n` contiguous parts, and partition `i` contains
+        the `i` th part of every level.
+
+        :param n: Number of partitions.
+        :type n: int
+        :param chunk_size: Max number of metatiles in a work unit.
+        :type chunk_size: int
+        :rtype: list of iterators of
+            :class:`~stonemason.service.renderman.workunit.WorkUnit`
+        """
+        sequences = self.sequences()
+        return list(partition_sequences(sequences, i, n, chunk_size)
+                    for i in range(n))
+
+
+class CompleteWalker(PyramidWalker):
+    """Walk the complete pyramid.
 
-    def __init__(self, levels, stride):
+    Metatiles in a level are ordered by x then y, or along the Hilbert
+    curve if `order` is ``hilbert``, so consecutive metatiles are always
+    close to each other.
+    """
+
+    sized = True
+
+    def __init__(self, levels, stride, order=ORDER_ROW_MAJOR):
         self.levels = levels
         self.stride = stride
+        self.order = order
 
     def __iter__(self):
+        if self.order == ORDER_HILBERT:
+            for work_unit in self.work_units(4096):
+                for index in work_unit:
+                    yield index
+            return
+
         for level in self.levels:
             for x in xrange(0, 2 ** level, self.stride):
                 for y in xrange(0, 2 ** level, self.stride):
                     yield MetaTileIndex(level, x, y, self.stride)
 
+    def work_units(self, chunk_size):
+        # ranges are expanded by renderers, so walking is almost free
+        return partition_sequences(self.sequences(), 0, 1, chunk_size)
+
+    def sequences(self):
+        return list((level_size(level, self.stride),
+                     functools.partial(MetaTileRange, level, self.stride,
+                                       order=self.order))
+                    for level in self.levels)
+
+
+class HilbertOrderWalker(PyramidWalker):
+    """Reorder metatiles generated by another walker along the Hilbert
+    curve in each level, duplicated metatiles are removed.
+
+    All metatiles are kept in memory as serials while sorting.
+    """
+
+    sized = True
+
+    def __init__(self, walker):
+        """
+
+        :param walker: Walker generates metatiles.
+        :type walker: :class:`~stonemason.service.renderman.PyramidWalker`
+        """
+        assert isinstance(walker, PyramidWalker)
+        self.walker = walker
+        self.stride = walker.stride
+
+    def __iter__(self):
+        for work_unit in self.work_units(4096):
+            for index in work_unit:
+                yield index
+
+    def work_units(self, chunk_size):
+        return partition_sequences(self.sequences(), 0, 1, chunk_size)
+
+    def sequences(self):
+        levels = group_by_level(self.walker.work_units(4096))
+        # serial of a level is hilbert distance plus a level offset
+        return list((len(serials), functools.partial(_take_block, self.stride,
+                                                      serials))
+                    for serials in map(np.unique, levels.values()))
+
+    def __repr__(self):
+        return 'HilbertOrderWalker(%r)' % self.walker
 
-class TileListWalker(object):
+
+class TileListWalker(PyramidWalker):
     """Walked given tile list in a CSV file
 
     """
@@ -92,6 +213,364 @@ class TileListWalker(object):
                             yield MetaTileIndex(z, x, y, self.stride)
 
 
+class ExpiryWalker(PyramidWalker):
+    """Walk metatiles expired by a tile expiry list.
+
+    Listed tiles are converted to metatiles and deduplicated, expiry is
+    propagated to parent metatiles up to the lowest level in `levels`.
+    Metatiles are generated level by level, deepest level first.
+    """
+
+    def __init__(self, levels, stride, expiry_file):
+        """
+
+        :param levels: Levels to render.
+        :type levels: list
+        :param stride: Stride of the metatile to render.
+        :type stride: int
+        :param expiry_file: Expiry list file, each line is a ``z/x/y`` tile
+            coordinate.
+        :type expiry_file: str
+        """
+        self.levels = levels
+        self.stride = stride
+        self.expiry_file = expiry_file
+
+    def load(self):
+        """Read the expiry list.
+
+        :rtype: :class:`~stonemason.service.renderman.expiry.ExpiryList`
+        """
+        expiry = ExpiryList(self.stride, min_level=min(self.levels))
+        with open(self.expiry_file, 'r') as fp:
+            expiry.read(fp)
+        expiry.propagate()
+        return expiry
+
+    def __iter__(self):
+        expiry = self.load()
+        for level in expiry.levels:
+            if level in self.levels:
+                for index in expiry.metatiles(level):
+                    yield index
+
+    def work_units(self, chunk_size):
+        expiry = self.load()
+        for level in expiry.levels:
+            if level not in self.levels:
+                continue
+            serials = expiry.metatiles(level).serial
+            for start in xrange(0, len(serials), chunk_size):
+                yield MetaTileBlock(self.stride,
+                                    serials[start:start + chunk_size])
+
+
+class WorkFileWalker(PyramidWalker):
+    """Walk metatiles in a sorted work file created by
+    :func:`~stonemason.service.renderman.tilesort.sort_tile_list`.
+
+    The work file is memory mapped, metatiles are generated level by level
+    in Hilbert order without duplicates.
+    """
+
+    sized = True
+
+    def __init__(self, levels, work_file):
+        """
+
+        :param levels: Levels to render, ``None`` means all levels in the
+            work file.
+        :type levels: list or None
+        :param work_file: File name of the work file.
+        :type work_file: str
+        """
+        self.work_file = WorkFile(work_file)
+        self.stride = self.work_file.stride
+        if levels is None:
+            levels = self.work_file.levels
+        self.levels = sorted(levels)
+
+    def __iter__(self):
+        for work_unit in self.work_units(4096):
+            for index in work_unit:
+                yield index
+
+    def work_units(self, chunk_size):
+        return partition_sequences(self.sequences(), 0, 1, chunk_size)
+
+    def sequences(self):
+        sequences = list()
+        for level in self.levels:
+            start, stop = self.work_file.level_range(level)
+            sequences.append((stop - start, functools.partial(
+                _take_block, self.stride, self.work_file.serials[start:stop])))
+        return sequences
+
+    def __repr__(self):
+        return 'WorkFileWalker(%r)' % self.work_file
+
+
+class ShardWalker(PyramidWalker):
+    """Walk one of `count` disjoint shards of metatiles generated by
+    another walker.
+
+    Each level is split into `count` contiguous parts, shard `index`
+    renders the `index` th part of every level.  Shards are only decided
+    by the walker and the shard number, so nodes can render a job
+    together without any coordination.
+    """
+
+    sized = True
+
+    def __init__(self, walker, index, count):
+        """
+
+        :param walker: Walker generates metatiles.
+        :type walker: :class:`~stonemason.service.renderman.PyramidWalker`
+        :param index: Index of the shard, starts from ``0``.
+        :type index: int
+        :param count: Number of shards.
+        :type count: int
+        """
+        assert isinstance(walker, PyramidWalker)
+        assert 0 <= index < count
+        self.walker = walker
+        self.stride = walker.stride
+        self.index = index
+        self.count = count
+
+    def __iter__(self):
+        for work_unit in self.work_units(4096):
+            for index in work_unit:
+                yield index
+
+    def work_units(self, chunk_size):
+        return partition_sequences(self.sequences(), 0, 1, chunk_size)
+
+    def sequences(self):
+        sequences = list()
+        for size, take in self.walker.sequences():
+            start, stop = split_range(size, self.count)[self.index]
+            sequences.append((stop - start,
+                              functools.partial(_take_offset, take, start)))
+        return sequences
+
+    def __repr__(self):
+        return 'ShardWalker(%r, %d/%d)' % (self.walker, self.index,
+                                            self.count)
+
+
+def partition_sequences(sequences, i, n, chunk_size):
+    """Generate work units of the `i` th of `n` contiguous parts of
+    each sequence, see :meth:`PyramidWalker.sequences`."""
+    for size, take in sequences:
+        start, stop = split_range(size, n)[i]
+        for offset in xrange(start, stop, chunk_size):
+            yield take(offset, min(offset + chunk_size, stop))
+
+
+def _take_block(stride, serials, start, stop):
+    # copy so work unit don't refer to the whole array or memory map
+    return MetaTileBlock(stride, np.array(serials[start:stop]))
+
+
+def _take_offset(take, offset, start, stop):
+    return take(offset + start, offset + stop)
+
+
+class EnvelopeWalker(PyramidWalker):
+    """Walk metatiles intersecting given area.
+
+    The area is tested against the tile quadtree level by level, subtrees
+    outside of the area are pruned, subtrees completely inside the area
+    are emitted without further testing.  So the cost of walking depends
+    on the boundary of the area instead of number of metatiles.
+
+    Metatiles are generated level by level, in each level, metatiles
+    are not in any particular order.
+    """
+
+    def __init__(self, levels, stride, tms, geometry):
+        """
+
+        :param levels: Levels to render.
+        :type levels: list
+        :param stride: Stride of the metatile to render.
+        :type stride: int
+        :param tms: The `TileMapSystem` of rendering theme.
+        :type tms: :class:`~stonemason.pyramid.geo.TileMapSystem`
+        :param geometry: Area to render in geographic coordinate system,
+            either a envelope ``(left, bottom, right, top)``, a `WKT`
+            or `GeoJSON` string, or a :class:`ogr.Geometry`.
+        :type geometry: tuple or str or :class:`ogr.Geometry`
+        """
+        assert isinstance(tms, TileMapSystem)
+        self.levels = levels
+        self.stride = stride
+        self.tms = tms
+        self.geometry = self._project_geometry(load_geometry(geometry))
+
+    def _project_geometry(self, geometry):
+        tms = self.tms
+        srs = geometry.GetSpatialReference()
+        if srs is None:
+            geometry = geometry.Clone()
+            geometry.AssignSpatialReference(tms.geogcs)
+        elif not srs.IsSame(tms.geogcs):
+            geometry = geometry.Clone()
+            geometry.TransformTo(tms.geogcs)
+
+        # projections usually can't handle points out of map bounds,
+        # eg: poles in mercator
+        geometry = geometry.Intersection(tms.geog_bounds)
+        geometry.TransformTo(tms.projcs)
+        return geometry
+
+    def _classify(self, nodes):
+        # split nodes into intersecting and contained ones
+        left, right, bottom, top = self.geometry.GetEnvelope()
+        envelopes = self.tms.calc_tile_envelopes(nodes)
+
+        # cheap bounding box test first
+        mask = (envelopes[:, 0] < right) & (envelopes[:, 2] > left) & \
+               (envelopes[:, 1] < top) & (envelopes[:, 3] > bottom)
+
+        partial = np.zeros(len(nodes), dtype=bool)
+        full = np.zeros(len(nodes), dtype=bool)
+        for i in np.flatnonzero(mask):
+            envelope = Envelope(*envelopes[i]).to_geometry(self.tms.projcs)
+            if self.geometry.Contains(envelope):
+                full[i] = True
+            elif self.geometry.Intersects(envelope):
+                partial[i] = True
+
+        return nodes[partial], nodes[full]
+
+    def _walk_quadtree(self, depth):
+        # returns intersecting nodes and roots of contained subtrees of
+        # each quadtree level
+        partials = list()
+        fulls = list()
+
+        nodes = TileIndexArray([0], [0], [0])
+        for z in range(0, depth + 1):
+            partial, full = self._classify(nodes)
+            partials.append(partial)
+            fulls.append(full)
+            if len(partial) == 0:
+                break
+            nodes = partial.children()
+
+        return partials, fulls
+
+    def __iter__(self):
+        levels = sorted(self.levels)
+        if not levels:
+            return
+
+        stride_depth = len(bin(self.stride)) - 3
+        partials, fulls = self._walk_quadtree(
+            max(0, levels[-1] - stride_depth))
+
+        for level in levels:
+            # metatiles at level are tiles at node level in the quadtree
+            node_level = max(0, level - stride_depth)
+            scale = self.stride if level >= stride_depth else 0
+
+            if node_level < len(partials):
+                for x, y in zip(partials[node_level].x.tolist(),
+                                partials[node_level].y.tolist()):
+                    yield MetaTileIndex(level, x * scale, y * scale,
+                                        self.stride)
+
+            for z, full in enumerate(fulls[:node_level + 1]):
+                dim = 2 ** (node_level - z)
+                for tx, ty in zip(full.x.tolist(), full.y.tolist()):
+                    for x in xrange(tx * dim, (tx + 1) * dim):
+                        for y in xrange(ty * dim, (ty + 1) * dim):
+                            yield MetaTileIndex(level, x * scale, y * scale,
+                                                self.stride)
+
+
+class CoverageWalker(EnvelopeWalker):
+    """Walk metatiles intersecting data coverage of a feature storage.
+
+    Coverage is union of footprints in the spatial index of the storage,
+    so metatiles where no source data exists (eg: oceans for a elevation
+    dataset) are skipped without touching any data.
+    """
+
+    def __init__(self, levels, stride, tms, conn_string, geometry=None):
+        """
+
+        :param levels: Levels to render.
+        :type levels: list
+        :param stride: Stride of the metatile to render.
+        :type stride: int
+        :param tms: The `TileMapSystem` of rendering theme.
+        :type tms: :class:`~stonemason.pyramid.geo.TileMapSystem`
+        :param conn_string: Connection string of the feature storage, see
+            :func:`~stonemason.storage.featurestorage.create_feature_storage`.
+        :type conn_string: str
+        :param geometry: Optional area in geographic coordinate system to
+            further limit the coverage.
+        :type geometry: tuple or str or :class:`ogr.Geometry`
+        """
+        # import here since feature storage requires gdal
+        from stonemason.storage.featurestorage import create_feature_storage
+
+        storage = create_feature_storage(conn_string)
+        try:
+            coverage = storage.coverage()
+        finally:
+            storage.close()
+
+        if coverage is None:
+            # nothing to render
+            coverage = ogr.Geometry(ogr.wkbPolygon)
+
+        EnvelopeWalker.__init__(self, levels, stride, tms, coverage)
+
+        if geometry:
+            area = self._project_geometry(load_geometry(geometry))
+            self.geometry = self.geometry.Intersection(area)
+
+
+def load_geometry(geometry):
+    """Load a geometry from a envelope, a `WKT` or `GeoJSON` string.
+
+    For `GeoJSON`, a `Feature` or `FeatureCollection` is also accepted,
+    the later will be unioned into one geometry.
+
+    :param geometry: Envelope ``(left, bottom, right, top)``, or a geometry
+        string.
+    :type geometry: tuple or str or :class:`ogr.Geometry`
+    :rtype: :class:`ogr.Geometry`
+    """
+    if isinstance(geometry, ogr.Geometry):
+        return geometry
+
+    if not isinstance(geometry, six.string_types):
+        return Envelope(*geometry).to_geometry()
+
+    if not geometry.lstrip().startswith('{'):
+        return ogr.CreateGeometryFromWkt(geometry)
+
+    geojson = json.loads(geometry)
+    if geojson['type'] == 'Feature':
+        geojson = geojson['geometry']
+    if geojson['type'] != 'FeatureCollection':
+        return ogr.CreateGeometryFromJson(json.dumps(geojson))
+
+    union = None
+    for feature in geojson['features']:
+        part = ogr.CreateGeometryFromJson(json.dumps(feature['geometry']))
+        union = part if union is None else union.Union(part)
+    if union is None:
+        raise ValueError('Empty FeatureCollection.')
+    return union
+
+
 def create_walker(script, tms):
     """ Create a walker in one of the three modes:
 
@@ -100,9 +579,14 @@ def create_walker(script, tms):
         `csv_file` parameter is ``None``.
 
     `Envelope`
-        Render the MetaTiles intersects with given Envelope,
-        enabled when `envelope` parameter is given and  `csv_file`
-        parameter is ``None``.
+        Render the MetaTiles intersects with given Envelope or geometry,
+        enabled when `envelope` or `geometry` parameter is given and
+        `csv_file` parameter is ``None``.
+
+    `Coverage`
+        Render the MetaTiles intersects with data coverage of a feature
+        storage, enabled when `coverage` parameter is given and `csv_file`
+        parameter is ``None``, can be combined with `envelope` or `geometry`.
 
     `Predefined List`
         Render MetaTiles in a given file, which is a CSV file
@@ -110,6 +594,21 @@ def create_walker(script, tms):
         ``z, x, y``.  A row in the file means a :class:`~stonemason.pyramid.Tile`,
         with given :class:`~stonemason.pyramid.TileIndex` needs rendering.
 
+    `Expiry List`
+        Render MetaTiles expired by a ``z/x/y`` tile expiry list and their
+        parents, enabled when `expiry` parameter is given.
+
+    `Work File`
+        Render MetaTiles in a sorted work file created from a huge tile
+        list, enabled when `work_file` parameter is given.
+
+    When `order` is ``hilbert``, metatiles in each level are generated
+    along the Hilbert curve, see
+    :class:`~stonemason.service.renderman.HilbertOrderWalker`.
+
+    When `shard` is given, only metatiles in the shard are generated, see
+    :class:`~stonemason.service.renderman.ShardWalker`.
+
     :param script: Render job control.
     :type script: :class:`~stonemason.services.renderman.RenderScript`
 
@@ -122,13 +621,44 @@ def create_walker(script, tms):
     assert isinstance(script, RenderScript)
     assert isinstance(tms, TileMapSystem)
 
+    walker = _create_walker(script, tms)
+    if script.order == ORDER_HILBERT and \
+            not isinstance(walker, (CompleteWalker, WorkFileWalker)):
+        walker = HilbertOrderWalker(walker)
+    if script.shard:
+        walker = ShardWalker(walker, *script.shard)
+    return walker
+
+
+def _create_walker(script, tms):
+    if script.work_file:
+        walker = WorkFileWalker(script.levels, script.work_file)
+        if walker.stride != tms.pyramid.stride:
+            raise ValueError('Work file stride %d does not match storage '
+                             'stride %d.' % (walker.stride,
+                                             tms.pyramid.stride))
+        return walker
+
     if script.csv_file:
         return TileListWalker(script.levels, tms.pyramid.stride,
                               script.csv_file)
+
+    if script.levels is None:
+        # only replace levels to default when not rendering csv file
+        script = script._replace(levels=tms.pyramid.levels)
+
+    if script.expiry:
+        return ExpiryWalker(script.levels, tms.pyramid.stride, script.expiry)
+    elif script.coverage:
+        return CoverageWalker(script.levels, tms.pyramid.stride, tms,
+                              script.coverage,
+                              script.geometry or script.envelope)
+    elif script.geometry:
+        return EnvelopeWalker(script.levels, tms.pyramid.stride, tms,
+                              script.geometry)
     elif script.envelope:
-        raise NotImplementedError
+        return EnvelopeWalker(script.levels, tms.pyramid.stride, tms,
+                              script.envelope)
     else:
-        if script.levels is None:
-            # only replace levels to default when not rendering csv file
-            script = script._replace(levels=tms.pyramid.levels)
-        return CompleteWalker(script.levels, tms.pyramid.stride)
+        return CompleteWalker(script.levels, tms.pyramid.stride,
+                              script.order)
@@ -0,0 +1,229 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.service.renderman.workunit
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Compact batches of metatiles passed from the walker to renderers.
+
+    Instead of sending every :class:`~stonemason.pyramid.MetaTileIndex`
+    through the queue, the walker sends work units describing a batch of
+    metatiles, which are expanded by the renderer processes.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import collections
+
+import numpy as np
+
+from stonemason.pyramid import MetaTileIndexArray, hil_xy_from_s_array
+
+#: Metatiles are ordered by x then y, like nested for loops.
+ORDER_ROW_MAJOR = 'rowmajor'
+#: Metatiles are ordered along the Hilbert curve.
+ORDER_HILBERT = 'hilbert'
+
+#: All renderers take work units from one shared queue.
+SCHEDULE_SHARED = 'shared'
+#: Each renderer works on its own contiguous part of every level.
+SCHEDULE_CONTIGUOUS = 'contiguous'
+
+#: Render metatiles from source data.
+ACTION_RENDER = 'render'
+#: Build metatiles by downsampling their children in the storage.
+ACTION_DOWNSAMPLE = 'downsample'
+
+
+class WorkUnit(object):  # pragma: no cover
+    """A batch of metatiles to render."""
+
+    def indexes(self):
+        """Expand the work unit.
+
+        :rtype: :class:`~stonemason.pyramid.MetaTileIndexArray`
+        """
+        raise NotImplementedError
+
+    def serials(self):
+        """Hilbert serials of metatiles in the work unit.
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        return self.indexes().serial
+
+    def exclude(self, serials):
+        """Remove metatiles in given serials.
+
+        :param serials: Sorted Hilbert serials of metatiles to remove.
+        :type serials: :class:`numpy.ndarray`
+        :return: The work unit itself if nothing is removed, ``None`` if
+            everything is removed, otherwise a new work unit.
+        :rtype: :class:`~stonemason.service.renderman.workunit.WorkUnit`
+        """
+        mine = self.serials()
+        mask = ~sorted_isin(mine, serials)
+        if np.all(mask):
+            return self
+        elif not np.any(mask):
+            return None
+        else:
+            return MetaTileBlock(self.stride, mine[mask])
+
+    def __iter__(self):
+        return iter(self.indexes())
+
+
+class MetaTileRange(WorkUnit):
+    """A range of metatiles at one level.
+
+    Metatiles in a level are numbered by their position in given `order`,
+    the range covers positions ``[start, stop)``.
+
+    >>> from stonemason.service.renderman.workunit import MetaTileRange
+    >>> list(MetaTileRange(2, 2, 1, 4, 'rowmajor'))
+    [MetaTileIndex(2/0/2@2), MetaTileIndex(2/2/0@2), MetaTileIndex(2/2/2@2)]
+    >>> list(MetaTileRange(2, 2, 1, 4, 'hilbert'))
+    [MetaTileIndex(2/0/2@2), MetaTileIndex(2/2/2@2), MetaTileIndex(2/2/0@2)]
+
+    :param level: Zoom level.
+    :type level: int
+    :param stride: Stride of the metatiles.
+    :type stride: int
+    :param start: First position.
+    :type start: int
+    :param stop: Position after the last one.
+    :type stop: int
+    :param order: ``'rowmajor'`` or ``'hilbert'``.
+    :type order: str
+    """
+
+    def __init__(self, level, stride, start, stop, order=ORDER_ROW_MAJOR):
+        assert order in (ORDER_ROW_MAJOR, ORDER_HILBERT)
+        assert 0 <= start <= stop <= level_size(level, stride)
+        self.level = level
+        self.stride = stride
+        self.start = start
+        self.stop = stop
+        self.order = order
+
+    def indexes(self):
+        stride = min(self.stride, 2 ** self.level)
+        grid_order = self.level - (len(bin(stride)) - 3)
+
+        position = np.arange(self.start, self.stop, dtype=np.uint64)
+        if self.order == ORDER_HILBERT:
+            x, y = hil_xy_from_s_array(position, grid_order)
+        else:
+            x = position >> np.uint64(grid_order)
+            y = position & np.uint64((1 << grid_order) - 1)
+
+        return MetaTileIndexArray(np.repeat(self.level, len(position)),
+                                  x * np.uint64(stride),
+                                  y * np.uint64(stride),
+                                  stride)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __repr__(self):
+        return 'MetaTileRange(%d@%d, %d-%d, %s)' % \
+               (self.level, self.stride, self.start, self.stop, self.order)
+
+
+class MetaTileBlock(WorkUnit):
+    """A explicit list of metatiles with same stride, stored as Hilbert
+    serials.
+
+    >>> from stonemason.pyramid import MetaTileIndex
+    >>> from stonemason.service.renderman.workunit import MetaTileBlock
+    >>> block = MetaTileBlock.from_indexes(2, [MetaTileIndex(3, 2, 4, 2)])
+    >>> list(block)
+    [MetaTileIndex(3/2/4@2)]
+
+    :param stride: Stride of the metatiles.
+    :type stride: int
+    :param serials: Hilbert serials of the metatiles.
+    :type serials: :class:`numpy.ndarray`
+    """
+
+    def __init__(self, stride, serials):
+        self.stride = stride
+        self._serials = np.asarray(serials, dtype=np.uint64)
+
+    @classmethod
+    def from_indexes(cls, stride, indexes):
+        return cls(stride, list(hash(index) for index in indexes))
+
+    def indexes(self):
+        return MetaTileIndexArray.from_serial(self._serials, self.stride)
+
+    def serials(self):
+        return self._serials
+
+    def __len__(self):
+        return len(self._serials)
+
+    def __repr__(self):
+        return 'MetaTileBlock(%d metatiles@%d)' % (len(self), self.stride)
+
+
+def level_size(level, stride):
+    """Number of metatiles in a level."""
+    stride = min(stride, 2 ** level)
+    return (2 ** level // stride) ** 2
+
+
+def sorted_isin(values, sorted_values):
+    """Same as :func:`numpy.isin` but requires `sorted_values` to be
+    sorted, which is much faster when `sorted_values` is large and
+    `values` is small."""
+    if len(sorted_values) == 0:
+        return np.zeros(len(values), dtype=bool)
+    n = np.searchsorted(sorted_values, values)
+    n = np.minimum(n, len(sorted_values) - 1)
+    return sorted_values[n] == values
+
+
+def group_by_level(work_units):
+    """Collect Hilbert serials of metatiles in work units by level.
+
+    Levels and metatiles in each level are kept in the order they appear.
+
+    :return: Mapping from level to serials.
+    :rtype: :class:`collections.OrderedDict`
+    """
+    levels = collections.OrderedDict()
+    for work_unit in work_units:
+        indexes = work_unit.indexes()
+        for level in np.unique(indexes.z).tolist():
+            levels.setdefault(level, list()).append(
+                indexes.serial[indexes.z == level])
+
+    for level, serials in levels.items():
+        levels[level] = np.concatenate(serials)
+    return levels
+
+
+def split_range(size, n):
+    """Split ``[0, size)`` into `n` contiguous ``(start, stop)`` parts of
+    almost equal size.
+
+    >>> from stonemason.service.renderman.workunit import split_range
+    >>> split_range(10, 3)
+    [(0, 3), (3, 6), (6, 10)]
+    """
+    return list((size * i // n, size * (i + 1) // n) for i in range(n))
+
+
+def chunk_indexes(indexes, stride, chunk_size):
+    """Group a stream of metatile indexes into
+    :class:`~stonemason.service.renderman.workunit.MetaTileBlock`."""
+    chunk = list()
+    for index in indexes:
+        chunk.append(hash(index))
+        if len(chunk) >= chunk_size:
+            yield MetaTileBlock(stride, chunk)
+            chunk = list()
+    if chunk:
+        yield MetaTileBlock(stride, chunk)
@@ -0,0 +1,326 @@
+# -*- encoding: utf-8 -*-
+"""
+    stonemason.storage.aioconcept
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Asyncio variant of storage concepts.
+
+    Methods of an async storage are coroutines, so a single event loop can
+    keep hundreds of storage requests in flight without a thread for each
+    of them.  Keys, serializers and exceptions are shared with the
+    blocking storages in :mod:`stonemason.storage.concept`.
+
+    Requires Python 3.5 or later, this module is not imported by
+    :mod:`stonemason.storage`.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import asyncio
+import logging
+import concurrent.futures
+
+from .concept import StorageKeyConcept, ObjectSerializeConcept, \
+    PersistentStorageConcept
+
+
+class AsyncPersistentStorageConcept(object):  # pragma: no cover
+    """Async Persistent Storage Interface
+
+    Same as :class:`~stonemason.storage.PersistentStorageConcept` except
+    all methods are coroutines, and :meth:`list_keys` returns a list.
+    Storages can be used as async context managers, which closes the
+    storage on exit.
+    """
+
+    async def exists(self, key):
+        """Check whether given key exists in the storage.
+
+        :param key: A literal string that identifies the object.
+        :type key: str
+
+        :return: True if key exists.
+        :rtype: bool
+
+        """
+        raise NotImplementedError
+
+    async def retrieve(self, key, etag=None, mtime=None):
+        """Retrieve ``(blob, metadata)`` of given key, returns
+        ``(None, None)`` if the object does not exist.
+
+        Raises :exc:`~stonemason.storage.ObjectNotModified` if `etag` or
+        `mtime` is given and the stored object is not modified, see
+        :meth:`stonemason.storage.PersistentStorageConcept.retrieve`.
+
+        :param key: A literal string that identifies the object.
+        :type key: str
+
+        :param etag: ``ETag`` of the copy held by the caller.
+        :type etag: str
+
+        :param mtime: Time the copy held by the caller was retrieved.
+        :type mtime: float
+
+        :return: A tuple of binary data and its metadata dict.
+        :rtype: (bytes, dict)
+
+        """
+        raise NotImplementedError
+
+    async def store(self, key, blob, metadata):
+        """Store given `blob` and `metadata` using `key`.
+
+        :param key: A literal string that identifies the object.
+        :type key: str
+
+        :param blob: Binary data.
+        :type blob: bytes
+
+        :param metadata: Optional info of the data.
+        :type metadata: dict
+
+        """
+        raise NotImplementedError
+
+    async def retire(self, key):
+        """Delete object with given `key`.
+
+        :param key: A literal string that identifies the object.
+        :type key: str
+
+        """
+        raise NotImplementedError
+
+    async def exists_multi(self, keys):
+        """Check whether each of given keys exists, keys are checked
+        concurrently by default.
+
+        :param keys: A list of key strings.
+        :type keys: list
+
+        :return: A list of bool in the order of `keys`.
+        :rtype: list
+
+        """
+        return list(await asyncio.gather(*(self.exists(key)
+                                           for key in keys)))
+
+    async def retrieve_multi(self, keys):
+        """Retrieve ``(blob, metadata)`` of each of given keys
+        concurrently, missing objects are returned as ``(None, None)``.
+
+        :param keys: A list of key strings.
+        :type keys: list
+
+        :return: A list of ``(blob, metadata)`` in the order of `keys`.
+        :rtype: list
+
+        """
+        return list(await asyncio.gather(*(self.retrieve(key)
+                                           for key in keys)))
+
+    async def store_multi(self, items):
+        """Store a list of ``(key, blob, metadata)`` tuples concurrently.
+
+        :param items: A list of ``(key, blob, metadata)``.
+        :type items: list
+
+        """
+        await asyncio.gather(*(self.store(key, blob, metadata)
+                               for key, blob, metadata in items))
+
+    async def retire_multi(self, keys):
+        """Delete objects with given keys concurrently.
+
+        :param keys: A list of key strings.
+        :type keys: list
+
+        """
+        await asyncio.gather(*(self.retire(key) for key in keys))
+
+    async def list_keys(self, prefix):
+        """List keys start with given `prefix` in the storage.
+
+        :param prefix: Key prefix.
+        :type prefix: str
+
+        :return: A list of keys.
+        :rtype: list
+
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """Close underlying connection to storage backend."""
+        raise NotImplementedError
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class ThreadedStorage(AsyncPersistentStorageConcept):
+    """Run a blocking persistent storage in a thread pool.
+
+    Adapts storages without a native async client, eg:
+    :class:`~stonemason.storage.backends.disk.DiskStorage`, the wrapped
+    storage must be thread-safe.
+
+    :param storage: A blocking storage.
+    :type storage: :class:`~stonemason.storage.PersistentStorageConcept`
+
+    :param max_workers: Number of threads running blocking calls.
+    :type max_workers: int
+
+    """
+
+    def __init__(self, storage, max_workers=4):
+        assert isinstance(storage, PersistentStorageConcept)
+        assert max_workers >= 1
+        self._storage = storage
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+
+    async def _call(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def exists(self, key):
+        return await self._call(self._storage.exists, key)
+
+    async def retrieve(self, key, etag=None, mtime=None):
+        return await self._call(self._storage.retrieve, key, etag, mtime)
+
+    async def store(self, key, blob, metadata):
+        await self._call(self._storage.store, key, blob, metadata)
+
+    async def retire(self, key):
+        await self._call(self._storage.retire, key)
+
+    async def list_keys(self, prefix):
+        return await self._call(
+            lambda: list(self._storage.list_keys(prefix)))
+
+    async def close(self):
+        # let running calls finish without blocking the loop
+        await self._call(self._storage.close)
+        self._executor.shutdown(wait=False)
+
+
+class AsyncGenericStorageImpl(object):
+    """Async Generic Storage Implementation
+
+    Async version of :class:`~stonemason.storage.GenericStorageImpl`,
+    composed of a key concept, a serializer concept and an async
+    persistent storage.  Objects are serialized in the event loop thread.
+
+    :param key_concept: Instance of implementation of StorageKeyConcept.
+    :type key_concept: :class:`~stonemason.storage.StorageKeyConcept`
+
+    :param serializer_concept: Instance of implementation of
+        ObjectSerializeConcept.
+    :type serializer_concept: :class:`~stonemason.storage.ObjectSerializeConcept`
+
+    :param storage_concept: Instance of implementation of
+        AsyncPersistentStorageConcept.
+    :type storage_concept: :class:`~stonemason.storage.aioconcept.AsyncPersistentStorageConcept`
+
+    """
+
+    def __init__(self, key_concept, serializer_concept, storage_concept):
+        assert isinstance(key_concept, StorageKeyConcept)
+        assert isinstance(serializer_concept, ObjectSerializeConcept)
+        assert isinstance(storage_concept, AsyncPersistentStorageConcept)
+
+        self._key_mode = key_concept
+        self._serializer = serializer_concept
+        self._storage = storage_concept
+
+        self._logger = logging.getLogger(__name__)
+
+    async def has(self, index):
+        """Check whether given index exists."""
+        self._logger.debug('Has object with index %s.' % repr(index))
+        return await self._storage.exists(self._key_mode(index))
+
+    async def put(self, index, obj):
+        """Store a given object into the storage with a given index."""
+        self._logger.debug('Put object with index %s.' % repr(index))
+
+        storage_key = self._key_mode(index)
+        blob, metadata = self._serializer.save(index, obj)
+
+        await self._storage.store(storage_key, blob, metadata)
+
+    async def get(self, index, etag=None, mtime=None):
+        """Get the object with a given index."""
+        self._logger.debug('Get object with index %s.' % repr(index))
+
+        blob, metadata = await self._storage.retrieve(
+            self._key_mode(index), etag=etag, mtime=mtime)
+        if blob is None:
+            return None
+
+        return self._serializer.load(index, blob, metadata)
+
+    async def delete(self, index):
+        """Delete the object with a given index."""
+        self._logger.debug('Delete object with index %s.' % repr(index))
+        await self._storage.retire(self._key_mode(index))
+
+    async def has_multi(self, indexes):
+        """Check whether each of given indexes exists."""
+        indexes = list(indexes)
+        self._logger.debug('Has %d objects.' % len(indexes))
+        keys = list(self._key_mode(index) for index in indexes)
+        return await self._storage.exists_multi(keys)
+
+    async def put_multi(self, items):
+        """Store a list of ``(index, obj)`` tuples."""
+        items = list(items)
+        self._logger.debug('Put %d objects.' % len(items))
+        records = list()
+        for index, obj in items:
+            blob, metadata = self._serializer.save(index, obj)
+            records.append((self._key_mode(index), blob, metadata))
+        await self._storage.store_multi(records)
+
+    async def get_multi(self, indexes):
+        """Get objects with given indexes, ``None`` for missing ones."""
+        indexes = list(indexes)
+        self._logger.debug('Get %d objects.' % len(indexes))
+        keys = list(self._key_mode(index) for index in indexes)
+        objs = list()
+        for index, (blob, metadata) in \
+                zip(indexes, await self._storage.retrieve_multi(keys)):
+            if blob is None:
+                objs.append(None)
+            else:
+                objs.append(self._serializer.load(index, blob, metadata))
+        return objs
+
+    async def delete_multi(self, indexes):
+        """Delete objects with given indexes."""
+        indexes = list(indexes)
+        self._logger.debug('Delete %d objects.' % len(indexes))
+        keys = list(self._key_mode(index) for index in indexes)
+        await self._storage.retire_multi(keys)
+
+    async def list_indexes(self, hint):
+        """List indexes of stored objects."""
+        self._logger.debug('List objects with hint %s.' % repr(hint))
+
+        prefix = self._key_mode.make_prefix(hint)
+        indexes = list()
+        for key in await self._storage.list_keys(prefix):
+            index = self._key_mode.parse(key)
+            if index is not None:
+                indexes.append(index)
+        return indexes
+
+    async def close(self):
+        """Close the storage"""
+        self._logger.debug('Closing storage.')
+        await self._storage.close()
@@ -0,0 +1,214 @@
+# -*- encoding: utf-8 -*-
+"""
+    stonemason.storage.backends.aios3
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Implements asyncio s3 backend using :mod:`aiobotocore`.
+
+    Requires Python 3.5 or later and ``aiobotocore``, install with::
+
+        pip install stonemason[aio]
+
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import calendar
+import asyncio
+import datetime
+
+import six
+import botocore.exceptions
+import aiobotocore.config
+import aiobotocore.session
+
+from stonemason.util.guesstypes import guess_mimetype
+from stonemason.storage.concept import PersistentStorageError, \
+    ObjectNotModified
+from stonemason.storage.aioconcept import AsyncPersistentStorageConcept
+
+from .s3 import DELETE_BATCH_SIZE, MISSING_KEY_ERRORS, _quote_etag
+
+
+class AsyncS3Storage(AsyncPersistentStorageConcept):
+    """Async S3 Storage
+
+    Async version of :class:`~stonemason.storage.backends.s3.S3Storage`.
+    The client is created on first request in the running event loop, and
+    must be closed by :meth:`close` in the same loop.
+
+    :param access_key: AWS access key id, if set to `None`, try load
+        from environment variable ``AWS_ACCESS_KEY_ID``, or IAM role temporary
+        security credentials.
+    :type access_key: str or ``None``
+
+    :param secret_key: AWS secret key id, if set to `None`, try load
+        from environment variable ``AWS_SECRET_ACCESS_KEY``, or IAM role
+        temporary security credentials.
+    :type secret_key: str or ``None``
+
+    :param bucket: Required, s3 bucket name.
+    :type bucket: str
+
+    :param policy: Canned policy, ``private`` or ``public-read``.
+    :type policy: str
+
+    :param reduced_redundancy: Storage class of stored objects.
+    :type reduced_redundancy: str
+
+    :param max_concurrency: Maximum number of requests in flight, also
+        size of the connection pool, default is ``100``.
+    :type max_concurrency: int
+
+    :param endpoint_url: Url of a s3 compatible service, eg: a local
+        ``moto_server``, default is AWS s3.
+    :type endpoint_url: str or ``None``
+
+    :param region: AWS region name, default is resolved by botocore.
+    :type region: str or ``None``
+
+    """
+
+    def __init__(self, access_key=None, secret_key=None, bucket='my_bucket',
+                 policy='private', reduced_redundancy='STANDARD',
+                 max_concurrency=100, endpoint_url=None, region=None):
+        assert policy in ['private', 'public-read']
+        assert reduced_redundancy in ['STANDARD', 'REDUCED_REDUNDANCY',
+                                      'STANDARD_IA']
+        assert max_concurrency >= 1
+
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._bucket_name = bucket
+        self._policy = policy
+        self._storage_class = reduced_redundancy
+        self._max_concurrency = max_concurrency
+        self._endpoint_url = endpoint_url
+        self._region = region
+
+        # loop bound objects are created in the running loop
+        self._context = None
+        self._client = None
+        self._lock = None
+        self._semaphore = None
+
+    async def _get_client(self):
+        if self._client is not None:
+            return self._client
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._client is None:
+                session = aiobotocore.session.get_session()
+                context = session.create_client(
+                    's3',
+                    region_name=self._region,
+                    endpoint_url=self._endpoint_url,
+                    aws_access_key_id=self._access_key,
+                    aws_secret_access_key=self._secret_key,
+                    config=aiobotocore.config.AioConfig(
+                        max_pool_connections=self._max_concurrency))
+                self._client = await context.__aenter__()
+                self._context = context
+                self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._client
+
+    async def _call(self, operation, **params):
+        client = await self._get_client()
+        async with self._semaphore:
+            return await getattr(client, operation)(
+                Bucket=self._bucket_name, **params)
+
+    async def exists(self, key):
+        try:
+            await self._call('head_object', Key=key)
+        except botocore.exceptions.ClientError:
+            return False
+        else:
+            return True
+
+    async def retrieve(self, key, etag=None, mtime=None):
+        params = dict(Key=key)
+        if etag is not None:
+            params['IfNoneMatch'] = _quote_etag(etag)
+        if mtime is not None:
+            params['IfModifiedSince'] = datetime.datetime.utcfromtimestamp(
+                mtime)
+
+        client = await self._get_client()
+        async with self._semaphore:
+            try:
+                response = await client.get_object(
+                    Bucket=self._bucket_name, **params)
+            except botocore.exceptions.ClientError as e:
+                code = e.response.get('Error', {}).get('Code')
+                if code in ('304', 'NotModified'):
+                    raise ObjectNotModified(key)
+                if code in MISSING_KEY_ERRORS:
+                    return None, None
+                raise
+
+            # read body while holding the slot, it occupies a connection
+            body = response['Body']
+            try:
+                blob = await body.read()
+            finally:
+                body.close()
+
+        metadata = response['Metadata']
+        metadata['LastModified'] = float(
+            calendar.timegm(response['LastModified'].utctimetuple()))
+        metadata['ETag'] = response['ETag'].strip('"')
+
+        return blob, metadata
+
+    async def store(self, key, blob, metadata):
+        assert isinstance(key, six.string_types)
+        assert isinstance(blob, bytes)
+        assert isinstance(metadata, dict)
+
+        await self._call(
+            'put_object',
+            Key=key,
+            ACL=self._policy,
+            Body=blob,
+            ContentType=guess_mimetype(os.path.splitext(key)[1]),
+            Metadata=metadata,
+            StorageClass=self._storage_class,
+        )
+
+    async def retire(self, key):
+        await self._call('delete_object', Key=key)
+
+    async def retire_multi(self, keys):
+        keys = list(keys)
+        batches = list(keys[n:n + DELETE_BATCH_SIZE]
+                       for n in range(0, len(keys), DELETE_BATCH_SIZE))
+        await asyncio.gather(*(self._delete_objects(batch)
+                               for batch in batches))
+
+    async def _delete_objects(self, keys):
+        response = await self._call(
+            'delete_objects',
+            Delete={'Objects': list({'Key': key} for key in keys),
+                    'Quiet': True})
+        errors = response.get('Errors')
+        if errors:
+            raise PersistentStorageError(
+                'Failed to delete %d keys, %s: %s' % (
+                    len(errors), errors[0]['Key'], errors[0]['Message']))
+
+    async def list_keys(self, prefix):
+        client = await self._get_client()
+        paginator = client.get_paginator('list_objects_v2')
+        keys = list()
+        async for page in paginator.paginate(Bucket=self._bucket_name,
+                                             Prefix=prefix):
+            keys.extend(item['Key'] for item in page.get('Contents', []))
+        return keys
+
+    async def close(self):
+        if self._context is not None:
+            context, self._context, self._client = self._context, None, None
+            await context.__aexit__(None, None, None)
@@ -14,7 +14,8 @@ import errno
 
 from stonemason.util.tempfn import generate_temp_filename
 
-from stonemason.storage.concept import PersistentStorageConcept
+from stonemason.storage.concept import PersistentStorageConcept, \
+    ObjectNotModified
 
 
 def safe_makedirs(name):
@@ -35,22 +36,27 @@ class DiskStorage(PersistentStorageConcept):
 
     The ``DiskStorage`` uses regular filesystem as persistence backend.
 
+    Conditional retrieval only checks modification time of the file.
+
     """
 
     def exists(self, key):
         return os.path.exists(key)
 
-    def retrieve(self, key):
+    def retrieve(self, key, etag=None, mtime=None):
         pathname = key
         if not os.path.exists(pathname):
             # not exist
             return None, None
 
+        modified = os.stat(pathname).st_mtime
+        if mtime is not None and modified <= mtime:
+            raise ObjectNotModified(key)
+
         with open(pathname, 'rb') as fp:
             blob = fp.read()
-        mtime = os.stat(pathname).st_mtime
 
-        metadata = {'LastModified': mtime}
+        metadata = {'LastModified': modified}
 
         return blob, metadata
 
@@ -92,5 +98,15 @@ class DiskStorage(PersistentStorageConcept):
             else:
                 raise
 
+    def list_keys(self, prefix):
+        # like s3, prefix is not necessarily a directory, so walk its parent
+        # and match full pathname against the prefix
+        root = os.path.dirname(prefix)
+        for dirpath, dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                pathname = os.path.join(dirpath, filename)
+                if pathname.startswith(prefix):
+                    yield pathname
+
     def close(self):
         pass
@@ -0,0 +1,99 @@
+# -*- encoding: utf-8 -*-
+"""
+    stonemason.storage.backends.registry
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Backend clients shared by all storages in a process.
+
+    A gallery may create dozens of s3 storages, creating a client for each
+    of them duplicates credential resolution and connection pools.  Instead
+    storages ask the registry for a client:
+
+    - boto3 clients are thread-safe, one client is created for each set of
+      credentials and connection options, and shared by all threads.
+    - :class:`requests.Session` is not guaranteed to be thread-safe, so
+      each thread gets its own session, shared by all storages used in that
+      thread.
+
+    Clients are never shared between processes, a forked process creates
+    its own clients on first use.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import threading
+
+import requests
+import requests.adapters
+import boto3.session
+import botocore.config
+
+_lock = threading.Lock()
+_s3_clients = dict()
+_local = threading.local()
+
+
+def get_s3_client(access_key=None, secret_key=None, max_pool_connections=10):
+    """Returns a shared boto3 s3 client.
+
+    :param access_key: AWS access key id, if set to `None`, credentials
+        are resolved by boto3 from environment, configuration file or IAM
+        role.
+    :type access_key: str or ``None``
+
+    :param secret_key: AWS secret access key.
+    :type secret_key: str or ``None``
+
+    :param max_pool_connections: Size of the connection pool of the client.
+    :type max_pool_connections: int
+
+    :rtype: :class:`botocore.client.BaseClient`
+    """
+    key = (os.getpid(), access_key, secret_key, max_pool_connections)
+    with _lock:
+        client = _s3_clients.get(key)
+        if client is None:
+            # boto3 default session is not thread-safe, use a new one
+            session = boto3.session.Session(
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key)
+            client = session.client(
+                's3',
+                config=botocore.config.Config(
+                    max_pool_connections=max_pool_connections))
+            _s3_clients[key] = client
+        return client
+
+
+def get_http_session(pool_size=10):
+    """Returns a :class:`requests.Session` of current thread with
+    keep-alive connections.
+
+    :param pool_size: Maximum number of keep-alive connections to a host.
+    :type pool_size: int
+
+    :rtype: :class:`requests.Session`
+    """
+    sessions = getattr(_local, 'sessions', None)
+    if sessions is None or _local.pid != os.getpid():
+        sessions = _local.sessions = dict()
+        _local.pid = os.getpid()
+
+    session = sessions.get(pool_size)
+    if session is None:
+        session = requests.session()
+        # connections beyond the pool size are closed after use
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        sessions[pool_size] = session
+    return session
+
+
+def clear():
+    """Forget shared s3 clients and http sessions of current thread,
+    clients already handed out are not closed."""
+    with _lock:
+        _s3_clients.clear()
+    _local.sessions = None
@@ -9,9 +9,15 @@ __date__ = '10/22/15'
 
 import os
 import time
+import calendar
+import random
+import datetime
+import base64
+import hashlib
+import concurrent.futures
 import six
+import xml.etree.ElementTree
 import requests
-import boto3
 import botocore.exceptions
 
 try:
@@ -21,13 +27,80 @@ except ImportError:
     from urlparse import ParseResult, urlunparse
     from urllib import urlencode
 
-from stonemason.util.timer import timestamp2mtime
+from stonemason.util.timer import timestamp2mtime, mtime2timestamp
 from stonemason.util.guesstypes import guess_mimetype
 from stonemason.storage.concept import PersistentStorageConcept, \
-    PersistentStorageError
+    PersistentStorageError, ObjectNotModified
 
+from .registry import get_s3_client, get_http_session
 
-class S3Storage(PersistentStorageConcept):
+#: Maximum number of keys deleted by one ``DeleteObjects`` request.
+DELETE_BATCH_SIZE = 1000
+
+#: HTTP status retried by :class:`S3HttpStorage`, server errors and
+#: throttling (``503 SlowDown``).
+RETRY_STATUS = frozenset([429, 500, 502, 503, 504])
+
+#: Upper limit of seconds between two retries.
+MAX_BACKOFF = 20.
+
+#: Error codes of reading a missing key, without ``s3:ListBucket``
+#: permission s3 answers ``AccessDenied`` instead of ``NoSuchKey``.
+MISSING_KEY_ERRORS = ('NoSuchKey', '404', 'AccessDenied', '403')
+
+
+class ConcurrentStorage(PersistentStorageConcept):
+    """Base class of storages running bulk requests on a bounded thread
+    pool, requests of a ``*_multi`` call are sent concurrently by at most
+    `max_workers` threads.
+
+    The pool is created on first use, and again in forked processes.
+    """
+
+    def __init__(self, max_workers=10):
+        assert max_workers >= 1
+        self._max_workers = max_workers
+        self._executor = None
+        self._executor_pid = None
+
+    def _map(self, func, items):
+        """Call `func` on each of `items` concurrently, returns results in
+        order, the first exception raised by `func` is re-raised."""
+        items = list(items)
+        if len(items) <= 1 or self._max_workers == 1:
+            return list(map(func, items))
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_workers)
+            self._executor_pid = os.getpid()
+        return list(self._executor.map(func, items))
+
+    def exists_multi(self, keys):
+        return self._map(self.exists, keys)
+
+    def retrieve_multi(self, keys):
+        return self._map(self.retrieve, keys)
+
+    def store_multi(self, items):
+        self._map(lambda item: self.store(*item), items)
+
+    def retire_multi(self, keys):
+        keys = list(keys)
+        batches = list(keys[start:start + DELETE_BATCH_SIZE]
+                       for start in range(0, len(keys), DELETE_BATCH_SIZE))
+        self._map(self._delete_objects, batches)
+
+    def _delete_objects(self, keys):
+        """Delete a batch of keys using one request."""
+        raise NotImplementedError
+
+    def close(self):
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=True)
+        self._executor = None
+
+
+class S3Storage(ConcurrentStorage):
     """S3 Storage
 
     The ``S3Storage`` uses AWS Simple Storage Service as persistence backend.
@@ -62,47 +135,62 @@ class S3Storage(PersistentStorageConcept):
 
     :type reduced_redundancy: str
 
+    :param max_workers: Maximum number of concurrent requests sent by
+        bulk operations, also size of the connection pool, default is
+        ``10``.
+    :type max_workers: int
+
     """
 
     def __init__(self, access_key=None, secret_key=None, bucket='my_bucket',
-                 policy='private', reduced_redundancy='STANDARD'):
+                 policy='private', reduced_redundancy='STANDARD',
+                 max_workers=10):
         assert policy in ['private', 'public-read']
         assert reduced_redundancy in ['STANDARD', 'REDUCED_REDUNDANCY',
                                       'STANDARD_IA']
+        ConcurrentStorage.__init__(self, max_workers=max_workers)
 
-        self._s3 = boto3.resource('s3',
-                                  aws_access_key_id=access_key,
-                                  aws_secret_access_key=secret_key)
+        # shared by all storages using same credentials in the process
+        self._client = get_s3_client(access_key=access_key,
+                                     secret_key=secret_key,
+                                     max_pool_connections=max_workers)
 
         self._bucket_name = bucket
         self._policy = policy
         self._storage_class = reduced_redundancy
 
     def exists(self, key):
-        item = self._s3.Object(self._bucket_name, key)
         try:
-            item.load()
+            self._client.head_object(Bucket=self._bucket_name, Key=key)
         except botocore.exceptions.ClientError:
             return False
         else:
             return True
 
-    def retrieve(self, key):
-        item = self._s3.Object(self._bucket_name, key)
+    def retrieve(self, key, etag=None, mtime=None):
+        params = dict(Bucket=self._bucket_name, Key=key)
+        if etag is not None:
+            params['IfNoneMatch'] = _quote_etag(etag)
+        if mtime is not None:
+            params['IfModifiedSince'] = datetime.datetime.utcfromtimestamp(
+                mtime)
 
-        # Check key existence first otherwise get_content() will
-        # retry several times, which slows thing down a lot.
+        # a single GET, missing keys are not retried by botocore
         try:
-            item.load()
-        except botocore.exceptions.ClientError:
-            return None, None
-
-        response = item.get()
+            response = self._client.get_object(**params)
+        except botocore.exceptions.ClientError as e:
+            code = e.response.get('Error', {}).get('Code')
+            if code in ('304', 'NotModified'):
+                raise ObjectNotModified(key)
+            if code in MISSING_KEY_ERRORS:
+                return None, None
+            raise
 
         blob = response['Body'].read()
         metadata = response['Metadata']
         metadata['LastModified'] = float(
-            time.mktime(item.last_modified.utctimetuple()))
+            calendar.timegm(response['LastModified'].utctimetuple()))
+        metadata['ETag'] = response['ETag'].strip('"')
 
         return blob, metadata
 
@@ -111,8 +199,9 @@ class S3Storage(PersistentStorageConcept):
         assert isinstance(blob, bytes)
         assert isinstance(metadata, dict)
 
-        item = self._s3.Object(self._bucket_name, key)
-        item.put(
+        self._client.put_object(
+            Bucket=self._bucket_name,
+            Key=key,
             ACL=self._policy,
             Body=blob,
             ContentType=guess_mimetype(os.path.splitext(key)[1]),
@@ -121,46 +210,164 @@ class S3Storage(PersistentStorageConcept):
         )
 
     def retire(self, key):
-        item = self._s3.Object(self._bucket_name, key)
-        item.delete()
+        self._client.delete_object(Bucket=self._bucket_name, Key=key)
+
+    def _delete_objects(self, keys):
+        response = self._client.delete_objects(
+            Bucket=self._bucket_name,
+            Delete={'Objects': list({'Key': key} for key in keys),
+                    'Quiet': True})
+        errors = response.get('Errors')
+        if errors:
+            raise PersistentStorageError(
+                'Failed to delete %d keys, %s: %s' % (
+                    len(errors), errors[0]['Key'], errors[0]['Message']))
+
+    def list_keys(self, prefix):
+        paginator = self._client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self._bucket_name,
+                                       Prefix=prefix):
+            for item in page.get('Contents', []):
+                yield item['Key']
 
     def close(self):
-        del self._s3
+        ConcurrentStorage.close(self)
+        # the client is shared, connections are kept for other storages
+        del self._client
+
+
+class S3HttpStorage(ConcurrentStorage):
+    """S3 HTTP Storage
+
+    The ``S3HttpStorage`` talks to s3 using plain (unsigned) HTTP requests
+    over a pool of keep-alive connections, so the bucket must allow
+    anonymous access.  Each thread uses its own session shared by all
+    storages in the thread, see
+    :func:`~stonemason.storage.backends.registry.get_http_session`.
+
+    Options may also be strings, as they are usually parsed from a
+    storage connection string.
+
+    :param bucket: Required, s3 bucket name.
+    :type bucket: str
+
+    :param max_workers: Maximum number of concurrent requests sent by
+        bulk operations, default is ``10``.
+    :type max_workers: int
+
+    :param pool_size: Maximum number of keep-alive connections, should be
+        no less than number of threads sharing the storage, default is
+        ``10``.
+    :type pool_size: int
 
+    :param connect_timeout: Seconds to wait for establishing a
+        connection, default is ``5``.
+    :type connect_timeout: float
 
-class S3HttpStorage(PersistentStorageConcept):
-    """S3 HTTP Storage"""
+    :param read_timeout: Seconds to wait between bytes received from
+        the server, default is ``30``.
+    :type read_timeout: float
+
+    :param retries: Number of retries after a server error, throttling,
+        connection error or timeout, default is ``3``.
+    :type retries: int
+
+    :param backoff: Base seconds of exponential backoff between retries,
+        the n-th retry waits a random time up to ``backoff * 2 ** n``
+        seconds, default is ``0.1``.
+    :type backoff: float
+
+    :param scheme: ``http`` or ``https``, default is ``http``.
+    :type scheme: str
+
+    :param endpoint: Host name (and optional port) of the s3 endpoint,
+        default is ``s3.amazonaws.com``.
+    :type endpoint: str
+
+    :param virtual_host: Address the bucket as a sub domain of the
+        endpoint (``bucket.s3.amazonaws.com/key``) instead of a path
+        (``s3.amazonaws.com/bucket/key``), default is ``True``.
+    :type virtual_host: bool
+    """
 
     def __init__(self, access_key=None, secret_key=None, bucket='my_bucket',
-                 policy='private', reduced_redundancy='STANDARD'):
+                 policy='private', reduced_redundancy='STANDARD',
+                 max_workers=10, pool_size=10, connect_timeout=5.,
+                 read_timeout=30., retries=3, backoff=0.1, scheme='http',
+                 endpoint='s3.amazonaws.com', virtual_host=True):
         assert policy in ['private', 'public-read']
         assert reduced_redundancy in ['STANDARD', 'REDUCED_REDUNDANCY',
                                       'STANDARD_IA']
+        assert scheme in ['http', 'https']
+        ConcurrentStorage.__init__(self, max_workers=int(max_workers))
         self._bucket_name = bucket
         self._policy = policy
         self._storage_class = reduced_redundancy
 
-        self._session = requests.session()
+        self._scheme = scheme
+        self._endpoint = endpoint
+        self._virtual_host = _parse_bool(virtual_host)
+        self._timeout = (float(connect_timeout), float(read_timeout))
+        self._retries = int(retries)
+        self._backoff = float(backoff)
+        self._pool_size = int(pool_size)
+
+    def _get_session(self):
+        return get_http_session(self._pool_size)
 
     def _create_request_url(self, path, **query):
-        parts = ParseResult(scheme='http',
-                            netloc='.'.join(
-                                [self._bucket_name, 's3.amazonaws.com']),
+        if self._virtual_host:
+            netloc = '.'.join([self._bucket_name, self._endpoint])
+        else:
+            netloc = self._endpoint
+            path = '/%s/%s' % (self._bucket_name, path.lstrip('/'))
+        parts = ParseResult(scheme=self._scheme,
+                            netloc=netloc,
                             path=path,
                             query=urlencode(query),
                             params='', fragment='')
         url = urlunparse(parts)
         return url
 
+    def _request(self, method, url, **kwargs):
+        """Send a request with timeouts, retries server errors, throttling
+        and connection errors with jittered exponential backoff."""
+        kwargs.setdefault('timeout', self._timeout)
+        attempt = 0
+        while True:
+            try:
+                response = self._get_session().request(method, url,
+                                                       **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self._retries:
+                    raise PersistentStorageError(
+                        '%s %s failed: %s' % (method, url, e))
+            else:
+                if response.status_code not in RETRY_STATUS or \
+                        attempt >= self._retries:
+                    return response
+            # "full jitter", spreads retries of many clients
+            time.sleep(random.uniform(
+                0, min(MAX_BACKOFF, self._backoff * 2 ** attempt)))
+            attempt += 1
+
     def exists(self, key):
         url = self._create_request_url(path=key)
-        response = self._session.head(url)
+        response = self._request('HEAD', url)
         return response.status_code == requests.codes.ok
 
-    def retrieve(self, key):
+    def retrieve(self, key, etag=None, mtime=None):
         url = self._create_request_url(path=key)
 
-        response = self._session.get(url)
+        headers = dict()
+        if etag is not None:
+            headers['If-None-Match'] = _quote_etag(etag)
+        if mtime is not None:
+            headers['If-Modified-Since'] = mtime2timestamp(mtime)
+
+        response = self._request('GET', url, headers=headers)
+        if response.status_code == requests.codes.not_modified:
+            raise ObjectNotModified(key)
         if response.status_code != requests.codes.ok:
             return None, None
 
@@ -177,6 +384,9 @@ class S3HttpStorage(PersistentStorageConcept):
         else:
             metadata['LastModified'] = None
 
+        if 'ETag' in response.headers:
+            metadata['ETag'] = response.headers['ETag'].strip('"')
+
         return blob, metadata
 
     def store(self, key, blob, metadata):
@@ -195,16 +405,85 @@ class S3HttpStorage(PersistentStorageConcept):
             k = '%s%s' % ('x-amz-meta-', k)
             headers[k] = v
 
-        response = self._session.put(url, data=blob, headers=headers)
+        response = self._request('PUT', url, data=blob, headers=headers)
         if response.status_code != requests.codes.ok:
             raise PersistentStorageError(response.text)
 
     def retire(self, key):
         url = self._create_request_url(path=key)
 
-        response = self._session.delete(url)
+        response = self._request('DELETE', url)
         if response.status_code != requests.codes.no_content:
             raise PersistentStorageError(response.status_code)
 
+    def _delete_objects(self, keys):
+        root = xml.etree.ElementTree.Element('Delete')
+        xml.etree.ElementTree.SubElement(root, 'Quiet').text = 'true'
+        for key in keys:
+            element = xml.etree.ElementTree.SubElement(root, 'Object')
+            xml.etree.ElementTree.SubElement(element, 'Key').text = key
+        body = xml.etree.ElementTree.tostring(root)
+
+        url = self._create_request_url(path='/', delete='')
+        headers = {
+            'Content-MD5': base64.b64encode(
+                hashlib.md5(body).digest()).decode('ascii'),
+            'Content-Type': 'application/xml',
+        }
+        response = self._request('POST', url, data=body, headers=headers)
+        if response.status_code != requests.codes.ok:
+            raise PersistentStorageError(response.text)
+
+        errors = list(element for element in
+                      xml.etree.ElementTree.fromstring(response.content)
+                      if _strip_namespace(element.tag) == 'Error')
+        if errors:
+            error = dict((_strip_namespace(element.tag), element.text)
+                         for element in errors[0])
+            raise PersistentStorageError(
+                'Failed to delete %d keys, %s: %s' % (
+                    len(errors), error.get('Key'),
+                    error.get('Message', error.get('Code'))))
+
+    def list_keys(self, prefix):
+        query = {'list-type': '2', 'prefix': prefix}
+        while True:
+            url = self._create_request_url(path='/', **query)
+            response = self._request('GET', url)
+            if response.status_code != requests.codes.ok:
+                raise PersistentStorageError(response.text)
+
+            root = xml.etree.ElementTree.fromstring(response.content)
+            for element in root.iter():
+                if _strip_namespace(element.tag) == 'Key':
+                    yield element.text
+
+            token = None
+            for element in root:
+                if _strip_namespace(element.tag) == 'NextContinuationToken':
+                    token = element.text
+            if not token:
+                break
+            query['continuation-token'] = token
+
     def close(self):
-        self._session.close()
+        # sessions are shared with other storages
+        ConcurrentStorage.close(self)
+
+
+def _parse_bool(value):
+    if isinstance(value, six.string_types):
+        return value.lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def _quote_etag(etag):
+    # ETag headers are quoted strings
+    if etag.startswith('"'):
+        return etag
+    return '"%s"' % etag
+
+
+def _strip_namespace(tag):
+    # '{http://s3.amazonaws.com/doc/2006-03-01/}Key' -> 'Key'
+    return tag.rsplit('}', 1)[-1]
@@ -62,6 +62,15 @@ class PersistentStorageError(StorageError):
     pass
 
 
+class ObjectNotModified(StorageError):
+    """Object Not Modified
+
+    Raise by conditional retrieval when the stored object still matches
+    the copy held by the caller.
+    """
+    pass
+
+
 # ==============================================================================
 # Storage Concepts
 # ==============================================================================
@@ -84,6 +93,32 @@ class StorageKeyConcept(object):  # pragma: no cover
 
         pass
 
+    def make_prefix(self, hint):
+        """Make a key prefix shared by all keys matching given hint, used
+        to limit key listing.
+
+        :param hint: Storage specific hint, eg: zoom level.
+        :type hint: object
+
+        :return: Key prefix.
+        :rtype: str
+
+        """
+        raise NotImplementedError
+
+    def parse(self, key):
+        """Convert a key string back to index object.
+
+        :param key: A key string made by this key concept.
+        :type key: str
+
+        :return: Storage index object, or ``None`` if the key is not made
+            by this key concept.
+        :rtype: object
+
+        """
+        raise NotImplementedError
+
 
 class ObjectSerializeConcept(object):  # pragma: no cover
     """Object Serializer Interface
@@ -143,12 +178,27 @@ class PersistentStorageConcept(object):  # pragma: no cover
         """
         raise NotImplementedError
 
-    def retrieve(self, key):
-        """Retrieve ``(blob, metadata)`` of given pathname from storage.
+    def retrieve(self, key, etag=None, mtime=None):
+        """Retrieve ``(blob, metadata)`` of given pathname from storage,
+        returns ``(None, None)`` if the object does not exist.
+
+        Metadata always contains ``LastModified``, and ``ETag`` of the
+        stored data if the backend provides one.  Retrieval is conditional
+        when `etag` or `mtime` is given, and raises
+        :exc:`~stonemason.storage.ObjectNotModified` instead of returning
+        data if the stored object still has the same `etag` or is not
+        modified since `mtime`.  A backend not able to check a condition
+        without reading the object simply returns the object.
 
         :param key: A literal string that identifies the object.
         :type key: str
 
+        :param etag: ``ETag`` of the copy held by the caller.
+        :type etag: str
+
+        :param mtime: Time the copy held by the caller was retrieved.
+        :type mtime: float
+
         :return: A tuple of binary data and its metadata dict.
         :rtype: (str, dict)
 
@@ -179,6 +229,67 @@ class PersistentStorageConcept(object):  # pragma: no cover
         """
         raise NotImplementedError
 
+    def exists_multi(self, keys):
+        """Check whether each of given keys exists in the storage.
+
+        Keys are checked one by one by default, backends with high request
+        latency should override the ``*_multi`` methods and send requests
+        concurrently.
+
+        :param keys: A list of key strings.
+        :type keys: list
+
+        :return: A list of bool in the order of `keys`.
+        :rtype: list
+
+        """
+        return list(self.exists(key) for key in keys)
+
+    def retrieve_multi(self, keys):
+        """Retrieve ``(blob, metadata)`` of each of given keys, missing
+        objects are returned as ``(None, None)``.
+
+        :param keys: A list of key strings.
+        :type keys: list
+
+        :return: A list of ``(blob, metadata)`` in the order of `keys`.
+        :rtype: list
+
+        """
+        return list(self.retrieve(key) for key in keys)
+
+    def store_multi(self, items):
+        """Store a list of ``(key, blob, metadata)`` tuples.
+
+        :param items: A list of ``(key, blob, metadata)``.
+        :type items: list
+
+        """
+        for key, blob, metadata in items:
+            self.store(key, blob, metadata)
+
+    def retire_multi(self, keys):
+        """Delete objects with given keys.
+
+        :param keys: A list of key strings.
+        :type keys: list
+
+        """
+        for key in keys:
+            self.retire(key)
+
+    def list_keys(self, prefix):
+        """List keys start with given `prefix` in the storage.
+
+        :param prefix: Key prefix.
+        :type prefix: str
+
+        :return: Iterator of keys.
+        :rtype: iterator
+
+        """
+        raise NotImplementedError
+
     def close(self):
         """Close underlying connection to storage backend."""
         raise NotImplementedError
@@ -209,12 +320,22 @@ class GenericStorageConcept(object):
         """
         raise NotImplementedError
 
-    def get(self, index):
+    def get(self, index, etag=None, mtime=None):
         """Get the object with a given index.
 
+        Raises :exc:`~stonemason.storage.ObjectNotModified` if `etag` or
+        `mtime` is given and the stored object is not modified, see
+        :meth:`PersistentStorageConcept.retrieve`.
+
         :param index: Storage index object.
         :type index: object
 
+        :param etag: ``ETag`` of the copy held by the caller.
+        :type etag: str
+
+        :param mtime: Time the copy held by the caller was retrieved.
+        :type mtime: float
+
         """
         raise NotImplementedError
 
@@ -227,6 +348,62 @@ class GenericStorageConcept(object):
         """
         raise NotImplementedError
 
+    def has_multi(self, indexes):
+        """Check whether each of given indexes exists.
+
+        :param indexes: A list of storage index objects.
+        :type indexes: list
+
+        :return: A list of bool in the order of `indexes`.
+        :rtype: list
+
+        """
+        return list(self.has(index) for index in indexes)
+
+    def put_multi(self, items):
+        """Store a list of ``(index, obj)`` tuples.
+
+        :param items: A list of ``(index, obj)``.
+        :type items: list
+
+        """
+        for index, obj in items:
+            self.put(index, obj)
+
+    def get_multi(self, indexes):
+        """Get objects with given indexes, ``None`` for missing ones.
+
+        :param indexes: A list of storage index objects.
+        :type indexes: list
+
+        :return: A list of objects in the order of `indexes`.
+        :rtype: list
+
+        """
+        return list(self.get(index) for index in indexes)
+
+    def delete_multi(self, indexes):
+        """Delete objects with given indexes.
+
+        :param indexes: A list of storage index objects.
+        :type indexes: list
+
+        """
+        for index in indexes:
+            self.delete(index)
+
+    def list_indexes(self, hint):
+        """List indexes of stored objects.
+
+        :param hint: Storage specific hint limits the listing, eg: zoom level.
+        :type hint: object
+
+        :return: Iterator of storage index objects.
+        :rtype: iterator
+
+        """
+        raise NotImplementedError
+
     def close(self):
         """Close the storage"""
         raise NotImplementedError
@@ -275,13 +452,14 @@ class GenericStorageImpl(GenericStorageConcept):
 
         self._storage.store(storage_key, blob, metadata)
 
-    def get(self, index):
+    def get(self, index, etag=None, mtime=None):
         """Get the object with a given index."""
         self._logger.debug('Get object with index %s.' % repr(index))
 
         storage_key = self._key_mode(index)
 
-        blob, metadata = self._storage.retrieve(storage_key)
+        blob, metadata = self._storage.retrieve(storage_key,
+                                                etag=etag, mtime=mtime)
         if blob is None:
             return None
 
@@ -296,6 +474,54 @@ class GenericStorageImpl(GenericStorageConcept):
         storage_key = self._key_mode(index)
         self._storage.retire(storage_key)
 
+    def has_multi(self, indexes):
+        """Check whether each of given indexes exists."""
+        indexes = list(indexes)
+        self._logger.debug('Has %d objects.' % len(indexes))
+        keys = list(self._key_mode(index) for index in indexes)
+        return self._storage.exists_multi(keys)
+
+    def put_multi(self, items):
+        """Store a list of ``(index, obj)`` tuples."""
+        items = list(items)
+        self._logger.debug('Put %d objects.' % len(items))
+        records = list()
+        for index, obj in items:
+            blob, metadata = self._serializer.save(index, obj)
+            records.append((self._key_mode(index), blob, metadata))
+        self._storage.store_multi(records)
+
+    def get_multi(self, indexes):
+        """Get objects with given indexes, ``None`` for missing ones."""
+        indexes = list(indexes)
+        self._logger.debug('Get %d objects.' % len(indexes))
+        keys = list(self._key_mode(index) for index in indexes)
+        objs = list()
+        for index, (blob, metadata) in \
+                zip(indexes, self._storage.retrieve_multi(keys)):
+            if blob is None:
+                objs.append(None)
+            else:
+                objs.append(self._serializer.load(index, blob, metadata))
+        return objs
+
+    def delete_multi(self, indexes):
+        """Delete objects with given indexes."""
+        indexes = list(indexes)
+        self._logger.debug('Delete %d objects.' % len(indexes))
+        keys = list(self._key_mode(index) for index in indexes)
+        self._storage.retire_multi(keys)
+
+    def list_indexes(self, hint):
+        """List indexes of stored objects."""
+        self._logger.debug('List objects with hint %s.' % repr(hint))
+
+        prefix = self._key_mode.make_prefix(hint)
+        for key in self._storage.list_keys(prefix):
+            index = self._key_mode.parse(key)
+            if index is not None:
+                yield index
+
     def close(self):
         """Close the storage"""
         self._logger.debug('Closing storage.')
@@ -314,11 +540,14 @@ class NullStorage(GenericStorageConcept):
     def put(self, index, obj):
         return
 
-    def get(self, index):
+    def get(self, index, etag=None, mtime=None):
         return None
 
     def delete(self, index):
         return
 
+    def list_indexes(self, hint):
+        return iter([])
+
     def close(self):
         return
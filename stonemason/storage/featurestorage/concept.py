@@ -82,6 +82,14 @@ class SpatialIndexConcept(object):  # pragma: no cover
         """
         raise NotImplementedError
 
+    def coverage(self):
+        """Return union of footprints of all indexed features, in index
+        coordinate reference system, or ``None`` if the index is empty.
+
+        :rtype: :class:`ogr.Geometry`
+        """
+        raise NotImplementedError
+
     def close(self):
         """Clean up"""
         raise NotImplementedError
@@ -107,6 +115,9 @@ class FeatureStorageConcept(object):  # pragma: no cover
     def intersection(self, envelope):
         raise NotImplementedError
 
+    def coverage(self):
+        raise NotImplementedError
+
     def close(self):
         raise NotImplementedError
 
@@ -144,5 +155,8 @@ class FeatureStorageImpl(FeatureStorageConcept):
     def intersection(self, envelope):
         return list(key for key in self._indexer.intersection(envelope))
 
+    def coverage(self):
+        return self._indexer.coverage()
+
     def close(self):
         self._storage.close()
@@ -67,14 +67,18 @@ class S3RasterStorage(RasterStorageConcept):
 class S3HttpRasterStorage(RasterStorageConcept):
     def __init__(self, access_key=None, secret_key=None,
                  bucket='my_bucket', prefix='', policy='private',
-                 reduced_redundancy='STANDARD', indexname='index.shp'):
+                 reduced_redundancy='STANDARD', indexname='index.shp',
+                 **options):
+        # connection pool, timeout, retry and endpoint options, see
+        # S3HttpStorage
         sep = '/'
 
         key_mode = SimpleFeatureKeyMode(prefix=prefix, sep=sep)
         serializer = RasterFeatureSerializer()
         persistent = S3HttpStorage(access_key=access_key, secret_key=secret_key,
                                    bucket=bucket, policy=policy,
-                                   reduced_redundancy=reduced_redundancy)
+                                   reduced_redundancy=reduced_redundancy,
+                                   **options)
 
         storage = GenericStorageImpl(key_concept=key_mode,
                                      serializer_concept=serializer,
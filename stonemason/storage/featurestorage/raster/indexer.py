@@ -57,6 +57,27 @@ class ShpSpatialIndex(SpatialIndexConcept):
 
         return result
 
+    def coverage(self):
+        self._index.SetSpatialFilter(None)
+
+        footprints = ogr.Geometry(ogr.wkbMultiPolygon)
+        for feature in self._index:
+            geometry = feature.GetGeometryRef()
+            if geometry is None or not feature.GetField('location'):
+                continue
+            if geometry.GetGeometryType() == ogr.wkbMultiPolygon:
+                for i in range(geometry.GetGeometryCount()):
+                    footprints.AddGeometry(geometry.GetGeometryRef(i))
+            else:
+                footprints.AddGeometry(geometry)
+
+        if footprints.IsEmpty():
+            return None
+
+        coverage = footprints.UnionCascaded()
+        coverage.AssignSpatialReference(self._index.GetSpatialRef())
+        return coverage
+
     def close(self):
         self._index = None
         self._source = None
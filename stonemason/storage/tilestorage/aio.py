@@ -0,0 +1,336 @@
+# -*- encoding: utf-8 -*-
+"""
+    stonemason.storage.tilestorage.aio
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Asyncio metatile storage.
+
+    Same storage layout as :mod:`stonemason.storage.tilestorage`, a
+    metatile stored by a blocking storage can be read by an async storage
+    with same options, and vice versa.
+
+    Requires Python 3.5 or later, s3 storages also require ``aiobotocore``.
+    This module is not imported by :mod:`stonemason.storage.tilestorage`.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+
+import six
+
+from stonemason.pyramid import MetaTileIndex
+from stonemason.formatbundle import FormatBundle
+from stonemason.storage.backends.disk import DiskStorage
+from stonemason.storage.aioconcept import AsyncGenericStorageImpl, \
+    ThreadedStorage
+from .mapper import create_key_mode
+from .serializer import MetaTileSerializer, TileClusterSerializer
+from .concept import MetaTileStorageError, ReadOnlyMetaTileStorage, \
+    check_metatile
+
+try:
+    from stonemason.storage.backends.aios3 import AsyncS3Storage
+except ImportError:  # pragma: no cover
+    # aiobotocore not installed
+    AsyncS3Storage = None
+
+
+class AsyncMetaTileStorageConcept(object):  # pragma: no cover
+    """Async MetaTile Storage Interface
+
+    Same as :class:`~stonemason.storage.tilestorage.MetaTileStorageConcept`
+    except all methods are coroutines, and :meth:`list_indexes` returns a
+    list.
+    """
+
+    @property
+    def levels(self):
+        """Metatile levels in the storage."""
+        raise NotImplementedError
+
+    @property
+    def stride(self):
+        """Stride of metatiles in the storage."""
+        raise NotImplementedError
+
+    async def has(self, index):
+        """Check whether given index exists in the storage."""
+        raise NotImplementedError
+
+    async def get(self, index, etag=None, mtime=None):
+        """Retrieve a `MetaTile` from the storage, ``None`` if not found,
+        raises :exc:`~stonemason.storage.ObjectNotModified` if `etag` or
+        `mtime` is given and the stored metatile is not modified."""
+        raise NotImplementedError
+
+    async def put(self, metatile):
+        """Store a `MetaTile` in the storage."""
+        raise NotImplementedError
+
+    async def retire(self, index):
+        """Delete `MetaTile` with given index."""
+        raise NotImplementedError
+
+    async def has_multi(self, indexes):
+        """Check whether each of given indexes exists in the storage."""
+        raise NotImplementedError
+
+    async def get_multi(self, indexes):
+        """Retrieve a list of `MetaTile`, ``None`` for missing ones."""
+        raise NotImplementedError
+
+    async def put_multi(self, metatiles):
+        """Store a list of `MetaTile` in the storage."""
+        raise NotImplementedError
+
+    async def retire_multi(self, indexes):
+        """Delete `MetaTile` with given indexes."""
+        raise NotImplementedError
+
+    async def list_indexes(self, level):
+        """List indexes of all `MetaTile` at given level in the storage."""
+        raise NotImplementedError
+
+    async def close(self):
+        """Close underlying connection to storage backend."""
+        raise NotImplementedError
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class AsyncMetaTileStorageImpl(AsyncMetaTileStorageConcept):
+    """Async MetaTile Storage Implementation
+
+    :param storage: An async generic storage.
+    :type storage: :class:`~stonemason.storage.aioconcept.AsyncGenericStorageImpl`
+
+    :param levels: Zoom levels of the pyramid.
+    :type levels: list
+
+    :param stride: Stride of the MetaTile in this pyramid.
+    :type stride: int
+
+    :param readonly: Disable write access of the storage.
+    :type readonly: bool
+
+    """
+
+    def __init__(self, storage, levels=range(0, 23), stride=1, readonly=False):
+        assert isinstance(storage, AsyncGenericStorageImpl)
+
+        self._levels = levels
+        self._stride = stride
+        self._readonly = readonly
+        self._storage = storage
+
+    @property
+    def levels(self):
+        return self._levels
+
+    @property
+    def stride(self):
+        return self._stride
+
+    async def has(self, index):
+        assert isinstance(index, MetaTileIndex)
+
+        return await self._storage.has(index)
+
+    async def get(self, index, etag=None, mtime=None):
+        assert isinstance(index, MetaTileIndex)
+
+        return await self._storage.get(index, etag=etag, mtime=mtime)
+
+    async def put(self, metatile):
+        check_metatile(metatile, self._levels, self._stride, self._readonly)
+
+        await self._storage.put(metatile.index, metatile)
+
+    async def retire(self, index):
+        assert isinstance(index, MetaTileIndex)
+
+        if self._readonly:
+            raise ReadOnlyMetaTileStorage
+
+        await self._storage.delete(index)
+
+    async def has_multi(self, indexes):
+        indexes = list(indexes)
+        assert all(isinstance(index, MetaTileIndex) for index in indexes)
+
+        return await self._storage.has_multi(indexes)
+
+    async def get_multi(self, indexes):
+        indexes = list(indexes)
+        assert all(isinstance(index, MetaTileIndex) for index in indexes)
+
+        return await self._storage.get_multi(indexes)
+
+    async def put_multi(self, metatiles):
+        metatiles = list(metatiles)
+        for metatile in metatiles:
+            check_metatile(metatile, self._levels, self._stride,
+                           self._readonly)
+
+        await self._storage.put_multi(list((metatile.index, metatile)
+                                           for metatile in metatiles))
+
+    async def retire_multi(self, indexes):
+        indexes = list(indexes)
+        assert all(isinstance(index, MetaTileIndex) for index in indexes)
+
+        if self._readonly:
+            raise ReadOnlyMetaTileStorage
+
+        await self._storage.delete_multi(indexes)
+
+    async def list_indexes(self, level):
+        stride = min(self._stride, 2 ** level)
+        return list(index for index in await self._storage.list_indexes(level)
+                    if index.z == level and index.stride == stride)
+
+    async def close(self):
+        await self._storage.close()
+
+
+def _create_s3_storage(**kwargs):
+    if AsyncS3Storage is None:
+        raise MetaTileStorageError('aiobotocore is required by async s3 '
+                                   'storages.')
+    return AsyncS3Storage(**kwargs)
+
+
+class AsyncS3MetaTileStorage(AsyncMetaTileStorageImpl):
+    """Store `MetaTile` on AWS S3 asynchronously.
+
+    Accepts same parameters as
+    :class:`~stonemason.storage.tilestorage.S3MetaTileStorage`, except
+    `max_workers` is replaced by:
+
+    :param max_concurrency: Maximum number of s3 requests in flight,
+        default is ``100``.
+    :type max_concurrency: int
+
+    :param endpoint_url: Url of a s3 compatible service, default is AWS s3.
+    :type endpoint_url: str or ``None``
+
+    :param region: AWS region name.
+    :type region: str or ``None``
+
+    """
+
+    def __init__(self, access_key=None, secret_key=None,
+                 bucket='my_bucket', policy='private',
+                 reduced_redundancy='STANDARD',
+                 key_mode='simple', prefix='my_storage',
+                 levels=range(0, 22), stride=1, format=None,
+                 readonly=False, max_concurrency=100, endpoint_url=None,
+                 region=None):
+        if not isinstance(format, FormatBundle):
+            raise MetaTileStorageError('Must specify format explicitly.')
+
+        key_mode = create_key_mode(key_mode, prefix=prefix,
+                                   extension=format.tile_format.extension,
+                                   sep='/')
+        serializer = MetaTileSerializer(mimetype=format.tile_format.mimetype)
+
+        persistent = _create_s3_storage(
+            access_key=access_key, secret_key=secret_key, bucket=bucket,
+            policy=policy, reduced_redundancy=reduced_redundancy,
+            max_concurrency=max_concurrency, endpoint_url=endpoint_url,
+            region=region)
+
+        storage = AsyncGenericStorageImpl(key_concept=key_mode,
+                                          serializer_concept=serializer,
+                                          storage_concept=persistent)
+
+        AsyncMetaTileStorageImpl.__init__(self, storage,
+                                          levels=levels, stride=stride,
+                                          readonly=readonly)
+
+
+class AsyncS3ClusterStorage(AsyncMetaTileStorageImpl):
+    """Store `TileCluster` on AWS S3 asynchronously.
+
+    Accepts same parameters as
+    :class:`~stonemason.storage.tilestorage.S3ClusterStorage`, with
+    `max_workers` replaced as in :class:`AsyncS3MetaTileStorage`.
+    """
+
+    def __init__(self, access_key=None, secret_key=None,
+                 bucket='my_bucket', policy='private',
+                 reduced_redundancy='STANDARD',
+                 key_mode='simple', prefix='my_storage',
+                 levels=range(0, 22), stride=1, format=None,
+                 readonly=False, compressed=False, max_concurrency=100,
+                 endpoint_url=None, region=None):
+        if not isinstance(format, FormatBundle):
+            raise MetaTileStorageError('Must specify format explicitly.')
+
+        key_mode = create_key_mode(key_mode, prefix=prefix,
+                                   extension='.zip',
+                                   sep='/')
+
+        serializer = TileClusterSerializer(
+            compressed=compressed,
+            writer=format.writer,
+            mimetype=format.tile_format.mimetype)
+
+        persistent = _create_s3_storage(
+            access_key=access_key, secret_key=secret_key, bucket=bucket,
+            policy=policy, reduced_redundancy=reduced_redundancy,
+            max_concurrency=max_concurrency, endpoint_url=endpoint_url,
+            region=region)
+
+        storage = AsyncGenericStorageImpl(key_concept=key_mode,
+                                          serializer_concept=serializer,
+                                          storage_concept=persistent)
+
+        AsyncMetaTileStorageImpl.__init__(self, storage,
+                                          levels=levels, stride=stride,
+                                          readonly=readonly)
+
+
+class AsyncDiskMetaTileStorage(AsyncMetaTileStorageImpl):
+    """Store `MetaTile` on a file system, file operations run in a thread
+    pool.
+
+    Accepts same parameters as
+    :class:`~stonemason.storage.tilestorage.DiskMetaTileStorage`, and:
+
+    :param max_workers: Number of threads running file operations,
+        default is ``4``.
+    :type max_workers: int
+
+    """
+
+    def __init__(self, root='.', dir_mode='hilbert',
+                 levels=range(0, 22), stride=1,
+                 format=None, readonly=False, gzip=False, max_workers=4):
+        assert isinstance(root, six.string_types)
+        if not isinstance(format, FormatBundle):
+            raise MetaTileStorageError('Must specify format explicitly.')
+        if not os.path.isabs(root):
+            raise MetaTileStorageError('Only accepts an absolute path.')
+
+        key_mode = create_key_mode(dir_mode, prefix=root,
+                                   extension=format.tile_format.extension,
+                                   sep=os.sep, gzip=gzip)
+
+        serializer = MetaTileSerializer(
+            gzip=gzip, mimetype=format.tile_format.mimetype)
+
+        persistent = ThreadedStorage(DiskStorage(), max_workers=max_workers)
+
+        storage = AsyncGenericStorageImpl(key_concept=key_mode,
+                                          serializer_concept=serializer,
+                                          storage_concept=persistent)
+
+        AsyncMetaTileStorageImpl.__init__(self, storage,
+                                          levels=levels, stride=stride,
+                                          readonly=readonly)
@@ -40,12 +40,16 @@ class Clusterfier(ClusterStorage):
     def stride(self):
         return self._storage.stride
 
-    def get(self, index):
-        metatile = self._storage.get(index)
+    def _clusterify(self, metatile):
+        cluster = TileCluster.from_metatile(metatile, self._writer)
+        # revalidated by etag of the metatile in the underlying storage
+        return TileCluster(cluster.index, cluster.tiles, etag=metatile.etag)
+
+    def get(self, index, etag=None, mtime=None):
+        metatile = self._storage.get(index, etag=etag, mtime=mtime)
         if metatile is None:
             return None
-        cluster = TileCluster.from_metatile(metatile, self._writer)
-        return cluster
+        return self._clusterify(metatile)
 
     def put(self, metatile):
         self._storage.put(metatile)
@@ -56,5 +60,22 @@ class Clusterfier(ClusterStorage):
     def retire(self, index):
         self._storage.retire(index)
 
+    def get_multi(self, indexes):
+        return list(None if metatile is None else
+                    self._clusterify(metatile)
+                    for metatile in self._storage.get_multi(indexes))
+
+    def put_multi(self, metatiles):
+        self._storage.put_multi(metatiles)
+
+    def has_multi(self, indexes):
+        return self._storage.has_multi(indexes)
+
+    def retire_multi(self, indexes):
+        self._storage.retire_multi(indexes)
+
+    def list_indexes(self, level):
+        return self._storage.list_indexes(level)
+
     def close(self):
         self._storage.close()
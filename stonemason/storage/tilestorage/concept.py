@@ -3,6 +3,7 @@
 __author__ = 'ray'
 __date__ = '11/19/15'
 
+import re
 import six
 from stonemason.pyramid import MetaTileIndex, MetaTile
 from stonemason.storage.concept import StorageError, StorageKeyConcept, \
@@ -71,6 +72,28 @@ class MetaTileKeyConcept(StorageKeyConcept):  # pragma: no cover
         if gzip:  # append '.gz' to extension
             self._extension = self._extension + '.gz'
 
+        self._pattern = re.compile(r'^(\d+)-(\d+)-(\d+)@(\d+)%s$' %
+                                   re.escape(self._extension))
+
+    def make_level_dir(self, z):
+        """Name of the top level directory containing metatiles of level
+        `z`."""
+        raise NotImplementedError
+
+    def make_prefix(self, hint):
+        """Make a key prefix shared by all metatiles at level `hint`."""
+        return self._sep.join([self._prefix, self.make_level_dir(hint), ''])
+
+    def parse(self, key):
+        """Convert a key back to metatile index, returns ``None`` if the key
+        is not a metatile key."""
+        basename = key.rsplit(self._sep, 1)[-1]
+        match = self._pattern.match(basename)
+        if match is None:
+            return None
+        z, x, y, stride = map(int, match.groups())
+        return MetaTileIndex(z, x, y, stride)
+
 
 class MetaTileSerializeConcept(ObjectSerializeConcept):  # pragma: no cover
     """MetaTile Serializer Concept"""
@@ -120,14 +143,25 @@ class MetaTileStorageConcept(object):
         """
         raise NotImplementedError
 
-    def get(self, index):
+    def get(self, index, etag=None, mtime=None):
         """Retrieve a `MetaTile` from the storage.
 
         Retrieve a `MetaTile` from the storage, returns ``None`` if not found.
 
+        When the caller holds a copy, it can be revalidated by passing
+        ``ETag`` of stored data or the time the copy was retrieved,
+        :exc:`~stonemason.storage.ObjectNotModified` is raised if the
+        stored `MetaTile` is not modified, without transferring its data.
+
         :param index: MetaTile index of the MetaTile.
         :type index: :class:`~stonemason.tilestorage.MetaTileIndex`
 
+        :param etag: ``ETag`` of stored data of the copy.
+        :type etag: str
+
+        :param mtime: Time the copy was retrieved.
+        :type mtime: float
+
         :returns: Retrieved tile cluster.
         :rtype: :class:`~stonemason.tilestorage.MetaTile` or ``None``
 
@@ -156,6 +190,69 @@ class MetaTileStorageConcept(object):
         """
         raise NotImplementedError
 
+    def has_multi(self, indexes):
+        """Check whether each of given indexes exists in the storage.
+
+        Bulk operations send requests to storage backend concurrently when
+        the backend supports it.
+
+        :param indexes: A list of MetaTile indexes.
+        :type indexes: list
+
+        :return: A list of bool in the order of `indexes`.
+        :rtype: list
+
+        """
+        return list(self.has(index) for index in indexes)
+
+    def get_multi(self, indexes):
+        """Retrieve a list of `MetaTile` from the storage, ``None`` for
+        missing ones.
+
+        :param indexes: A list of MetaTile indexes.
+        :type indexes: list
+
+        :return: A list of retrieved MetaTiles in the order of `indexes`.
+        :rtype: list
+
+        """
+        return list(self.get(index) for index in indexes)
+
+    def put_multi(self, metatiles):
+        """Store a list of `MetaTile` in the storage.
+
+        :param metatiles: MetaTiles to store.
+        :type metatiles: list
+
+        """
+        for metatile in metatiles:
+            self.put(metatile)
+
+    def retire_multi(self, indexes):
+        """Delete `MetaTile` with given indexes.
+
+        :param indexes: A list of MetaTile indexes.
+        :type indexes: list
+
+        """
+        for index in indexes:
+            self.retire(index)
+
+    def list_indexes(self, level):
+        """List indexes of all `MetaTile` at given level in the storage.
+
+        Listing is done using a few bulk requests to storage backend instead
+        of checking existence of each metatile.
+
+        :param level: Zoom level.
+        :type level: int
+
+        :return: Iterator of metatile indexes.
+        :rtype: iterator
+
+        """
+        raise NotImplementedError
+
     def close(self):
         """Close underlying connection to storage backend"""
         raise NotImplementedError
@@ -210,24 +307,15 @@ class MetaTileStorageImpl(MetaTileStorageConcept):  # pragma: no cover
 
         return self._storage.has(index)
 
-    def get(self, index):
+    def get(self, index, etag=None, mtime=None):
         """Retrieve a `MetaTile` from the storage."""
         assert isinstance(index, MetaTileIndex)
 
-        return self._storage.get(index)
+        return self._storage.get(index, etag=etag, mtime=mtime)
 
     def put(self, metatile):
         """Store a `MetaTile` in the storage."""
-        assert isinstance(metatile, MetaTile)
-
-        if self._readonly:
-            raise ReadOnlyMetaTileStorage
-
-        if metatile.index.z not in self._levels:
-            raise InvalidMetaTileIndex('Invalid MetaTile level.')
-        if metatile.index.stride != self._stride:
-            if metatile.index.z >> metatile.index.stride > 0:
-                raise InvalidMetaTileIndex('Invalid MetaTile stride.')
+        self._check_metatile(metatile)
 
         self._storage.put(metatile.index, metatile)
 
@@ -240,6 +328,65 @@ class MetaTileStorageImpl(MetaTileStorageConcept):  # pragma: no cover
 
         self._storage.delete(index)
 
+    def has_multi(self, indexes):
+        """Check whether each of given indexes exists in the storage."""
+        indexes = list(indexes)
+        assert all(isinstance(index, MetaTileIndex) for index in indexes)
+
+        return self._storage.has_multi(indexes)
+
+    def get_multi(self, indexes):
+        """Retrieve a list of `MetaTile` from the storage."""
+        indexes = list(indexes)
+        assert all(isinstance(index, MetaTileIndex) for index in indexes)
+
+        return self._storage.get_multi(indexes)
+
+    def put_multi(self, metatiles):
+        """Store a list of `MetaTile` in the storage."""
+        metatiles = list(metatiles)
+        for metatile in metatiles:
+            self._check_metatile(metatile)
+
+        self._storage.put_multi(list((metatile.index, metatile)
+                                     for metatile in metatiles))
+
+    def retire_multi(self, indexes):
+        """Delete `MetaTile` with given indexes."""
+        indexes = list(indexes)
+        assert all(isinstance(index, MetaTileIndex) for index in indexes)
+
+        if self._readonly:
+            raise ReadOnlyMetaTileStorage
+
+        self._storage.delete_multi(indexes)
+
+    def _check_metatile(self, metatile):
+        check_metatile(metatile, self._levels, self._stride, self._readonly)
+
+    def list_indexes(self, level):
+        """List indexes of all `MetaTile` at given level in the storage."""
+        stride = min(self._stride, 2 ** level)
+        for index in self._storage.list_indexes(level):
+            if index.z == level and index.stride == stride:
+                yield index
+
     def close(self):
         """Close underlying connection to storage backend."""
         self._storage.close()
+
+
+def check_metatile(metatile, levels, stride, readonly=False):
+    """Check whether a `MetaTile` can be stored in a storage with given
+    `levels` and `stride`, raises :exc:`ReadOnlyMetaTileStorage` or
+    :exc:`InvalidMetaTileIndex` if not."""
+    assert isinstance(metatile, MetaTile)
+
+    if readonly:
+        raise ReadOnlyMetaTileStorage
+
+    if metatile.index.z not in levels:
+        raise InvalidMetaTileIndex('Invalid MetaTile level.')
+    if metatile.index.stride != stride:
+        if metatile.index.z >> metatile.index.stride > 0:
+            raise InvalidMetaTileIndex('Invalid MetaTile stride.')
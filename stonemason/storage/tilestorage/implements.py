@@ -101,6 +101,10 @@ class S3MetaTileStorage(MetaTileStorageImpl):
         :exc:`ReadOnlyStorage` if `readonly` is set.
     :type readonly: bool
 
+    :param max_workers: Maximum number of concurrent s3 requests sent by
+        bulk operations like :meth:`get_multi`, default is ``10``.
+    :type max_workers: int
+
     """
 
     def __init__(self, access_key=None, secret_key=None,
@@ -108,7 +112,7 @@ class S3MetaTileStorage(MetaTileStorageImpl):
                  reduced_redundancy='STANDARD',
                  key_mode='simple', prefix='my_storage',
                  levels=range(0, 22), stride=1, format=None,
-                 readonly=False):
+                 readonly=False, max_workers=10):
         if not isinstance(format, FormatBundle):
             raise MetaTileStorageError('Must specify format explicitly.')
 
@@ -119,7 +123,8 @@ class S3MetaTileStorage(MetaTileStorageImpl):
 
         persistent = S3Storage(access_key=access_key, secret_key=secret_key,
                                bucket=bucket, policy=policy,
-                               reduced_redundancy=reduced_redundancy)
+                               reduced_redundancy=reduced_redundancy,
+                               max_workers=max_workers)
 
         storage = GenericStorageImpl(key_concept=key_mode,
                                      serializer_concept=serializer,
@@ -290,6 +295,10 @@ class S3ClusterStorage(MetaTileStorageImpl):
         stored on filesystem will be gzipped, default is ``False``.
     :type compressed: bool
 
+    :param max_workers: Maximum number of concurrent s3 requests sent by
+        bulk operations like :meth:`get_multi`, default is ``10``.
+    :type max_workers: int
+
     """
 
     def __init__(self, access_key=None, secret_key=None,
@@ -297,7 +306,7 @@ class S3ClusterStorage(MetaTileStorageImpl):
                  reduced_redundancy='STANDARD',
                  key_mode='simple', prefix='my_storage',
                  levels=range(0, 22), stride=1, format=None,
-                 readonly=False, compressed=False):
+                 readonly=False, compressed=False, max_workers=10):
         if not isinstance(format, FormatBundle):
             raise MetaTileStorageError('Must specify format explicitly.')
 
@@ -312,7 +321,8 @@ class S3ClusterStorage(MetaTileStorageImpl):
 
         persistent = S3Storage(access_key=access_key, secret_key=secret_key,
                                bucket=bucket, policy=policy,
-                               reduced_redundancy=reduced_redundancy)
+                               reduced_redundancy=reduced_redundancy,
+                               max_workers=max_workers)
 
         storage = GenericStorageImpl(key_concept=key_mode,
                                      serializer_concept=serializer,
@@ -423,7 +433,7 @@ class NullMetaTileStorage(MetaTileStorageConcept):  # pragma: no cover
     def has(self, index):
         return False
 
-    def get(self, index):
+    def get(self, index, etag=None, mtime=None):
         return None
 
     def put(self, metatile):
@@ -432,5 +442,8 @@ class NullMetaTileStorage(MetaTileStorageConcept):  # pragma: no cover
     def retire(self, index):
         return
 
+    def list_indexes(self, level):
+        return iter([])
+
     def close(self):
         pass
@@ -29,6 +29,9 @@ class HilbertKeyMode(MetaTileKeyConcept):
         fragments.append('%d-%d-%d@%d%s' % (z, x, y, stride, self._extension))
         return self._sep.join(fragments)
 
+    def make_level_dir(self, z):
+        return Hilbert.coord2dir(z, 0, 0)[0]
+
 
 class LegacyKeyMode(MetaTileKeyConcept):
     """Legacy Key Mode
@@ -47,6 +50,9 @@ class LegacyKeyMode(MetaTileKeyConcept):
         fragments.append('%d-%d-%d@%d%s' % (z, x, y, stride, self._extension))
         return self._sep.join(fragments)
 
+    def make_level_dir(self, z):
+        return Legacy.coord2dir(z, 0, 0)[0]
+
 
 class SimpleKeyMode(MetaTileKeyConcept):
     """Simple Key Mode
@@ -64,6 +70,9 @@ class SimpleKeyMode(MetaTileKeyConcept):
         fragments.append('%d-%d-%d@%d%s' % (z, x, y, stride, self._extension))
         return self._sep.join(fragments)
 
+    def make_level_dir(self, z):
+        return str(z)
+
 
 KEY_MODES = dict(hilbert=HilbertKeyMode,
                  legacy=LegacyKeyMode,
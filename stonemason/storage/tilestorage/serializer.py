@@ -20,6 +20,10 @@ class MetaTileSerializer(MetaTileSerializeConcept):
     The ``MetaTileSerializer`` implements details of how a metatile is
     serialized to a binary data and how it is recovered from a binary dump.
 
+    `etag` of a loaded metatile is ``ETag`` of the stored data if the
+    storage backend provides one, so it can be passed to ``get()`` to
+    revalidate the metatile even if the data is compressed.
+
     :param gzip: Whether compress or decompress data.
     :type gzip: bool
 
@@ -41,7 +45,8 @@ class MetaTileSerializer(MetaTileSerializeConcept):
             blob = gzip.GzipFile(fileobj=io.BytesIO(blob), mode='rb').read()
 
         m = {}
-        m['etag'] = metadata.get('etag', None)
+        # prefer backend etag, which is what conditional retrieval checks
+        m['etag'] = metadata.get('ETag', metadata.get('etag', None))
         m['mimetype'] = metadata.get('mimetype', self._mimetype)
         m['mtime'] = float(metadata.get(
             'mtime', metadata.get('LastModified', None)))
@@ -77,7 +82,9 @@ class TileClusterSerializer(MetaTileSerializeConcept):
     The ``TileClusterSerializer`` dumps a metatile into a binary data in
     TileCluster format and load a TileCluster from a binary data.
 
-    The dumped object is metatile while the recovered object is tilecluster.
+    The dumped object is metatile while the recovered object is tilecluster,
+    whose `etag` is ``ETag`` of the stored zip file if the storage backend
+    provides one.
 
     :param writer: The Serializer that convert metatile into binary data in the
                    format of cluster tile.
@@ -108,7 +115,9 @@ class TileClusterSerializer(MetaTileSerializeConcept):
         m['mtime'] = float(metadata.get(
             'mtime', metadata.get('LastModified', None)))
 
-        return TileCluster.from_zip(io.BytesIO(blob), metadata=m)
+        cluster = TileCluster.from_zip(io.BytesIO(blob), metadata=m)
+        return TileCluster(cluster.index, cluster.tiles,
+                           etag=metadata.get('ETag', None))
 
     def save(self, index, obj):
         assert isinstance(index, MetaTileIndex)
@@ -200,6 +200,18 @@ class MemTileCache(TileCache):
         if len(failed) > 0:
             raise MemTileCacheError('Tile not writen: "%s"' % len(failed))
 
+    def retire_multi(self, tag, indexes):
+        keys = list()
+        for index in indexes:
+            key, metadata_key, _ = self._make_key(tag, index)
+            keys.extend([key, metadata_key])
+        if not keys:
+            return
+        try:
+            self.connection.delete_multi(keys)
+        except pylibmc.Error as e:
+            pass
+
     def lock(self, tag, index, ttl=0.1):
         # memcache only supports integer ttl...
         ttl = int(round(ttl, 0))
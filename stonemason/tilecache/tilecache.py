@@ -110,6 +110,21 @@ class TileCache(object):  # pragma: no cover
         for tile in tiles:
             self.put(tag, tile, ttl=ttl)
 
+    def retire_multi(self, tag, indexes):
+        """Delete many tiles with same tag in one call.
+
+        Usually this operation is much faster if batching is supported by
+        underlying driver.
+
+        :param tag: Tag of the tile.
+        :type tag: str
+        :param indexes: A iterable of tile indexes to delete.
+        :type indexes: list
+        :return: None
+        """
+        for index in indexes:
+            self.retire(tag, index)
+
     def has_all(self, tag, indexes):
         """Check whether all given tag and tile indexes exist in the cache
 
@@ -191,6 +206,9 @@ class NullTileCache(TileCache):
     def put_multi(self, tag, tiles, ttl=0):
         return
 
+    def retire_multi(self, tag, indexes):
+        return
+
     def has_all(self, tag, indexes):
         return False
 
@@ -0,0 +1,82 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.util.postprocessing.downsample
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Build a lower zoom level image from images of next zoom level.
+
+    PIL/Pillow is required for image IO and image processing.
+
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+from PIL import Image
+
+from .gridcrop import open_image
+
+#: Supported resampling filters.
+RESAMPLE_METHODS = dict(
+    nearest=Image.NEAREST,
+    box=Image.BOX,
+    bilinear=Image.BILINEAR,
+    hamming=Image.HAMMING,
+    bicubic=Image.BICUBIC,
+    lanczos=Image.LANCZOS,
+)
+
+
+def downsample(pieces, size, resample='bilinear'):
+    """Paste images into a canvas twice of `size`, then shrink the canvas
+    to `size`.
+
+    Each piece is a ``(left, top), image`` pair, where ``(left, top)`` is
+    position of the image on the canvas.  Canvas area not covered by any
+    piece is left transparent, or black if none of the images has alpha.
+
+    >>> from PIL import Image
+    >>> from stonemason.util.postprocessing.downsample import downsample
+    >>> image = downsample([((0, 0), Image.new('RGB', (256, 256), 'red')),
+    ...                     ((256, 0), Image.new('RGB', (256, 256), 'blue'))],
+    ...                    (256, 256))
+    >>> image.size, image.getpixel((0, 0)), image.getpixel((255, 255))
+    ((256, 256), (255, 0, 0), (0, 0, 0))
+
+    :param pieces: Iterator of ``(left, top), image``, image can be one of
+        PIL/Pillow image, `bytes` contains image file data or a `file`.
+    :type pieces: iterator
+    :param size: Size of the result image, ``(width, height)``.
+    :type size: tuple
+    :param resample: Resampling filter, one of ``nearest``, ``box``,
+        ``bilinear``, ``hamming``, ``bicubic``, ``lanczos``, default is
+        ``bilinear``.
+    :type resample: str
+    :return: Downsampled image.
+    :rtype: :class:`PIL.Image.Image`
+    """
+    try:
+        method = RESAMPLE_METHODS[resample]
+    except KeyError:
+        raise ValueError('Invalid resampling filter "%s"' % resample)
+
+    pieces = list((position, open_image(image)) for position, image in pieces)
+    assert pieces
+
+    # paletted images can't be resampled, and pieces may come in
+    # different modes, fallback to RGBA when they don't agree
+    modes = set(image.mode for _, image in pieces)
+    if len(modes) == 1 and modes.issubset(('L', 'LA', 'RGB', 'RGBA')):
+        mode = modes.pop()
+    else:
+        mode = 'RGBA'
+
+    width, height = size
+    canvas = Image.new(mode, (width * 2, height * 2))
+    for (left, top), image in pieces:
+        if image.mode != mode:
+            image = image.convert(mode)
+        canvas.paste(image, (left, top))
+
+    return canvas.resize((width, height), method)
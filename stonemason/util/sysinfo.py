@@ -0,0 +1,106 @@
+# -*- encoding: utf-8 -*-
+
+"""
+    stonemason.util.sysinfo
+    ~~~~~~~~~~~~~~~~~~~~~~~
+    Resource usage of current process and host.
+"""
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import sys
+import collections
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # windows
+    resource = None
+
+
+def get_rss():
+    """Resident set size of current process in bytes.
+
+    Reads ``/proc/self/statm`` on Linux, elsewhere falls back to peak
+    resident set size reported by :func:`resource.getrusage`.  Returns
+    ``0`` if neither is available.
+
+    >>> from stonemason.util.sysinfo import get_rss
+    >>> get_rss() > 0
+    True
+
+    :rtype: int
+    """
+    try:
+        with open('/proc/self/statm', 'r') as fp:
+            pages = int(fp.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError):
+        pass
+
+    if resource is None:  # pragma: no cover
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':  # pragma: no cover
+        # bytes on OSX, kilobytes elsewhere
+        return peak
+    return peak * 1024
+
+
+#: Time spent by all CPUs of the host since boot, in clock ticks.
+CPUTimes = collections.namedtuple('CPUTimes', 'busy iowait total')
+
+
+def get_cpu_times():
+    """Time spent by all CPUs of the host, read from ``/proc/stat``,
+    returns ``None`` if not available.
+
+    Utilization of a period is difference of busy time divided by
+    difference of total time between two calls.
+
+    :rtype: :class:`~stonemason.util.sysinfo.CPUTimes`
+    """
+    try:
+        with open('/proc/stat', 'r') as fp:
+            fields = fp.readline().split()
+    except (IOError, OSError):
+        return None
+    if not fields or fields[0] != 'cpu':
+        return None
+
+    # user nice system idle iowait irq softirq steal, guest time is
+    # already included in user time
+    times = list(map(int, fields[1:9]))
+    times.extend([0] * (8 - len(times)))
+    user, nice, system, idle, iowait, irq, softirq, steal = times
+    busy = user + nice + system + irq + softirq + steal
+    return CPUTimes(busy, iowait, busy + idle + iowait)
+
+
+def get_memory():
+    """Available and total physical memory of the host in bytes, read from
+    ``/proc/meminfo``, returns ``None`` if not available.
+
+    :rtype: tuple
+    """
+    info = dict()
+    try:
+        with open('/proc/meminfo', 'r') as fp:
+            for line in fp:
+                fields = line.split()
+                if len(fields) >= 2:
+                    info[fields[0].rstrip(':')] = int(fields[1]) * 1024
+    except (IOError, OSError, ValueError):
+        return None
+
+    if 'MemTotal' not in info:
+        return None
+    if 'MemAvailable' in info:
+        available = info['MemAvailable']
+    else:
+        # kernels before 3.14
+        available = info.get('MemFree', 0) + info.get('Cached', 0) + \
+                    info.get('Buffers', 0)
+    return available, info['MemTotal']
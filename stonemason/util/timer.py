@@ -13,6 +13,11 @@ __date__ = '5/7/12'
 import sys
 import time
 import email
+import collections
+import contextlib
+
+# monotonic high resolution clock, python 2 only has time.time()
+perf_counter = getattr(time, 'perf_counter', time.time)
 
 
 def timestamp2mtime(timestamp):
@@ -25,8 +30,9 @@ def timestamp2mtime(timestamp):
 
 
 def mtime2timestamp(mtime):
-    """Convert mtime to RFC 2822 datetime string."""
-    return email.utils.formatdate(mtime)
+    """Convert mtime to RFC 2822 datetime string in GMT, as required by
+    HTTP headers."""
+    return email.utils.formatdate(mtime, usegmt=True)
 
 
 def human_duration(d):
@@ -133,3 +139,37 @@ class Timer(object):
         self._writer(self.get_message())
         if self._newline:
             self._writer('\n')
+
+
+class StageTimer(object):
+    """Accumulate elapsed time of named stages of a task.
+
+    >>> from stonemason.util.timer import StageTimer
+    >>> timer = StageTimer()
+    >>> with timer.stage('render'):
+    ...     pass
+    >>> with timer.stage('store'):
+    ...     pass
+    >>> list(timer.stages)
+    ['render', 'store']
+
+    Time of a stage entered several times is summed up.
+    """
+
+    def __init__(self):
+        #: Elapsed seconds of each stage, in order of first entering.
+        self.stages = collections.OrderedDict()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Context manager measures elapsed time of given stage."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.) + \
+                                perf_counter() - start
+
+    def get_time(self):
+        """Total elapsed time of all stages in seconds."""
+        return sum(self.stages.values())
@@ -10,9 +10,17 @@ import click
 from click.testing import CliRunner
 
 from stonemason.cli import cli
+from stonemason.pyramid.geo import HAS_GDAL
 
 from tests import skipUnlessHasMapnik
 
+
+class TestCommands(unittest.TestCase):
+    def test_gdal_commands(self):
+        # commands require gdal are not registered without it
+        self.assertEqual('tilerenderer' in cli.commands, HAS_GDAL)
+
+
 @skipUnlessHasMapnik()
 class TestStonemasonCLI(unittest.TestCase):
     def test_main(self):
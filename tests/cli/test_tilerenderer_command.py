@@ -10,7 +10,7 @@ import click
 from click.testing import CliRunner
 
 from stonemason.cli import cli
-from stonemason.cli.commands.tilerenderer import parse_levels
+from stonemason.cli.options import parse_levels, parse_shard
 
 from tests import skipUnlessHasMapnik
 
@@ -41,6 +41,14 @@ class TestHelpers(unittest.TestCase):
                           parse_levels,
                           None, None, '1,a')
 
+    def test_parse_shard(self):
+        self.assertIsNone(parse_shard(None, None, None))
+        self.assertTupleEqual(parse_shard(None, None, '0/4'), (0, 4))
+        self.assertTupleEqual(parse_shard(None, None, '3/4'), (3, 4))
+        for value in ['4/4', '1', 'a/b', '-1/2']:
+            self.assertRaises(click.BadParameter,
+                              parse_shard, None, None, value)
+
 
 @skipUnlessHasMapnik()
 class TestStonemasonTileRenderer(unittest.TestCase):
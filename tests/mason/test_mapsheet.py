@@ -70,6 +70,9 @@ class MockClusterStorage(ClusterStorage):
     def stride(self):
         return 2
 
+    def has(self, index):
+        return index in self._storage
+
     def get(self, index):
         return self._storage.get(index)
 
@@ -77,6 +80,9 @@ class MockClusterStorage(ClusterStorage):
         cluster = TileCluster.from_metatile(metatile, self._bundle.writer)
         self._storage[metatile.index] = cluster
 
+    def retire(self, index):
+        self._storage.pop(index, None)
+
 
 def mock_metatile():
     index = MetaTileIndex(1, 0, 0, 2)
@@ -109,6 +115,9 @@ class MockMetaTileStorage(MetaTileStorageConcept):
     def put(self, metatile):
         self._storage[metatile.index] = metatile
 
+    def retire(self, index):
+        self._storage.pop(index, None)
+
     @skipUnlessHasGDAL()
     def test_get_tilecluster(self):
         # storage hit
@@ -175,6 +184,30 @@ class MapSheetTestCase(object):
         for tile in cluster.tiles:
             self.assertEqual(expected, tile.data)
 
+    def test_downsample_metatile(self):
+        meta_index = MetaTileIndex(0, 0, 0, 2)
+        self.assertTrue(self.mapsheet.downsample_metatile(meta_index))
+
+        self.mapsheet.readonly = True
+        cluster = self.mapsheet.get_tilecluster(meta_index)
+
+        expected = mock_image_data('RGB', (256, 256), '#000')
+
+        self.assertEqual(len(cluster.tiles), 1)
+        for tile in cluster.tiles:
+            self.assertEqual(expected, tile.data)
+
+        # no children
+        self.assertFalse(self.mapsheet.downsample_metatile(
+            MetaTileIndex(2, 0, 0, 2)))
+
+    def test_retire_metatile(self):
+        meta_index = MetaTileIndex(1, 0, 0, 2)
+        self.mapsheet.retire_metatile(meta_index)
+
+        self.mapsheet.readonly = True
+        self.assertIsNone(self.mapsheet.get_tilecluster(meta_index))
+
 
 class TestMetatileMapSheet(unittest.TestCase, MapSheetTestCase):
     def setUp(self):
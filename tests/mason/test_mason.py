@@ -8,7 +8,8 @@ import unittest
 import six
 
 from stonemason.mason import Mason, MapBook, Metadata, ClusterMapSheet
-from stonemason.pyramid import Pyramid, Tile, TileIndex, MetaTileIndex
+from stonemason.pyramid import Pyramid, Tile, TileIndex, MetaTileIndex, \
+    MetaTileIndexArray
 from stonemason.formatbundle import FormatBundle, MapType, TileFormat
 from .test_mapsheet import MockClusterStorage, MockMetaTileStorage, \
     MockMetaTileRenderer, mock_image_data
@@ -96,3 +97,21 @@ class TestMasonMetatileRenderer(unittest.TestCase):
         cluster = self.storage.get(meta_index)
 
         self.assertEqual(len(cluster.tiles), 4)
+
+    def test_retire_metatile(self):
+        self.assertTrue(
+            self.mason.retire_metatile(self.name, self.tag, 1, 0, 0, 2))
+        self.assertFalse(self.storage.has(MetaTileIndex(1, 0, 0, 2)))
+
+        self.assertFalse(
+            self.mason.retire_metatile(self.name, 'no-such-tag', 1, 0, 0, 2))
+
+    def test_retire_metatiles(self):
+        indexes = MetaTileIndexArray.from_indexes(
+            [MetaTileIndex(1, 0, 0, 2), MetaTileIndex(2, 0, 0, 2)])
+        self.assertTrue(
+            self.mason.retire_metatiles(self.name, self.tag, indexes))
+        self.assertFalse(any(self.storage.has_multi(indexes.tolist())))
+
+        self.assertFalse(
+            self.mason.retire_metatiles(self.name, 'no-such-tag', indexes))
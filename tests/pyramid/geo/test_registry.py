@@ -0,0 +1,75 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import unittest
+import threading
+
+from stonemason.pyramid import Pyramid
+from stonemason.pyramid.geo import HAS_GDAL
+from tests import skipUnlessHasGDAL
+
+if HAS_GDAL:
+    from stonemason.pyramid.geo import get_tile_map_system, \
+        get_spatial_reference, get_coordinate_transformation, \
+        clear_registry, TileMapSystem
+
+
+@skipUnlessHasGDAL()
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        clear_registry()
+
+    def test_tile_map_system(self):
+        pyramid = Pyramid(levels=[1, 2, 3],
+                          projcs='EPSG:3857',
+                          geogcs='EPSG:4326')
+        tms = get_tile_map_system(pyramid)
+        self.assertIsInstance(tms, TileMapSystem)
+        self.assertIs(get_tile_map_system(pyramid), tms)
+        self.assertIs(get_tile_map_system(pyramid._replace(levels=[1, 2, 3])),
+                      tms)
+        self.assertIsNot(get_tile_map_system(pyramid._replace(stride=2)), tms)
+
+        clear_registry()
+        self.assertIsNot(get_tile_map_system(pyramid), tms)
+
+    def test_spatial_reference(self):
+        srs = get_spatial_reference('EPSG:3857')
+        self.assertTrue(srs.IsProjected())
+        self.assertIs(get_spatial_reference('EPSG:3857'), srs)
+
+    def test_coordinate_transformation(self):
+        ct = get_coordinate_transformation('EPSG:4326', 'EPSG:3857')
+        self.assertIs(get_coordinate_transformation('EPSG:4326', 'EPSG:3857'),
+                      ct)
+        self.assertIs(get_coordinate_transformation(
+            get_spatial_reference('EPSG:4326'),
+            get_spatial_reference('EPSG:3857')), ct)
+        self.assertIsNot(get_coordinate_transformation('EPSG:3857',
+                                                       'EPSG:4326'), ct)
+
+    def test_per_thread(self):
+        pyramid = Pyramid(projcs='EPSG:3857', geogcs='EPSG:4326')
+        objects = list()
+
+        def worker():
+            objects.append(
+                (get_tile_map_system(pyramid),
+                 get_spatial_reference('EPSG:3857'),
+                 get_coordinate_transformation('EPSG:4326', 'EPSG:3857')))
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        tms, srs, ct = objects[0]
+        self.assertIsNot(get_tile_map_system(pyramid), tms)
+        self.assertIsNot(get_spatial_reference('EPSG:3857'), srs)
+        self.assertIsNot(
+            get_coordinate_transformation('EPSG:4326', 'EPSG:3857'), ct)
+
+
+if __name__ == '__main__':
+    unittest.main()
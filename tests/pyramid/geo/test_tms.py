@@ -5,12 +5,15 @@ __date__ = '3/21/15'
 
 import unittest
 
-from stonemason.pyramid import Pyramid, TileIndex, MetaTileIndex
+import numpy as np
+
+from stonemason.pyramid import Pyramid, TileIndex, MetaTileIndex, \
+    TileIndexArray, MetaTileIndexArray
 from stonemason.pyramid.geo import HAS_GDAL
 from tests import skipUnlessHasGDAL
 
 if HAS_GDAL:
-    from stonemason.pyramid.geo import TileMapSystem, Envelope
+    from stonemason.pyramid.geo import TileMapSystem, Envelope, TileRange
 
 
 @skipUnlessHasGDAL()
@@ -49,6 +52,70 @@ class TestTileMapSystem(unittest.TestCase):
         envelope2 = tms.calc_tile_envelope(MetaTileIndex(4, 12, 12, 8))
         self.assertTupleEqual(envelope, envelope2)
 
+    def test_calc_bbox_array(self):
+        pyramid = Pyramid(projcs='EPSG:3857',
+                          geogcs='EPSG:4326',
+                          geogbounds=(-180, -85.0511, 180, 85.0511),
+                          projbounds=None)
+        tms = TileMapSystem(pyramid)
+        indexes = [MetaTileIndex(4, 12, 12, 8), MetaTileIndex(3, 2, 6, 2),
+                   MetaTileIndex(0, 0, 0, 1)]
+        envelopes = tms.calc_tile_envelopes(
+            MetaTileIndexArray.from_indexes(indexes))
+        self.assertEqual(envelopes.shape, (3, 4))
+        for envelope, index in zip(envelopes, indexes):
+            self.assertTupleEqual(tuple(envelope),
+                                  tms.calc_tile_envelope(index))
+
+        tiles = TileIndexArray([1], [1], [1])
+        self.assertTupleEqual(tuple(tms.calc_tile_envelopes(tiles)[0]),
+                              tms.calc_tile_envelope(TileIndex(1, 1, 1)))
+
+    def test_calc_tile_ranges(self):
+        pyramid = Pyramid(levels=range(0, 4),
+                          projcs='EPSG:3857',
+                          geogcs='EPSG:4326',
+                          projbounds=(-20037508.34, -20037508.34,
+                                      20037508.34, 20037508.34))
+        tms = TileMapSystem(pyramid)
+        envelope = Envelope(0, 0, 10018754.17, 10018754.17)
+        self.assertListEqual(tms.calc_tile_ranges(envelope),
+                             [TileRange(0, 0, 0, 0, 0),
+                              TileRange(1, 1, 0, 1, 0),
+                              TileRange(2, 2, 1, 2, 1),
+                              TileRange(3, 4, 2, 5, 3)])
+        self.assertEqual(tms.calc_tile_ranges(envelope)[-1].count, 4)
+        self.assertListEqual(
+            list(tms.calc_tile_ranges(envelope, [2])[0].to_index_array()),
+            [TileIndex(2, 2, 1)])
+
+        # outside of the map
+        self.assertListEqual(
+            tms.calc_tile_ranges(Envelope(-3e7, -3e7, -2.1e7, -2.1e7)), [])
+
+        # geometry in geographic coordinate system
+        geometry = Envelope(0, 0.01, 89.99, 66.5).to_geometry(tms.geogcs)
+        self.assertListEqual(tms.calc_tile_ranges(geometry, [1, 2]),
+                             [TileRange(1, 1, 0, 1, 0),
+                              TileRange(2, 2, 1, 2, 1)])
+
+    def test_transform(self):
+        pyramid = Pyramid(projcs='EPSG:3857',
+                          geogcs='EPSG:4326')
+        tms = TileMapSystem(pyramid)
+        points = tms.forward_transform([(0, 0), (180, 0)])
+        self.assertEqual(points.shape, (2, 2))
+        self.assertAlmostEqual(points[1][0], 20037508.34, places=2)
+        back = tms.backward_transform(points)
+        self.assertTrue(np.allclose(back, [(0, 0), (180, 0)]))
+        self.assertEqual(tms.forward_transform([]).shape, (0, 2))
+
+    def test_envelope_to_geometry(self):
+        geometry = Envelope(-1, -2, 3, 4).to_geometry()
+        self.assertEqual(Envelope.from_ogr(geometry.GetEnvelope()),
+                         Envelope(-1, -2, 3, 4))
+        self.assertAlmostEqual(geometry.GetArea(), 24)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -5,7 +5,10 @@ __date__ = '1/8/15'
 
 import unittest
 
-from stonemason.pyramid import hil_xy_from_s, hil_s_from_xy
+import numpy as np
+
+from stonemason.pyramid import hil_xy_from_s, hil_s_from_xy, \
+    hil_xy_from_s_array, hil_s_from_xy_array
 
 
 class TestHibertCurve(unittest.TestCase):
@@ -99,5 +102,45 @@ class TestHibertCurve(unittest.TestCase):
                          829371542099833)
 
 
+class TestHilbertCurveArray(unittest.TestCase):
+    def test_xy_from_s_array(self):
+        x, y = hil_xy_from_s_array([12345678, 12345678, 829371542099833],
+                                   [15, 20, 25])
+        self.assertEqual(x.dtype, np.uint64)
+        self.assertListEqual(x.tolist(), [2138, 3776, 31152875])
+        self.assertListEqual(y.tolist(), [3776, 2138, 17840406])
+
+    def test_xy_from_s_array_scalar_order(self):
+        x, y = hil_xy_from_s_array(np.arange(16), 2)
+        self.assertListEqual(list(zip(x.tolist(), y.tolist())),
+                             list(hil_xy_from_s(s, 2) for s in range(16)))
+
+    def test_xy_from_s_array_order0(self):
+        x, y = hil_xy_from_s_array([0], [0])
+        self.assertListEqual(x.tolist(), [0])
+        self.assertListEqual(y.tolist(), [0])
+
+    def test_s_from_xy_array(self):
+        s = hil_s_from_xy_array([2138, 3776, 31152875],
+                                [3776, 2138, 17840406],
+                                [19, 20, 25])
+        self.assertEqual(s.dtype, np.uint64)
+        self.assertListEqual(s.tolist(),
+                             [12345678, 12345678, 829371542099833])
+
+    def test_round_trip(self):
+        order = 5
+        s = np.arange(4 ** order, dtype=np.uint64)
+        x, y = hil_xy_from_s_array(s, order)
+        self.assertListEqual(hil_s_from_xy_array(x, y, order).tolist(),
+                             s.tolist())
+
+    def test_empty(self):
+        self.assertEqual(len(hil_s_from_xy_array([], [], 3)), 0)
+        x, y = hil_xy_from_s_array([], 3)
+        self.assertEqual(len(x), 0)
+        self.assertEqual(len(y), 0)
+
+
 if __name__ == '__main__':
     unittest.main()
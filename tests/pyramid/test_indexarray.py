@@ -0,0 +1,173 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import unittest
+
+import numpy as np
+
+from stonemason.pyramid import TileIndex, MetaTileIndex, \
+    TileIndexArray, MetaTileIndexArray
+
+
+class TestTileIndexArray(unittest.TestCase):
+    def setUp(self):
+        self.indexes = [TileIndex(3, 4, 5), TileIndex(2, 1, 2),
+                        TileIndex(3, 4, 5), TileIndex(0, 0, 0)]
+        self.array = TileIndexArray.from_indexes(self.indexes)
+
+    def test_init(self):
+        self.assertEqual(len(self.array), 4)
+        self.assertListEqual(list(self.array), self.indexes)
+        self.assertEqual(self.array[1], TileIndex(2, 1, 2))
+        self.assertIsInstance(self.array[1], TileIndex)
+        self.assertListEqual(list(self.array[1:3]), self.indexes[1:3])
+        self.assertIn(TileIndex(2, 1, 2), self.array)
+        self.assertNotIn(TileIndex(2, 2, 2), self.array)
+        self.assertEqual(len(TileIndexArray()), 0)
+
+    def test_invalid(self):
+        self.assertRaises(AssertionError, TileIndexArray, [1], [2], [0])
+
+    def test_serial(self):
+        self.assertListEqual(self.array.serial.tolist(),
+                             list(hash(i) for i in self.indexes))
+        array = TileIndexArray.from_serial(self.array.serial)
+        self.assertListEqual(list(array), self.indexes)
+
+    def test_sort_unique(self):
+        expected = sorted(set(self.indexes), key=lambda i: i.serial)
+        self.assertListEqual(list(self.array.unique()), expected)
+        self.assertListEqual(list(self.array.sort()),
+                             sorted(self.indexes, key=lambda i: i.serial))
+
+    def test_parent(self):
+        array = TileIndexArray([2, 3], [1, 7], [2, 0])
+        self.assertListEqual(list(array.parent()),
+                             [TileIndex(1, 0, 1), TileIndex(2, 3, 0)])
+        self.assertRaises(AssertionError, self.array.parent)
+
+    def test_children(self):
+        array = TileIndexArray([1], [1], [0])
+        self.assertListEqual(list(array.children()),
+                             [TileIndex(2, 2, 0), TileIndex(2, 2, 1),
+                              TileIndex(2, 3, 0), TileIndex(2, 3, 1)])
+        self.assertListEqual(list(array.children().parent().unique()),
+                             list(array))
+
+    def test_neighbors(self):
+        array = TileIndexArray([2], [0], [1])
+        self.assertSetEqual(set(array.neighbors()),
+                            set([TileIndex(2, 0, 0), TileIndex(2, 1, 0),
+                                 TileIndex(2, 1, 1), TileIndex(2, 1, 2),
+                                 TileIndex(2, 0, 2)]))
+
+    def test_set_operations(self):
+        a = TileIndexArray([2, 2, 2], [0, 1, 2], [0, 0, 0])
+        b = TileIndexArray([2, 2], [1, 3], [0, 0])
+        self.assertSetEqual(set(a.union(b)),
+                            set(a) | set(b))
+        self.assertSetEqual(set(a.intersection(b)), set([TileIndex(2, 1, 0)]))
+        self.assertSetEqual(set(a.difference(b)),
+                            set([TileIndex(2, 0, 0), TileIndex(2, 2, 0)]))
+        self.assertListEqual(a.isin(b).tolist(), [False, True, False])
+
+    def test_contains(self):
+        array = TileIndexArray([28] * 3, [0, 2 ** 28 - 1, 5],
+                               [0, 2 ** 28 - 1, 7])
+        for index in array:
+            self.assertIn(index, array)
+        # serials differ in lowest bits only
+        self.assertNotIn(TileIndex(28, 0, 1), array)
+        self.assertNotIn(TileIndex(28, 2 ** 28 - 1, 2 ** 28 - 2), array)
+        self.assertNotIn(TileIndex(0, 0, 0), array)
+        self.assertNotIn(TileIndex(0, 0, 0), TileIndexArray())
+
+
+class TestMetaTileIndexArray(unittest.TestCase):
+    def test_init(self):
+        array = MetaTileIndexArray([4, 6, 3, 0], [5, 33, 1, 0], [9, 7, 2, 0],
+                                   [4, 8, 16, 4])
+        self.assertListEqual(list(array),
+                             [MetaTileIndex(4, 5, 9, 4),
+                              MetaTileIndex(6, 33, 7, 8),
+                              MetaTileIndex(3, 1, 2, 16),
+                              MetaTileIndex(0, 0, 0, 4)])
+        self.assertListEqual(array.stride.tolist(), [4, 8, 8, 1])
+
+    def test_scalar_stride(self):
+        array = MetaTileIndexArray([2, 8], [0, 11], [0, 7], 8)
+        self.assertListEqual(list(array),
+                             [MetaTileIndex(2, 0, 0, 8),
+                              MetaTileIndex(8, 11, 7, 8)])
+
+    def test_serial(self):
+        indexes = [MetaTileIndex(4, 4, 8, 4), MetaTileIndex(8, 8, 0, 8)]
+        array = MetaTileIndexArray.from_indexes(indexes)
+        self.assertListEqual(array.serial.tolist(),
+                             list(hash(i) for i in indexes))
+        self.assertListEqual(
+            list(MetaTileIndexArray.from_serial(array.serial, [4, 8])),
+            indexes)
+
+    def test_from_tile_index(self):
+        tiles = TileIndexArray([4, 4], [5, 15], [9, 8])
+        self.assertListEqual(
+            list(MetaTileIndexArray.from_tile_index(tiles, 4)),
+            [MetaTileIndex.from_tile_index(t, 4) for t in tiles])
+
+    def test_to_tile_index(self):
+        indexes = [MetaTileIndex(3, 1, 2, 4), MetaTileIndex(8, 8, 0, 8),
+                   MetaTileIndex(2, 0, 0, 8)]
+        array = MetaTileIndexArray.from_indexes(indexes)
+        self.assertListEqual(list(array.to_tile_index()),
+                             list(i.to_tile_index() for i in indexes))
+
+    def test_fission(self):
+        indexes = [MetaTileIndex(2, 0, 0, 2), MetaTileIndex(3, 4, 4, 4),
+                   MetaTileIndex(1, 0, 0, 1)]
+        array = MetaTileIndexArray.from_indexes(indexes)
+        expected = []
+        for index in indexes:
+            expected.extend(index.fission())
+        self.assertListEqual(list(array.fission()), expected)
+
+    def test_parent_children(self):
+        array = MetaTileIndexArray([3], [4], [0], 2)
+        self.assertListEqual(list(array.parent()),
+                             [MetaTileIndex(2, 2, 0, 2)])
+        self.assertListEqual(list(array.children()),
+                             [MetaTileIndex(4, 8, 0, 2),
+                              MetaTileIndex(4, 8, 2, 2),
+                              MetaTileIndex(4, 10, 0, 2),
+                              MetaTileIndex(4, 10, 2, 2)])
+        self.assertListEqual(
+            sorted(array.children().fission().serial.tolist()),
+            sorted(array.fission().children().serial.tolist()))
+
+    def test_neighbors(self):
+        array = MetaTileIndexArray([3], [0], [4], 4)
+        self.assertSetEqual(set(array.neighbors()),
+                            set([MetaTileIndex(3, 0, 0, 4),
+                                 MetaTileIndex(3, 4, 0, 4),
+                                 MetaTileIndex(3, 4, 4, 4)]))
+
+    def test_set_operations(self):
+        a = MetaTileIndexArray([3, 3, 3], [0, 2, 4], [0, 0, 0], 2)
+        b = MetaTileIndexArray([3, 3], [2, 6], [0, 0], 2)
+        self.assertEqual(len(a.union(b)), 4)
+        self.assertListEqual(list(a.intersection(b)),
+                             [MetaTileIndex(3, 2, 0, 2)])
+        self.assertSetEqual(set(a.difference(b)),
+                            set([MetaTileIndex(3, 0, 0, 2),
+                                 MetaTileIndex(3, 4, 0, 2)]))
+
+    def test_memory(self):
+        array = MetaTileIndexArray(np.repeat(10, 1000),
+                                   np.arange(1000), np.arange(1000), 1)
+        self.assertEqual(array.nbytes, 1000 * 13)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,6 +30,31 @@ class TestHilbert(unittest.TestCase):
         self.assertListEqual(Hilbert.coord2dir(20, 1000, 2000),
                              ['20', '00', '00', '03', '00'])
 
+    def test_serial2coord(self):
+        for coord in [(0, 0, 0), (1, 0, 0), (3, 4, 5), (8, 8, 8),
+                      (28, 134217727, 134217728)]:
+            self.assertTupleEqual(
+                Hilbert.serial2coord(Hilbert.coord2serial(*coord)), coord)
+
+    def test_serial_array(self):
+        coords = [(0, 0, 0), (1, 0, 0), (3, 4, 5), (8, 8, 8),
+                  (28, 134217727, 134217728)]
+        z, x, y = zip(*coords)
+        serials = Hilbert.coord2serial_array(z, x, y)
+        self.assertListEqual(serials.tolist(),
+                             list(Hilbert.coord2serial(*c) for c in coords))
+
+        z2, x2, y2 = Hilbert.serial2coord_array(serials)
+        self.assertListEqual(list(zip(z2.tolist(), x2.tolist(), y2.tolist())),
+                             coords)
+
+    def test_coord_array(self):
+        coords = [(0, 0, 0), (3, 4, 5), (7, 1, 1), (7, 64, 1),
+                  (19, 468432, 187688), (20, 1000, 2000)]
+        z, x, y = zip(*coords)
+        self.assertListEqual(Hilbert.coord2dir_array(z, x, y),
+                             list(Hilbert.coord2dir(*c) for c in coords))
+
 
 class TestLegacy(unittest.TestCase):
     def test_serial(self):
@@ -49,6 +74,19 @@ class TestLegacy(unittest.TestCase):
         self.assertListEqual(Legacy.coord2dir(20, 1000, 2000),
                              ['20', '00', '07', 'C0', '0F'])
 
+    def test_serial_array(self):
+        coords = [(0, 0, 0), (1, 0, 0), (3, 4, 5), (8, 8, 8), (29, 0, 0)]
+        z, x, y = zip(*coords)
+        self.assertListEqual(Legacy.coord2serial_array(z, x, y).tolist(),
+                             list(Legacy.coord2serial(*c) for c in coords))
+
+    def test_coord_array(self):
+        coords = [(0, 0, 0), (7, 1, 1), (7, 64, 1), (19, 468432, 187688),
+                  (20, 1000, 2000)]
+        z, x, y = zip(*coords)
+        self.assertListEqual(Legacy.coord2dir_array(z, x, y),
+                             list(Legacy.coord2dir(*c) for c in coords))
+
 
 if __name__ == '__main__':
     unittest.main()
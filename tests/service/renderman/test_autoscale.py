@@ -0,0 +1,79 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import unittest
+
+from stonemason.service.renderman.autoscale import Autoscaler, LoadSample
+from stonemason.service.renderman.monitor import StatsBoard
+
+GB = 1024 ** 3
+
+
+def load(cpu=0.5, iowait=0., io_share=0., available=8 * GB, total=16 * GB,
+         worker_rss=0):
+    return LoadSample(cpu, iowait, io_share, available, total, worker_rss)
+
+
+class TestAutoscaler(unittest.TestCase):
+    def setUp(self):
+        self.scaler = Autoscaler(2, 16, cores=4)
+
+    def test_clamp(self):
+        self.assertEqual(self.scaler.clamp(1), 2)
+        self.assertEqual(self.scaler.clamp(8), 8)
+        self.assertEqual(self.scaler.clamp(100), 16)
+
+    def test_grow_by_idle_cpu(self):
+        self.assertEqual(self.scaler.decide(4, load(cpu=0.6)), 6)
+        # at most doubling at once
+        self.assertEqual(self.scaler.decide(4, load(cpu=0.1)), 8)
+        # never beyond max workers
+        self.assertEqual(self.scaler.decide(12, load(cpu=0.1)), 16)
+
+    def test_grow_limited_by_memory(self):
+        # 8G available, 1.6G reserved, each renderer takes 3G
+        self.assertEqual(
+            self.scaler.decide(4, load(cpu=0.1, worker_rss=3 * GB)), 6)
+        self.assertEqual(
+            self.scaler.decide(4, load(cpu=0.1, available=4 * GB,
+                                       worker_rss=3 * GB)), 4)
+
+    def test_shrink_on_low_memory(self):
+        self.assertEqual(self.scaler.decide(4, load(available=GB)), 3)
+        self.assertEqual(self.scaler.decide(2, load(available=GB)), 2)
+
+    def test_shrink_on_iowait(self):
+        self.assertEqual(self.scaler.decide(4, load(cpu=0.5, iowait=0.3)), 3)
+
+    def test_saturated(self):
+        # cpu bound renderers need one core each
+        self.assertEqual(self.scaler.decide(4, load(cpu=0.95)), 4)
+        self.assertEqual(self.scaler.decide(6, load(cpu=0.95)), 5)
+        # renderers waiting for storage half the time need two per core
+        self.assertEqual(
+            self.scaler.decide(6, load(cpu=0.95, io_share=0.5)), 6)
+        self.assertEqual(
+            self.scaler.decide(10, load(cpu=0.95, io_share=0.5)), 9)
+
+    @unittest.skipUnless(os.path.exists('/proc/stat'), 'requires procfs')
+    def test_update(self):
+        board = StatsBoard(2)
+        scaler = Autoscaler(1, 4, interval=10.)
+        # first sample is the baseline
+        self.assertIsNone(scaler.update(board, 2, now=0.))
+        self.assertIsNone(scaler.update(board, 2, now=5.))
+
+        board.slot(0).total_time += 4.
+        board.slot(0).io_time += 1.
+        board.set_rss(0, 1024)
+        target = scaler.update(board, 2, now=10.)
+        self.assertTrue(1 <= target <= 4)
+        self.assertAlmostEqual(scaler.sample.io_share, 0.25)
+        self.assertEqual(scaler.sample.worker_rss, 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
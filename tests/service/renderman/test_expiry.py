@@ -0,0 +1,108 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import unittest
+
+from stonemason.pyramid import MetaTileIndex, MetaTileIndexArray, \
+    TileIndexArray, Pyramid
+from stonemason.service.renderman.expiry import ExpiryList, retire_expired
+
+
+class TestExpiryList(unittest.TestCase):
+    def test_read(self):
+        expiry = ExpiryList(stride=4)
+        count = expiry.read(['5/1/2', '5/3/3', '5,2,1', ' 5 0 0 ',
+                             '', 'garbage', '1/2/0', '5/32/0'])
+        self.assertEqual(count, 4)
+        self.assertListEqual(list(expiry.metatiles(5)),
+                             [MetaTileIndex(5, 0, 0, 4)])
+
+    def test_read_chunks(self):
+        expiry = ExpiryList(stride=2)
+        lines = list('8/%d/%d' % (x, y) for x in range(8) for y in range(8))
+        self.assertEqual(expiry.read(lines, chunk_size=7), 64)
+        self.assertEqual(len(expiry.metatiles(8)), 16)
+
+    def test_propagate(self):
+        expiry = ExpiryList(stride=2, min_level=1)
+        expiry.add(TileIndexArray([4, 4], [0, 15], [0, 15]))
+        self.assertListEqual(expiry.levels, [4])
+
+        self.assertListEqual(list(expiry.metatiles()),
+                             [MetaTileIndex(4, 0, 0, 2),
+                              MetaTileIndex(4, 14, 14, 2),
+                              MetaTileIndex(3, 0, 0, 2),
+                              MetaTileIndex(3, 6, 6, 2),
+                              MetaTileIndex(2, 0, 0, 2),
+                              MetaTileIndex(2, 2, 2, 2),
+                              MetaTileIndex(1, 0, 0, 2)])
+        self.assertListEqual(expiry.levels, [4, 3, 2, 1])
+        self.assertEqual(len(expiry), 7)
+
+    def test_min_level(self):
+        expiry = ExpiryList(stride=1, min_level=3)
+        expiry.add(TileIndexArray([2, 3, 4], [0, 1, 2], [0, 1, 2]))
+        self.assertListEqual(list(expiry.metatiles()),
+                             [MetaTileIndex(4, 2, 2, 1),
+                              MetaTileIndex(3, 1, 1, 1)])
+        self.assertEqual(len(expiry.metatiles(2)), 0)
+
+
+class TestRetireExpired(unittest.TestCase):
+    def setUp(self):
+        class Storage(object):
+            stride = 2
+
+        class Sheet(object):
+            pyramid = Pyramid(levels=[4, 5], stride=8)
+            _storage = Storage()
+
+        class Mason(object):
+            def __init__(self):
+                self.retired = list()
+                self.batches = list()
+
+            def __getitem__(self, name):
+                return dict(tag=Sheet())
+
+            def retire_metatiles(self, name, tag, indexes):
+                assert isinstance(indexes, MetaTileIndexArray)
+                self.batches.append(len(indexes))
+                self.retired.extend(indexes)
+
+        self.mason = Mason()
+
+    def test_storage_stride(self):
+        # render stride is 8, metatiles are stored with stride 2
+        count, retired = retire_expired(self.mason, 'theme', 'tag',
+                                        ['5/3/3', '5/30/30'], [4, 5])
+        self.assertEqual(count, 2)
+        self.assertEqual(retired, 4)
+        self.assertListEqual(self.mason.retired,
+                             [MetaTileIndex(5, 2, 2, 2),
+                              MetaTileIndex(5, 30, 30, 2),
+                              MetaTileIndex(4, 0, 0, 2),
+                              MetaTileIndex(4, 14, 14, 2)])
+        # one batch each level
+        self.assertListEqual(self.mason.batches, [2, 2])
+
+    def test_batch_size(self):
+        lines = list('5/%d/%d' % (x, y) for x in range(0, 32, 2)
+                     for y in range(0, 32, 2))
+        count, retired = retire_expired(self.mason, 'theme', 'tag',
+                                        lines, [5], batch_size=100)
+        self.assertEqual((count, retired), (256, 256))
+        self.assertListEqual(self.mason.batches, [100, 100, 56])
+        self.assertEqual(len(set(self.mason.retired)), 256)
+
+    def test_dry_run(self):
+        count, retired = retire_expired(self.mason, 'theme', 'tag',
+                                        ['5/3/3'], [5], dry_run=True)
+        self.assertEqual((count, retired), (1, 1))
+        self.assertListEqual(self.mason.retired, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import time
+import shutil
+import pickle
+import tempfile
+import unittest
+
+from stonemason.pyramid import MetaTileIndex
+from stonemason.service.renderman.workunit import MetaTileBlock, \
+    ACTION_RENDER
+from stonemason.service.renderman.jobqueue import SQLiteJobQueue
+
+
+class TestSQLiteJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'job.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_put_get(self):
+        queue = SQLiteJobQueue(self.filename, poll_interval=0.01)
+        self.assertTrue(queue.empty())
+        self.assertFalse(queue.sealed)
+
+        item = (ACTION_RENDER,
+                MetaTileBlock.from_indexes(2, [MetaTileIndex(4, 0, 0, 2),
+                                               MetaTileIndex(4, 2, 0, 2)]))
+        queue.put(item)
+        queue.put(item)
+        queue.seal()
+        self.assertEqual(queue.pending(), 2)
+
+        # another node sees same queue
+        other = SQLiteJobQueue(self.filename, poll_interval=0.01)
+        self.assertTrue(other.sealed)
+
+        action, work_unit = queue.get()
+        self.assertEqual(action, ACTION_RENDER)
+        self.assertListEqual(list(work_unit), list(item[1]))
+        self.assertIsNotNone(other.get())
+
+        queue.task_done()
+        other.task_done()
+        self.assertTrue(queue.empty())
+        self.assertIsNone(queue.get())
+        queue.join()
+
+    def test_lease_timeout(self):
+        queue = SQLiteJobQueue(self.filename, lease_timeout=0.1,
+                               poll_interval=0.01)
+        queue.put('unit')
+        queue.seal()
+        self.assertEqual(queue.get(), 'unit')
+
+        # crashed worker never acknowledges
+        other = SQLiteJobQueue(self.filename, lease_timeout=0.1,
+                               poll_interval=0.01)
+        self.assertIsNone(other._lease())
+        time.sleep(0.15)
+        self.assertEqual(other.get(), 'unit')
+        other.task_done()
+
+        # late acknowledge of a expired lease is ignored
+        queue.task_done()
+        self.assertIsNone(other.get())
+
+    def test_renew(self):
+        queue = SQLiteJobQueue(self.filename, lease_timeout=0.2,
+                               poll_interval=0.01)
+        queue.put('unit')
+        queue.seal()
+        self.assertEqual(queue.get(), 'unit')
+
+        # renewed lease outlives the original one
+        other = SQLiteJobQueue(self.filename, lease_timeout=0.2,
+                               poll_interval=0.01)
+        for _ in range(6):
+            time.sleep(0.06)
+            queue.renew()
+            self.assertIsNone(other._lease())
+
+        queue.task_done()
+        self.assertTrue(queue.empty())
+        self.assertIsNone(other.get())
+
+    def test_claim_producer(self):
+        queue = SQLiteJobQueue(self.filename)
+        other = SQLiteJobQueue(self.filename)
+        self.assertIsNone(queue.producer)
+
+        self.assertTrue(queue.claim_producer())
+        self.assertFalse(other.claim_producer())
+        self.assertFalse(queue.claim_producer())
+        self.assertEqual(other.producer, queue.producer)
+
+    def test_max_leases(self):
+        queue = SQLiteJobQueue(self.filename, lease_timeout=0,
+                               max_leases=2, poll_interval=0.01)
+        queue.put('poison')
+        queue.seal()
+        self.assertEqual(queue.get(), 'poison')
+        self.assertEqual(queue.get(), 'poison')
+        self.assertIsNone(queue.get())
+        self.assertEqual(queue.dead(), 1)
+
+    def test_pickle(self):
+        queue = SQLiteJobQueue(self.filename, poll_interval=0.01)
+        queue.put('unit')
+        queue = pickle.loads(pickle.dumps(queue))
+        self.assertEqual(queue.get(), 'unit')
+
+
+if __name__ == '__main__':
+    unittest.main()
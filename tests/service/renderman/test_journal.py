@@ -0,0 +1,75 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import glob
+import shutil
+import tempfile
+import unittest
+
+from stonemason.pyramid import MetaTileIndex
+from stonemason.service.renderman.journal import RenderJournal, \
+    STATUS_COMPLETED, STATUS_EMPTY, STATUS_FAILED
+
+
+class TestRenderJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.journal = RenderJournal(os.path.join(self.directory, 'journal'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_empty(self):
+        summary = self.journal.load()
+        self.assertEqual(len(summary.completed), 0)
+        self.assertEqual(len(summary.failed), 0)
+        self.assertFalse(summary.is_completed(MetaTileIndex(0, 0, 0, 1)))
+
+    def test_load(self):
+        with self.journal.writer() as writer:
+            writer.record(MetaTileIndex(4, 0, 0, 4), STATUS_COMPLETED)
+            writer.record(MetaTileIndex(4, 4, 0, 4), STATUS_EMPTY)
+            writer.record(MetaTileIndex(4, 8, 0, 4), STATUS_FAILED)
+            writer.record(MetaTileIndex(4, 12, 0, 4), STATUS_FAILED)
+
+        # retried in another run
+        with self.journal.writer() as writer:
+            writer.record(MetaTileIndex(4, 8, 0, 4), STATUS_COMPLETED)
+
+        summary = self.journal.load()
+        self.assertTrue(summary.is_completed(MetaTileIndex(4, 0, 0, 4)))
+        self.assertTrue(summary.is_completed(MetaTileIndex(4, 4, 0, 4)))
+        self.assertTrue(summary.is_completed(MetaTileIndex(4, 8, 0, 4)))
+        self.assertFalse(summary.is_completed(MetaTileIndex(4, 12, 0, 4)))
+        self.assertFalse(summary.is_completed(MetaTileIndex(5, 0, 0, 4)))
+
+        self.assertFalse(summary.is_failed(MetaTileIndex(4, 8, 0, 4)))
+        self.assertTrue(summary.is_failed(MetaTileIndex(4, 12, 0, 4)))
+        self.assertListEqual(summary.failed.tolist(),
+                             [hash(MetaTileIndex(4, 12, 0, 4))])
+
+    def test_periodic_flush(self):
+        writer = self.journal.writer(flush_interval=0)
+        writer.record(MetaTileIndex(4, 0, 0, 4), STATUS_COMPLETED)
+        # flushed without closing the writer
+        summary = self.journal.load()
+        self.assertTrue(summary.is_completed(MetaTileIndex(4, 0, 0, 4)))
+        writer.close()
+
+    def test_truncated(self):
+        with self.journal.writer() as writer:
+            writer.record(MetaTileIndex(4, 0, 0, 4), STATUS_COMPLETED)
+        filename = glob.glob(os.path.join(self.journal.directory, '*'))[0]
+        with open(filename, 'ab') as fp:
+            fp.write(b'\x01\x02\x03')
+
+        summary = self.journal.load()
+        self.assertListEqual(summary.completed.tolist(),
+                             [hash(MetaTileIndex(4, 0, 0, 4))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import unittest
+
+from stonemason.service.renderman.monitor import StatsBoard, StatusMonitor
+
+
+class TestStatsBoard(unittest.TestCase):
+    def test_summary(self):
+        board = StatsBoard(3)
+        self.assertEqual(len(board), 3)
+        for n in range(3):
+            stats = board.slot(n)
+            stats.progress += 10
+            stats.rendered += 5
+            stats.failed += 1
+            stats.uploaded += 2
+            stats.upload_failed += 1
+            stats.bytes += 100
+
+        stats = board.summary()
+        self.assertEqual(stats.progress, 30)
+        self.assertEqual(stats.rendered, 21)
+        self.assertEqual(stats.failed, 6)
+        self.assertEqual(stats.bytes, 300)
+
+    def test_level_progress(self):
+        board = StatsBoard(2)
+        board.count_level(0, 3)
+        board.count_level(1, 3)
+        board.count_level(1, 28)
+        progress = board.level_progress()
+        self.assertEqual(progress[3], 2)
+        self.assertEqual(progress[28], 1)
+        self.assertEqual(progress.sum(), 3)
+
+    def test_retire(self):
+        board = StatsBoard(2)
+        self.assertFalse(board.retiring(1))
+        board.retire(1)
+        self.assertFalse(board.retiring(0))
+        self.assertTrue(board.retiring(1))
+        board.retire(1, False)
+        self.assertFalse(board.retiring(1))
+
+    def test_max_rss(self):
+        board = StatsBoard(2)
+        self.assertEqual(board.max_rss(), 0)
+        board.set_rss(0, 100)
+        board.set_rss(1, 300)
+        self.assertEqual(board.max_rss(), 300)
+        board.set_rss(1, 0)
+        self.assertEqual(board.max_rss(), 100)
+
+    def test_hold(self):
+        board = StatsBoard(2)
+        self.assertIsNone(board.held(0))
+        board.hold(0, 3)
+        board.hold(1, 0)
+        self.assertEqual(board.held(0), 3)
+        self.assertEqual(board.held(1), 0)
+        board.hold(0, None)
+        self.assertIsNone(board.held(0))
+
+    def test_total(self):
+        board = StatsBoard(1)
+        self.assertIsNone(board.total)
+        board.total = 100
+        self.assertEqual(board.total, 100)
+
+
+class TestStatusMonitor(unittest.TestCase):
+    def test_sample(self):
+        board = StatsBoard(2)
+        monitor = StatusMonitor(board, writer=None, interval=10)
+        self.assertEqual(monitor.sample(now=0.), '')
+
+        for n in range(2):
+            board.slot(n).progress += 10
+            board.slot(n).bytes += 1048576
+            for m in range(10):
+                board.count_level(n, 5)
+        board.slot(1).failed += 1
+        self.assertEqual(monitor.sample(now=2.),
+                         '20 10.0/s [5: 10.0/s] 1.00MB/s, 1 failed, '
+                         'ETA unknown')
+
+        board.total = 100
+        board.slot(0).progress += 40
+        for n in range(40):
+            board.count_level(0, 6)
+        self.assertEqual(monitor.sample(now=4.),
+                         '60/100 (60.0%) 20.0/s [6: 20.0/s] 0.00MB/s, '
+                         '1 failed, ETA 3.0769s')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from stonemason.pyramid import MetaTileIndex
+from stonemason.service.renderman.journal import STATUS_COMPLETED, \
+    STATUS_FAILED
+from stonemason.service.renderman.renderlog import RenderLogWriter, \
+    load_render_log, summarize_render_log
+
+
+class TestRenderLog(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'render.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_write_load(self):
+        with RenderLogWriter(self.filename) as writer:
+            writer.record(MetaTileIndex(3, 2, 4, 2), 'render',
+                          STATUS_COMPLETED, dict(render=0.5, store=0.25),
+                          1024)
+            # written at once, nothing is lost if the renderer crashes
+            self.assertEqual(len(list(load_render_log(self.filename))), 1)
+            writer.record(MetaTileIndex(3, 0, 0, 2), 'render',
+                          STATUS_FAILED, dict(render=0.125))
+            writer.record(MetaTileIndex(2, 0, 0, 2), 'downsample',
+                          None, dict(fetch=0.25))
+        with open(self.filename, 'a') as fp:
+            fp.write('{"level": 3, "ind')
+
+        records = list(load_render_log(self.filename))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]['index'], '3/2/4@2')
+        self.assertEqual(records[0]['result'], 'completed')
+        self.assertEqual(records[0]['bytes'], 1024)
+        self.assertEqual(records[0]['time'], 0.75)
+        self.assertEqual(records[1]['result'], 'failed')
+        self.assertEqual(records[2]['result'], 'queued')
+
+    def test_summarize(self):
+        records = list(dict(level=5, bytes=100, time=t / 100.,
+                            stages=dict(render=t / 100.))
+                       for t in range(1, 101))
+        records.append(dict(level=4, bytes=10, time=1.,
+                            stages=dict(fetch=0.5, downsample=0.5)))
+        summary = summarize_render_log(iter(records))
+
+        self.assertListEqual(list(summary), [4, 5])
+        self.assertEqual(summary[5]['count'], 100)
+        self.assertEqual(summary[5]['bytes'], 10000)
+        self.assertAlmostEqual(summary[5]['time']['p50'], 0.505)
+        self.assertAlmostEqual(summary[5]['time']['p99'], 0.9901)
+        self.assertEqual(summary[5]['time']['max'], 1.)
+        self.assertListEqual(list(summary[4]['stages']),
+                             ['fetch', 'downsample'])
+        # stages missing in some records
+        summary = summarize_render_log(
+            dict(level=6, bytes=0, time=t, stages=dict(render=t)
+                 if t < 3 else dict(render=1, store=t - 1))
+            for t in range(1, 5))
+        self.assertListEqual(list(summary[6]['stages']), ['render', 'store'])
+        self.assertEqual(summary[6]['stages']['render']['total'], 5.)
+        self.assertEqual(summary[6]['stages']['store']['total'], 5.)
+        self.assertEqual(summary[6]['stages']['store']['p50'], 1.)
+        # summary is json serializable
+        json.dumps(summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from stonemason.pyramid import MetaTileIndex, TileIndexArray
+from stonemason.service.renderman.walkers import TileListWalker, \
+    WorkFileWalker
+from stonemason.service.renderman.tilesort import WorkFile, WorkFileError, \
+    TILE_RECORD, expand_tiles, merge_runs, read_tile_list, sort_tile_list
+
+from tests import DATA_DIRECTORY
+
+
+class TestTileSort(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.tilelist1 = os.path.join(DATA_DIRECTORY, 'walkers',
+                                      'tilelist1.csv')
+        self.work_file = os.path.join(self.tempdir, 'tilelist1.work')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_read_binary(self):
+        filename = os.path.join(self.tempdir, 'list.tiles')
+        records = np.array([(3, 1, 2), (4, 16, 0), (5, 31, 31)],
+                           dtype=TILE_RECORD)
+        records.tofile(filename)
+
+        tiles = TileIndexArray.concatenate(read_tile_list(filename,
+                                                          chunk_size=2))
+        self.assertListEqual(tiles.z.tolist(), [3, 5])
+        self.assertListEqual(tiles.x.tolist(), [1, 31])
+
+    def test_expand_tiles(self):
+        tiles = TileIndexArray([1, 2], [0, 3], [1, 2])
+        for block_size in [1, 3, 100]:
+            serials = np.concatenate(list(expand_tiles(tiles, 2, [3, 4],
+                                                       block_size)))
+            self.assertEqual(len(np.unique(serials)), 25)
+            self.assertEqual(serials[0], hash(MetaTileIndex(3, 0, 4, 2)))
+
+        # metatile of the tile
+        serials = np.concatenate(list(expand_tiles(tiles, 4)))
+        self.assertListEqual(serials.tolist(),
+                             [hash(MetaTileIndex(3, 0, 4, 4)),
+                              hash(MetaTileIndex(4, 12, 8, 4))])
+
+    def test_merge_runs(self):
+        runs = [np.array([1, 3, 5, 7, 9], dtype=np.uint64),
+                np.array([2, 3, 4, 10], dtype=np.uint64),
+                np.array([9, 11], dtype=np.uint64)]
+        filename = os.path.join(self.tempdir, 'merged')
+        with open(filename, 'wb') as fp:
+            self.assertEqual(merge_runs(runs, fp, 2), 9)
+        self.assertListEqual(np.fromfile(filename, dtype='<u8').tolist(),
+                             [1, 2, 3, 4, 5, 7, 9, 10, 11])
+
+    def test_sort_tile_list(self):
+        walker = TileListWalker([1, 2, 3], 2, self.tilelist1)
+        work = sort_tile_list(self.tilelist1, self.work_file, 2, [1, 2, 3],
+                              run_size=2)
+        self.assertEqual(work.stride, 2)
+        self.assertListEqual(work.levels, [2, 3])
+        self.assertListEqual(work.serials.tolist(),
+                             sorted(set(hash(i) for i in walker)))
+        self.assertFalse(os.path.exists(self.work_file + '.tmp'))
+
+    def test_work_file_walker(self):
+        sort_tile_list(self.tilelist1, self.work_file, 2, [1, 2, 3])
+
+        walker = WorkFileWalker(None, self.work_file)
+        self.assertEqual(walker.stride, 2)
+        indexes = list(walker)
+        self.assertEqual(indexes[0], MetaTileIndex(2, 0, 2, 2))
+        self.assertEqual(len(indexes), 6)
+
+        work_units = list(walker.work_units(4))
+        self.assertListEqual(list(map(len, work_units)), [1, 4, 1])
+        self.assertListEqual(list(i for u in work_units for i in u), indexes)
+
+        walker = WorkFileWalker([3], self.work_file)
+        partitions = list(list(i for u in p for i in u)
+                          for p in walker.partitions(2, 4))
+        self.assertListEqual(partitions, [indexes[1:3], indexes[3:]])
+
+    def test_invalid_work_file(self):
+        with open(self.work_file, 'wb') as fp:
+            fp.write(b'z,x,y\n1,2,3\n')
+        self.assertRaises(WorkFileError, WorkFile, self.work_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import threading
+import unittest
+
+from stonemason.pyramid import MetaTile, MetaTileIndex
+from stonemason.service.renderman import RenderStats
+from stonemason.service.renderman.uploader import Uploader
+
+
+class FlakyStorage(object):
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.stored = list()
+        self.lock = threading.Lock()
+
+    def put(self, metatile):
+        with self.lock:
+            if self.failures > 0:
+                self.failures -= 1
+                raise IOError('Service unavailable')
+            self.stored.append(metatile.index)
+
+
+class TestUploader(unittest.TestCase):
+    def setUp(self):
+        self.results = list()
+        self.stats = RenderStats()
+        self.indexes = list(MetaTileIndex(5, x, y, 2)
+                            for x in range(0, 8, 2) for y in range(0, 8, 2))
+
+    def callback(self, metatile, error, elapsed, context):
+        self.results.append((metatile.index, error))
+        self.assertGreaterEqual(elapsed, 0)
+        self.assertEqual(context, metatile.index.x)
+
+    def test_upload(self):
+        storage = FlakyStorage()
+        with Uploader(storage, threads=3, callback=self.callback,
+                      stats=self.stats) as uploader:
+            for index in self.indexes:
+                uploader.put(MetaTile(index), context=index.x)
+
+        self.assertSetEqual(set(storage.stored), set(self.indexes))
+        self.assertSetEqual(set(self.results),
+                            set((index, None) for index in self.indexes))
+        self.assertEqual(self.stats.uploaded, len(self.indexes))
+        self.assertEqual(self.stats.upload_retries, 0)
+        self.assertEqual(self.stats.upload_failed, 0)
+
+    def test_retry(self):
+        storage = FlakyStorage(failures=2)
+        with Uploader(storage, threads=1, retries=2, backoff=0.001,
+                      callback=self.callback, stats=self.stats) as uploader:
+            uploader.put(MetaTile(self.indexes[0]), self.indexes[0].x)
+
+        self.assertListEqual(storage.stored, self.indexes[:1])
+        self.assertListEqual(self.results, [(self.indexes[0], None)])
+        self.assertEqual(self.stats.uploaded, 1)
+        self.assertEqual(self.stats.upload_retries, 2)
+
+    def test_failed(self):
+        storage = FlakyStorage(failures=3)
+        with Uploader(storage, threads=1, retries=1, backoff=0.001,
+                      callback=self.callback, stats=self.stats) as uploader:
+            uploader.put(MetaTile(self.indexes[0]), self.indexes[0].x)
+            uploader.flush()
+            self.assertEqual(self.stats.upload_failed, 1)
+            uploader.put(MetaTile(self.indexes[1]), self.indexes[1].x)
+
+        self.assertListEqual(storage.stored, self.indexes[1:2])
+        self.assertEqual(len(self.results), 2)
+        self.assertIsInstance(self.results[0][1], IOError)
+        self.assertEqual(self.stats.uploaded, 1)
+        self.assertEqual(self.stats.upload_retries, 2)
+        self.assertEqual(self.stats.upload_failed, 1)
+
+    def test_backpressure(self):
+        started = threading.Event()
+        event = threading.Event()
+
+        class BlockingStorage(object):
+            def put(self, metatile):
+                started.set()
+                event.wait()
+
+        uploader = Uploader(BlockingStorage(), threads=1, queue_size=1)
+        uploader.put(MetaTile(self.indexes[0]))  # taken by the thread
+        started.wait()
+        uploader.put(MetaTile(self.indexes[1]))  # fills the queue
+
+        blocked = threading.Thread(target=uploader.put,
+                                   args=(MetaTile(self.indexes[2]),))
+        blocked.start()
+        blocked.join(0.1)
+        self.assertTrue(blocked.is_alive())
+
+        event.set()
+        blocked.join()
+        uploader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
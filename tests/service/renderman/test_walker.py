@@ -6,16 +6,24 @@ __date__ = '4/11/15'
 import unittest
 import os
 
-from stonemason.pyramid import MetaTileIndex
-from stonemason.service.renderman.walkers import CompleteWalker, TileListWalker
+from stonemason.pyramid import Pyramid, MetaTileIndex
+from stonemason.pyramid.geo import HAS_GDAL
+from stonemason.service.renderman.walkers import CompleteWalker, \
+    TileListWalker, EnvelopeWalker, CoverageWalker, ExpiryWalker, \
+    HilbertOrderWalker, ShardWalker
 
-from tests import DATA_DIRECTORY
+from tests import DATA_DIRECTORY, skipUnlessHasGDAL
+
+if HAS_GDAL:
+    from stonemason.pyramid.geo import TileMapSystem, Envelope
 
 
 class TestPyramidWalker(unittest.TestCase):
     def setUp(self):
         self.tilelist1 = os.path.join(DATA_DIRECTORY, 'walkers',
                                       'tilelist1.csv')
+        self.expiry1 = os.path.join(DATA_DIRECTORY, 'walkers',
+                                    'expiry1.txt')
 
     def test_complete_walker(self):
         walker = CompleteWalker([0, 1, 2], 2)
@@ -29,6 +37,82 @@ class TestPyramidWalker(unittest.TestCase):
                               MetaTileIndex(2, 2, 0, 2),
                               MetaTileIndex(2, 2, 2, 2)])
 
+    def test_complete_walker_work_units(self):
+        walker = CompleteWalker([0, 1, 2, 5], 2)
+        work_units = list(walker.work_units(3))
+        self.assertTrue(all(len(u) <= 3 for u in work_units))
+        self.assertListEqual(list(i for u in work_units for i in u),
+                             list(walker))
+
+    def test_complete_walker_hilbert(self):
+        walker = CompleteWalker([1, 3], 2, 'hilbert')
+        indexes = list(walker)
+        self.assertListEqual(indexes[:5],
+                             [MetaTileIndex(1, 0, 0, 2),
+                              MetaTileIndex(3, 0, 0, 2),
+                              MetaTileIndex(3, 2, 0, 2),
+                              MetaTileIndex(3, 2, 2, 2),
+                              MetaTileIndex(3, 0, 2, 2)])
+        self.assertListEqual(sorted(indexes),
+                             sorted(CompleteWalker([1, 3], 2)))
+        self.assertListEqual(list(i for u in walker.work_units(3) for i in u),
+                             indexes)
+
+    def test_complete_walker_partitions(self):
+        walker = CompleteWalker([1, 3], 2, 'hilbert')
+        partitions = list(list(i for u in p for i in u)
+                          for p in walker.partitions(3, 2))
+        self.assertListEqual(list(map(len, partitions)), [5, 5, 7])
+        # each level is split separately
+        self.assertEqual(partitions[2][0], MetaTileIndex(1, 0, 0, 2))
+        self.assertListEqual(partitions[0] + partitions[1] +
+                             partitions[2][1:], list(walker)[1:])
+
+    def test_hilbert_order_walker(self):
+        walker = HilbertOrderWalker(TileListWalker([1, 2, 3], 2,
+                                                   self.tilelist1))
+        indexes = list(walker)
+        self.assertListEqual(indexes,
+                             [MetaTileIndex(2, 0, 2, 2),
+                              MetaTileIndex(3, 0, 4, 2),
+                              MetaTileIndex(3, 0, 6, 2),
+                              MetaTileIndex(3, 2, 6, 2),
+                              MetaTileIndex(3, 2, 4, 2),
+                              MetaTileIndex(3, 4, 6, 2)])
+        partitions = list(list(i for u in p for i in u)
+                          for p in walker.partitions(2, 4))
+        self.assertListEqual(partitions,
+                             [indexes[1:3], indexes[:1] + indexes[3:]])
+
+    def test_shard_walker(self):
+        walker = CompleteWalker([1, 3, 4], 2, 'hilbert')
+        shards = list(list(ShardWalker(walker, i, 3)) for i in range(3))
+        self.assertListEqual(list(map(len, shards)), [26, 26, 29])
+        # disjoint and complete
+        self.assertListEqual(sorted(i for s in shards for i in s),
+                             sorted(walker))
+        # each shard is contiguous in every level
+        indexes = list(walker)
+        for shard in shards:
+            for level in [3, 4]:
+                part = list(i for i in shard if i.z == level)
+                start = indexes.index(part[0])
+                self.assertListEqual(indexes[start:start + len(part)], part)
+
+        # partitions of a shard
+        partitions = list(list(i for u in p for i in u)
+                          for p in ShardWalker(walker, 2, 3).partitions(2, 5))
+        self.assertListEqual(list(map(len, partitions)), [14, 15])
+        self.assertListEqual(sorted(partitions[0] + partitions[1]),
+                             sorted(shards[2]))
+
+    def test_tilelist_walker_work_units(self):
+        walker = TileListWalker([1, 2, 3], 2, self.tilelist1)
+        work_units = list(walker.work_units(4))
+        self.assertListEqual(list(map(len, work_units)), [4, 2])
+        self.assertListEqual(list(i for u in work_units for i in u),
+                             list(walker))
+
     def test_tilelist_walker(self):
         walker = TileListWalker([1, 2, 3], 2, self.tilelist1)
         indexes = list(walker)
@@ -47,6 +131,91 @@ class TestPyramidWalker(unittest.TestCase):
                              [MetaTileIndex(4, 0, 8, 8),
                               MetaTileIndex(5, 16, 24, 8)])
 
+    def test_expiry_walker(self):
+        walker = ExpiryWalker([1, 2, 3], 2, self.expiry1)
+        indexes = list(walker)
+        self.assertListEqual(indexes,
+                             [MetaTileIndex(3, 0, 4, 2),
+                              MetaTileIndex(3, 6, 6, 2),
+                              MetaTileIndex(2, 0, 2, 2),
+                              MetaTileIndex(2, 2, 2, 2),
+                              MetaTileIndex(1, 0, 0, 2)])
+
+        walker = ExpiryWalker([2, 3], 2, self.expiry1)
+        self.assertListEqual(list(walker), indexes[:4])
+
+    def test_expiry_walker_work_units(self):
+        walker = ExpiryWalker([1, 2, 3], 2, self.expiry1)
+        work_units = list(walker.work_units(3))
+        self.assertListEqual(list(map(len, work_units)), [2, 2, 1])
+        self.assertListEqual(list(i for u in work_units for i in u),
+                             list(walker))
+
+
+@skipUnlessHasGDAL()
+class TestEnvelopeWalker(unittest.TestCase):
+    def setUp(self):
+        self.tms = TileMapSystem(Pyramid(projcs='EPSG:3857',
+                                         geogcs='EPSG:4326'))
+
+    def brute_force(self, levels, stride, geometry):
+        indexes = list()
+        for index in CompleteWalker(levels, stride):
+            envelope = self.tms.calc_tile_envelope(index)
+            if geometry.Intersects(envelope.to_geometry(self.tms.projcs)):
+                indexes.append(index)
+        return indexes
+
+    def test_envelope(self):
+        envelope = (-10.5, 20.3, 33.1, 51.7)
+        for stride in [1, 2, 8]:
+            walker = EnvelopeWalker(range(0, 8), stride, self.tms, envelope)
+            indexes = list(walker)
+            self.assertEqual(len(indexes), len(set(indexes)))
+            self.assertSetEqual(
+                set(indexes),
+                set(self.brute_force(range(0, 8), stride, walker.geometry)))
+
+    def test_polygon(self):
+        wkt = 'POLYGON((100 20, 140 20, 100 50, 100 20))'
+        walker = EnvelopeWalker([3, 4, 5, 6], 2, self.tms, wkt)
+        indexes = list(walker)
+        self.assertSetEqual(
+            set(indexes),
+            set(self.brute_force([3, 4, 5, 6], 2, walker.geometry)))
+        self.assertIn(MetaTileIndex(4, 12, 6, 2), indexes)
+
+    def test_geojson(self):
+        geojson = '''{"type": "Feature", "geometry":
+        {"type": "Polygon",
+         "coordinates": [[[1, 1], [2, 1], [2, 2], [1, 2], [1, 1]]]}}'''
+        walker = EnvelopeWalker([0, 5], 1, self.tms, geojson)
+        self.assertListEqual(list(walker),
+                             [MetaTileIndex(0, 0, 0, 1),
+                              MetaTileIndex(5, 16, 15, 1)])
+
+
+@skipUnlessHasGDAL()
+class TestCoverageWalker(unittest.TestCase):
+    def setUp(self):
+        self.tms = TileMapSystem(Pyramid(projcs='EPSG:3857',
+                                         geogcs='EPSG:4326'))
+        self.conn_string = 'raster+disk://%s?indexname=%s' % (
+            os.path.join(DATA_DIRECTORY, 'raster'), 'index_5m.shp')
+
+    def test_coverage(self):
+        walker = CoverageWalker([0, 4, 8, 12], 4, self.tms, self.conn_string)
+        indexes = list(walker)
+        # fujisan
+        self.assertIn(MetaTileIndex(8, 224, 100, 4), indexes)
+        self.assertEqual(len([i for i in indexes if i.z == 8]), 1)
+        self.assertLess(len([i for i in indexes if i.z == 12]), 16)
+
+    def test_coverage_and_envelope(self):
+        walker = CoverageWalker([0, 4, 8, 12], 4, self.tms, self.conn_string,
+                                (0, 0, 1, 1))
+        self.assertListEqual(list(walker), [])
+
 
 if __name__ == '__main__':
     unittest.main()
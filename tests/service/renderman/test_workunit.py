@@ -0,0 +1,105 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import pickle
+import unittest
+
+import numpy as np
+
+from stonemason.pyramid import MetaTileIndex
+from stonemason.service.renderman.workunit import MetaTileRange, \
+    MetaTileBlock, level_size, sorted_isin, chunk_indexes, group_by_level, \
+    split_range
+
+
+class TestMetaTileRange(unittest.TestCase):
+    def test_level_size(self):
+        self.assertEqual(level_size(0, 8), 1)
+        self.assertEqual(level_size(2, 8), 1)
+        self.assertEqual(level_size(4, 8), 4)
+        self.assertEqual(level_size(4, 1), 256)
+
+    def test_row_major(self):
+        work_unit = MetaTileRange(3, 2, 0, 16)
+        self.assertEqual(len(work_unit), 16)
+        expected = list(MetaTileIndex(3, x, y, 2)
+                        for x in range(0, 8, 2) for y in range(0, 8, 2))
+        self.assertListEqual(list(work_unit), expected)
+        self.assertListEqual(list(MetaTileRange(3, 2, 5, 7)), expected[5:7])
+
+    def test_hilbert(self):
+        work_unit = MetaTileRange(5, 4, 0, 64, 'hilbert')
+        serials = work_unit.serials()
+        # positions on the metatile grid follows hilbert serial
+        self.assertTrue(np.all(serials[1:] > serials[:-1]))
+        self.assertSetEqual(set(work_unit), set(MetaTileRange(5, 4, 0, 64)))
+
+    def test_large_stride(self):
+        self.assertListEqual(list(MetaTileRange(1, 8, 0, 1)),
+                             [MetaTileIndex(1, 0, 0, 2)])
+
+    def test_exclude(self):
+        work_unit = MetaTileRange(2, 1, 0, 16)
+        serials = np.sort(work_unit.serials())
+        self.assertIs(work_unit.exclude(np.array([], dtype=np.uint64)),
+                      work_unit)
+        self.assertIsNone(work_unit.exclude(serials))
+
+        excluded = work_unit.exclude(
+            np.array([hash(MetaTileIndex(2, 0, 1, 1))], dtype=np.uint64))
+        self.assertEqual(len(excluded), 15)
+        self.assertNotIn(MetaTileIndex(2, 0, 1, 1), list(excluded))
+
+    def test_pickle(self):
+        work_unit = MetaTileRange(3, 2, 1, 10, 'hilbert')
+        self.assertListEqual(list(pickle.loads(pickle.dumps(work_unit))),
+                             list(work_unit))
+
+
+class TestMetaTileBlock(unittest.TestCase):
+    def test_block(self):
+        indexes = [MetaTileIndex(3, 2, 4, 2), MetaTileIndex(1, 0, 0, 2),
+                   MetaTileIndex(5, 8, 8, 2)]
+        work_unit = MetaTileBlock.from_indexes(2, indexes)
+        self.assertEqual(len(work_unit), 3)
+        self.assertListEqual(list(work_unit), indexes)
+        self.assertListEqual(list(pickle.loads(pickle.dumps(work_unit))),
+                             indexes)
+
+    def test_chunk_indexes(self):
+        indexes = list(MetaTileRange(3, 1, 0, 64))
+        work_units = list(chunk_indexes(indexes, 1, 10))
+        self.assertListEqual(list(map(len, work_units)),
+                             [10, 10, 10, 10, 10, 10, 4])
+        self.assertListEqual(list(i for u in work_units for i in u), indexes)
+
+    def test_sorted_isin(self):
+        values = np.array([3, 1, 4, 1, 5], dtype=np.uint64)
+        self.assertListEqual(
+            sorted_isin(values, np.array([1, 2, 3], dtype=np.uint64)).tolist(),
+            [True, True, False, True, False])
+        self.assertListEqual(
+            sorted_isin(values, np.array([], dtype=np.uint64)).tolist(),
+            [False] * 5)
+
+    def test_group_by_level(self):
+        work_units = [MetaTileRange(3, 2, 0, 4),
+                      MetaTileBlock.from_indexes(2, [MetaTileIndex(2, 0, 0, 2),
+                                                     MetaTileIndex(3, 6, 6, 2)])]
+        levels = group_by_level(work_units)
+        self.assertListEqual(list(levels), [3, 2])
+        self.assertEqual(len(levels[3]), 5)
+        self.assertEqual(len(levels[2]), 1)
+
+    def test_split_range(self):
+        self.assertListEqual(split_range(2, 3), [(0, 0), (0, 1), (1, 2)])
+        parts = split_range(100, 7)
+        self.assertEqual(parts[0][0], 0)
+        self.assertEqual(parts[-1][1], 100)
+        self.assertTrue(all(a[1] == b[0] for a, b in zip(parts, parts[1:])))
+
+
+if __name__ == '__main__':
+    unittest.main()
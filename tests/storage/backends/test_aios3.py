@@ -0,0 +1,110 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import sys
+import time
+import unittest
+
+if sys.version_info < (3, 5):
+    raise unittest.SkipTest('asyncio storages require python 3.5')
+
+import asyncio
+
+import six
+import boto3
+
+try:
+    from moto.server import ThreadedMotoServer
+    from stonemason.storage.backends.aios3 import AsyncS3Storage
+except ImportError:
+    raise unittest.SkipTest('aiobotocore or moto[server] not installed')
+
+from stonemason.storage.concept import ObjectNotModified
+
+TEST_BUCKET_NAME = 'tilestorage'
+TEST_PORT = 5123
+TEST_ENDPOINT = 'http://127.0.0.1:%d' % TEST_PORT
+
+
+class TestAsyncS3Storage(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadedMotoServer(port=TEST_PORT, verbose=False)
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.client = boto3.client('s3', endpoint_url=TEST_ENDPOINT,
+                                   region_name='us-east-1',
+                                   aws_access_key_id='testing',
+                                   aws_secret_access_key='testing')
+        self.client.create_bucket(Bucket=TEST_BUCKET_NAME)
+
+        self.loop = asyncio.new_event_loop()
+        self.storage = AsyncS3Storage(access_key='testing',
+                                      secret_key='testing',
+                                      bucket=TEST_BUCKET_NAME,
+                                      endpoint_url=TEST_ENDPOINT,
+                                      region='us-east-1',
+                                      max_concurrency=4)
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_store(self):
+        key = 'test_key.png'
+        blob = six.b('test_blob')
+
+        self.run_async(self.storage.store(key, blob, dict(mimetype='test')))
+        self.assertTrue(self.run_async(self.storage.exists(key)))
+        self.assertFalse(self.run_async(self.storage.exists(key + 'x')))
+
+        data, metadata = self.run_async(self.storage.retrieve(key))
+        self.assertEqual(data, blob)
+        self.assertEqual(metadata['mimetype'], 'test')
+        self.assertAlmostEqual(metadata['LastModified'], time.time(),
+                               delta=300)
+
+        self.assertRaises(ObjectNotModified, self.run_async,
+                          self.storage.retrieve(key, etag=metadata['ETag']))
+
+        self.run_async(self.storage.retire(key))
+        self.assertTupleEqual(self.run_async(self.storage.retrieve(key)),
+                              (None, None))
+
+    def test_multi(self):
+        keys = list('multi/%d.png' % n for n in range(20))
+        items = list((key, six.b(key), dict()) for key in keys)
+
+        self.run_async(self.storage.store_multi(items))
+        self.assertListEqual(
+            self.run_async(self.storage.exists_multi(keys + ['missing'])),
+            [True] * len(keys) + [False])
+
+        results = self.run_async(self.storage.retrieve_multi(keys))
+        self.assertListEqual(list(blob for blob, _ in results),
+                             list(six.b(key) for key in keys))
+        self.assertSetEqual(set(self.run_async(
+            self.storage.list_keys('multi/'))), set(keys))
+
+        self.run_async(self.storage.retire_multi(keys))
+        self.assertListEqual(self.run_async(
+            self.storage.list_keys('multi/')), [])
+
+    def tearDown(self):
+        self.run_async(self.storage.close())
+        self.loop.close()
+        for item in self.client.list_objects_v2(
+                Bucket=TEST_BUCKET_NAME).get('Contents', []):
+            self.client.delete_object(Bucket=TEST_BUCKET_NAME,
+                                      Key=item['Key'])
+        self.client.delete_bucket(Bucket=TEST_BUCKET_NAME)
+
+
+if __name__ == '__main__':
+    unittest.main()
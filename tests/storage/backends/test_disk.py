@@ -7,9 +7,11 @@ import os
 import shutil
 import unittest
 
+import time
 import tempfile
 import six
 
+from stonemason.storage.concept import ObjectNotModified
 from stonemason.storage.backends.disk import DiskStorage
 
 TEST_BUCKET_NAME = 'tilestorage'
@@ -66,5 +68,48 @@ class TestS3Storage(unittest.TestCase):
 
         self.assertFalse(self.storage.exists(test_key))
 
+    def test_list_keys(self):
+        keys = [os.path.join(self.root, 'a', 'b', 'key1'),
+                os.path.join(self.root, 'a', 'key2'),
+                os.path.join(self.root, 'ab', 'key3')]
+        for key in keys:
+            self.storage.store(key, six.b('test_blob'), dict())
+
+        self.assertListEqual(
+            sorted(self.storage.list_keys(os.path.join(self.root, 'a', ''))),
+            sorted(keys[:2]))
+        self.assertListEqual(
+            sorted(self.storage.list_keys(os.path.join(self.root, 'a'))),
+            sorted(keys))
+        self.assertListEqual(
+            list(self.storage.list_keys(os.path.join(self.root, 'c', ''))),
+            [])
+
+    def test_conditional_retrieve(self):
+        test_key = os.path.join(self.root, 'test_key')
+        self.storage.store(test_key, six.b('test_blob'), dict())
+
+        self.assertRaises(ObjectNotModified, self.storage.retrieve,
+                          test_key, mtime=time.time() + 60)
+        blob, metadata = self.storage.retrieve(test_key, mtime=0)
+        self.assertEqual(blob, six.b('test_blob'))
+        # etag is not checked by disk storage
+        blob, metadata = self.storage.retrieve(test_key, etag='etag')
+        self.assertEqual(blob, six.b('test_blob'))
+
+    def test_multi(self):
+        keys = list(os.path.join(self.root, 'key%d' % i) for i in range(3))
+        self.storage.store_multi((key, six.b(key), dict()) for key in keys)
+
+        self.assertListEqual(self.storage.exists_multi(keys + [self.root +
+                                                               'nonexist']),
+                             [True, True, True, False])
+        blob, metadata = self.storage.retrieve_multi(keys[1:2])[0]
+        self.assertEqual(blob, six.b(keys[1]))
+
+        self.storage.retire_multi(keys)
+        self.assertListEqual(self.storage.exists_multi(keys),
+                             [False, False, False])
+
     def tearDown(self):
         shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,52 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import threading
+import unittest
+
+from stonemason.storage.backends import registry
+from stonemason.storage.backends.s3 import S3Storage
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        registry.clear()
+
+    def tearDown(self):
+        registry.clear()
+
+    def test_s3_client(self):
+        client = registry.get_s3_client('key', 'secret')
+        self.assertIs(registry.get_s3_client('key', 'secret'), client)
+        self.assertIsNot(registry.get_s3_client('key', 'another'), client)
+        self.assertIsNot(registry.get_s3_client('key', 'secret',
+                                                max_pool_connections=20),
+                         client)
+
+        # storages of different buckets share the client
+        storage1 = S3Storage('key', 'secret', bucket='bucket1')
+        storage2 = S3Storage('key', 'secret', bucket='bucket2')
+        self.assertIs(storage1._client, client)
+        self.assertIs(storage2._client, client)
+
+        registry.clear()
+        self.assertIsNot(registry.get_s3_client('key', 'secret'), client)
+
+    def test_http_session(self):
+        session = registry.get_http_session()
+        self.assertIs(registry.get_http_session(), session)
+        self.assertIsNot(registry.get_http_session(pool_size=20), session)
+
+        # each thread has its own session
+        sessions = list()
+        thread = threading.Thread(
+            target=lambda: sessions.append(registry.get_http_session()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(sessions[0], session)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,10 +3,14 @@
 __author__ = 'ray'
 __date__ = '10/27/15'
 
+import time
 import unittest
 import six
 import moto
 import boto3
+import requests
+from stonemason.storage.concept import ObjectNotModified, \
+    PersistentStorageError
 from stonemason.storage.backends.s3 import S3Storage, S3HttpStorage
 
 TEST_BUCKET_NAME = 'tilestorage'
@@ -39,6 +43,9 @@ class TestS3Storage(unittest.TestCase):
 
         self.assertEqual(test_blob, blob)
         self.assertIn('LastModified', metadata)
+        # seconds since epoch in utc regardless of local timezone
+        self.assertAlmostEqual(metadata['LastModified'], time.time(),
+                               delta=300)
 
         self.storage.retire(test_key)
 
@@ -70,8 +77,79 @@ class TestS3Storage(unittest.TestCase):
 
         self.assertFalse(self.storage.exists(test_key))
 
+    def test_list_keys(self):
+        test_keys = ['test/a/key1.png', 'test/a/key2.png', 'test/ab/key3.png']
+        for test_key in test_keys:
+            self.storage.store(test_key, six.b('test_blob'), dict())
+
+        self.assertListEqual(sorted(self.storage.list_keys('test/a/')),
+                             test_keys[:2])
+        self.assertListEqual(sorted(self.storage.list_keys('test/a')),
+                             test_keys)
+        self.assertListEqual(list(self.storage.list_keys('test/c/')), [])
+
+        for test_key in test_keys:
+            self.storage.retire(test_key)
+
+    def test_retrieve_missing(self):
+        self.assertEqual(self.storage.retrieve('test/nonexist.png'),
+                         (None, None))
+
+    def test_conditional_retrieve(self):
+        test_key = 'test_key.png'
+        self.storage.store(test_key, six.b('test_blob'), dict())
+        blob, metadata = self.storage.retrieve(test_key)
+        self.assertIn('ETag', metadata)
+
+        self.assertRaises(ObjectNotModified, self.storage.retrieve,
+                          test_key, etag=metadata['ETag'])
+        self.assertRaises(ObjectNotModified, self.storage.retrieve,
+                          test_key, mtime=time.time() + 3600)
+
+        blob, _ = self.storage.retrieve(test_key, etag='0' * 32)
+        self.assertEqual(blob, six.b('test_blob'))
+        blob, _ = self.storage.retrieve(test_key, mtime=0)
+        self.assertEqual(blob, six.b('test_blob'))
+
+        self.storage.retire(test_key)
+
+    def test_multi(self):
+        test_keys = ['test/key%d.png' % i for i in range(20)]
+        self.storage.store_multi(
+            (key, six.b(key), dict(test_meta='test_value'))
+            for key in test_keys)
+
+        self.assertListEqual(
+            self.storage.exists_multi(test_keys + ['test/nonexist.png']),
+            [True] * 20 + [False])
+
+        results = self.storage.retrieve_multi(test_keys[:2] +
+                                              ['test/nonexist.png'])
+        self.assertEqual(results[0][0], six.b(test_keys[0]))
+        self.assertEqual(results[1][0], six.b(test_keys[1]))
+        self.assertEqual(results[1][1]['test_meta'], 'test_value')
+        self.assertEqual(results[2], (None, None))
+
+        self.storage.retire_multi(test_keys)
+        self.assertListEqual(list(self.storage.list_keys('test/')), [])
+
+    def tearDown(self):
+        self.storage.close()
+
+
+class TestS3StorageWithMock(TestS3Storage):
+    def setUp(self):
+        self.mock = moto.mock_s3()
+        self.mock.start()
+
+        s3 = boto3.resource('s3')
+        s3.Bucket(TEST_BUCKET_NAME).create()
+
+        self.storage = S3Storage(bucket=TEST_BUCKET_NAME)
+
     def tearDown(self):
         self.storage.close()
+        self.mock.stop()
 
 
 class TestS3StorageWithMock(TestS3Storage):
@@ -102,3 +180,85 @@ class TestS3HttpStorageWithMock(TestS3Storage):
     def tearDown(self):
         self.storage.close()
         self.mock.stop()
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode('utf-8')
+        self.headers = headers or dict()
+
+
+class FakeSession(object):
+    """Answers requests with given responses or exceptions in order."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = list()
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def close(self):
+        pass
+
+
+class TestS3HttpStorageRequest(unittest.TestCase):
+    def create_storage(self, *responses, **options):
+        options.setdefault('backoff', 0)
+        storage = S3HttpStorage(bucket=TEST_BUCKET_NAME, **options)
+        session = FakeSession(*responses)
+        storage._get_session = lambda: session
+        self.session = session
+        return storage
+
+    def test_retry(self):
+        storage = self.create_storage(
+            FakeResponse(503),
+            requests.ConnectionError('reset'),
+            requests.Timeout('timeout'),
+            FakeResponse(200, b'blob'))
+        blob, metadata = storage.retrieve('key.png')
+        self.assertEqual(blob, b'blob')
+        self.assertEqual(len(self.session.requests), 4)
+        for _, _, kwargs in self.session.requests:
+            self.assertEqual(kwargs['timeout'], (5., 30.))
+
+    def test_retry_exhausted(self):
+        storage = self.create_storage(FakeResponse(500), FakeResponse(500),
+                                      retries='1')
+        self.assertRaises(PersistentStorageError, storage.store,
+                          'key.png', b'blob', dict())
+        self.assertEqual(len(self.session.requests), 2)
+
+        storage = self.create_storage(requests.Timeout(), retries=0)
+        self.assertRaises(PersistentStorageError, storage.exists, 'key.png')
+
+    def test_no_retry(self):
+        storage = self.create_storage(FakeResponse(404))
+        self.assertEqual(storage.retrieve('key.png'), (None, None))
+        self.assertEqual(len(self.session.requests), 1)
+
+    def test_endpoint(self):
+        storage = self.create_storage(FakeResponse(200),
+                                      connect_timeout='1',
+                                      read_timeout='2')
+        storage.exists('a/key.png')
+        method, url, kwargs = self.session.requests[0]
+        self.assertEqual(method, 'HEAD')
+        self.assertEqual(url,
+                         'http://tilestorage.s3.amazonaws.com/a/key.png')
+        self.assertEqual(kwargs['timeout'], (1., 2.))
+
+        storage = self.create_storage(FakeResponse(200),
+                                      scheme='https',
+                                      endpoint='localhost:9000',
+                                      virtual_host='false')
+        storage.exists('a/key.png')
+        self.assertEqual(self.session.requests[0][1],
+                         'https://localhost:9000/tilestorage/a/key.png')
@@ -8,6 +8,7 @@ import tempfile
 import unittest
 import shutil
 from osgeo import gdal
+from stonemason.pyramid.geo import Envelope
 from stonemason.storage.featurestorage import create_feature_storage, \
     ReadOnlyFeatureStorage
 from tests import DATA_DIRECTORY
@@ -51,3 +52,20 @@ class TestDiskRasterFeatureStorage(unittest.TestCase):
         test_envelope = (138.6958690, 35.3309600, 138.7655640, 35.3989940)
         expected_key = storage.intersection(test_envelope)
         self.assertEqual(expected_key, [self.test_key])
+
+    def test_coverage(self):
+        conn_string = 'raster+disk://%s?indexname=%s' % (
+            os.path.join(self.root, 'raster'), 'index_5m.shp')
+        storage = create_feature_storage(conn_string)
+
+        coverage = storage.coverage()
+        self.assertIsNotNone(coverage.GetSpatialReference())
+
+        test_envelope = (138.6958690, 35.3309600, 138.7655640, 35.3989940)
+        test_geometry = Envelope(*test_envelope).to_geometry(storage.crs)
+        self.assertTrue(coverage.Intersects(test_geometry))
+
+        test_geometry = Envelope(0, 0, 1, 1).to_geometry(storage.crs)
+        self.assertFalse(coverage.Intersects(test_geometry))
+
+        storage.close()
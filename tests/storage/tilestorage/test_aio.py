@@ -0,0 +1,130 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import sys
+import time
+import unittest
+import shutil
+import tempfile
+
+if sys.version_info < (3, 5):
+    raise unittest.SkipTest('asyncio storages require python 3.5')
+
+import asyncio
+
+from stonemason.pyramid import MetaTile, MetaTileIndex, Pyramid
+from stonemason.formatbundle import MapType, TileFormat, FormatBundle
+from stonemason.storage.concept import ObjectNotModified
+from stonemason.storage.tilestorage import DiskMetaTileStorage, \
+    InvalidMetaTileIndex, ReadOnlyMetaTileStorage
+from stonemason.storage.tilestorage.aio import AsyncDiskMetaTileStorage
+from tests import DATA_DIRECTORY
+
+
+class TestAsyncDiskMetaTileStorage(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.loop = asyncio.new_event_loop()
+        self.pyramid = Pyramid(stride=8)
+        grid_image = os.path.join(DATA_DIRECTORY,
+                                  'grid_crop', 'grid.png')
+        self.metatile = MetaTile(MetaTileIndex(19, 453824, 212288, 8),
+                                 data=open(grid_image, 'rb').read(),
+                                 mimetype='image/png')
+        self.format = FormatBundle(MapType('image'), TileFormat('PNG'))
+        self.storage = AsyncDiskMetaTileStorage(
+            levels=self.pyramid.levels,
+            stride=self.pyramid.stride,
+            root=self.root,
+            format=self.format,
+            dir_mode='simple')
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_basic(self):
+        storage = self.storage
+        self.run_async(storage.put(self.metatile))
+
+        metatile = self.run_async(storage.get(self.metatile.index))
+        self.assertIsInstance(metatile, MetaTile)
+        self.assertEqual(metatile.index, self.metatile.index)
+        self.assertEqual(metatile.etag, self.metatile.etag)
+        self.assertTrue(self.run_async(storage.has(self.metatile.index)))
+        self.assertRaises(ObjectNotModified, self.run_async,
+                          storage.get(self.metatile.index,
+                                      mtime=time.time() + 60))
+
+        self.run_async(storage.retire(self.metatile.index))
+        self.assertIsNone(self.run_async(storage.get(self.metatile.index)))
+        self.assertFalse(self.run_async(storage.has(self.metatile.index)))
+
+        self.assertListEqual(self.pyramid.levels, storage.levels)
+        self.assertEqual(self.pyramid.stride, storage.stride)
+
+    def test_compatible(self):
+        # same layout as the blocking storage
+        storage = DiskMetaTileStorage(
+            levels=self.pyramid.levels,
+            stride=self.pyramid.stride,
+            root=self.root,
+            format=self.format,
+            dir_mode='simple')
+        storage.put(self.metatile)
+
+        metatile = self.run_async(self.storage.get(self.metatile.index))
+        self.assertEqual(metatile.data, self.metatile.data)
+
+    def test_multi(self):
+        storage = self.storage
+        metatiles = list(MetaTile(MetaTileIndex(10, x, 0, 8),
+                                  data=self.metatile.data,
+                                  mimetype='image/png')
+                         for x in range(0, 64, 8))
+        indexes = list(metatile.index for metatile in metatiles)
+        missing = MetaTileIndex(10, 64, 0, 8)
+
+        self.run_async(storage.put_multi(metatiles))
+        self.assertListEqual(
+            self.run_async(storage.has_multi(indexes + [missing])),
+            [True] * len(indexes) + [False])
+
+        results = self.run_async(storage.get_multi(indexes + [missing]))
+        self.assertListEqual(list(r.index for r in results[:-1]), indexes)
+        self.assertIsNone(results[-1])
+
+        self.assertSetEqual(set(self.run_async(storage.list_indexes(10))),
+                            set(indexes))
+
+        self.run_async(storage.retire_multi(indexes))
+        self.assertFalse(any(self.run_async(storage.has_multi(indexes))))
+
+    def test_putfail(self):
+        self.assertRaises(InvalidMetaTileIndex, self.run_async,
+                          self.storage.put(
+                              MetaTile(MetaTileIndex(100, 4, 5, 8))))
+
+    def test_readonly(self):
+        storage = AsyncDiskMetaTileStorage(
+            levels=self.pyramid.levels,
+            stride=self.pyramid.stride,
+            root=self.root,
+            format=self.format,
+            readonly=True)
+        self.assertRaises(ReadOnlyMetaTileStorage, self.run_async,
+                          storage.put(self.metatile))
+        self.assertRaises(ReadOnlyMetaTileStorage, self.run_async,
+                          storage.retire_multi([self.metatile.index]))
+        self.run_async(storage.close())
+
+    def tearDown(self):
+        self.run_async(self.storage.close())
+        self.loop.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -42,6 +42,7 @@ class TestClusterfier(unittest.TestCase):
         self.assertIsInstance(cluster, TileCluster)
         self.assertTrue(storage.has(self.metatile.index))
         self.assertEqual(metatile.index, cluster.index)
+        self.assertEqual(metatile.etag, cluster.etag)
 
         cluster_storage.retire(self.metatile.index)
         self.assertIsNone(cluster_storage.get(self.metatile.index))
@@ -52,6 +53,26 @@ class TestClusterfier(unittest.TestCase):
 
         cluster_storage.close()
 
+    def test_multi(self):
+        storage = DiskMetaTileStorage(
+            levels=self.pyramid.levels,
+            stride=self.pyramid.stride,
+            root=self.root,
+            format=self.format)
+        cluster_storage = Clusterfier(storage, self.format.writer)
+        missing = MetaTileIndex(19, 0, 8, 8)
+
+        cluster_storage.put_multi([self.metatile])
+        self.assertListEqual(
+            cluster_storage.has_multi([self.metatile.index, missing]),
+            [True, False])
+        clusters = cluster_storage.get_multi([self.metatile.index, missing])
+        self.assertIsInstance(clusters[0], TileCluster)
+        self.assertIsNone(clusters[1])
+
+        cluster_storage.retire_multi([self.metatile.index])
+        self.assertFalse(storage.has(self.metatile.index))
+
     def tearDown(self):
         shutil.rmtree(self.root, ignore_errors=True)
 
@@ -4,11 +4,13 @@ __author__ = 'kotaimen'
 __date__ = '1/27/15'
 
 import os
+import time
 import unittest
 import shutil
 import tempfile
 from stonemason.pyramid import MetaTile, MetaTileIndex, Pyramid, TileCluster
 from stonemason.formatbundle import MapType, TileFormat, FormatBundle
+from stonemason.storage.concept import ObjectNotModified
 from stonemason.storage.tilestorage import DiskClusterStorage, \
     DiskMetaTileStorage, \
     InvalidMetaTile, InvalidMetaTileIndex, ReadOnlyMetaTileStorage
@@ -146,6 +148,8 @@ class TestDiskMetaTileStorage(unittest.TestCase):
         self.assertEqual(metatile.mimetype, self.metatile.mimetype)
 
         self.assertTrue(storage.has(self.metatile.index))
+        self.assertRaises(ObjectNotModified, storage.get,
+                          self.metatile.index, mtime=time.time() + 60)
         storage.retire(self.metatile.index)
         self.assertIsNone(storage.get(self.metatile.index))
         self.assertFalse(storage.has(self.metatile.index))
@@ -181,6 +185,63 @@ class TestDiskMetaTileStorage(unittest.TestCase):
                                                     '19', '453824', '212288',
                                                     '19-453824-212288@8.dat')))
 
+    def test_list_indexes(self):
+        indexes = [MetaTileIndex(19, 453824, 212288, 8),
+                   MetaTileIndex(19, 0, 8, 8),
+                   MetaTileIndex(1, 0, 0, 2),
+                   MetaTileIndex(10, 0, 0, 8)]
+
+        for dir_mode in ['simple', 'legacy', 'hilbert']:
+            root = os.path.join(self.root, dir_mode)
+            storage = DiskMetaTileStorage(
+                levels=self.pyramid.levels,
+                stride=self.pyramid.stride,
+                root=root,
+                format=self.format,
+                dir_mode=dir_mode)
+            for index in indexes:
+                storage.put(MetaTile(index, data=self.metatile.data,
+                                     mimetype='image/png'))
+            # not a metatile
+            with open(os.path.join(root, '1', 'readme.txt')
+                      if dir_mode == 'simple'
+                      else os.path.join(root, '01', 'readme.txt'), 'w'):
+                pass
+
+            self.assertListEqual(sorted(storage.list_indexes(19)),
+                                 sorted(indexes[:2]))
+            self.assertListEqual(list(storage.list_indexes(1)),
+                                 [MetaTileIndex(1, 0, 0, 2)])
+            self.assertListEqual(list(storage.list_indexes(10)),
+                                 [MetaTileIndex(10, 0, 0, 8)])
+            self.assertListEqual(list(storage.list_indexes(5)), [])
+
+    def test_multi(self):
+        storage = DiskMetaTileStorage(
+            levels=self.pyramid.levels,
+            stride=self.pyramid.stride,
+            root=self.root,
+            format=self.format)
+        indexes = [MetaTileIndex(19, 453824, 212288, 8),
+                   MetaTileIndex(19, 0, 8, 8),
+                   MetaTileIndex(10, 0, 0, 8)]
+        storage.put_multi(MetaTile(index, data=self.metatile.data,
+                                   mimetype='image/png')
+                          for index in indexes[:2])
+
+        self.assertListEqual(storage.has_multi(indexes), [True, True, False])
+        metatiles = storage.get_multi(indexes)
+        self.assertListEqual(list(metatile.index for metatile in
+                                  metatiles[:2]), indexes[:2])
+        self.assertIsNone(metatiles[2])
+
+        storage.retire_multi(indexes)
+        self.assertListEqual(storage.has_multi(indexes),
+                             [False, False, False])
+
+        self.assertRaises(InvalidMetaTileIndex, storage.put_multi,
+                          [MetaTile(MetaTileIndex(100, 4, 5, 8))])
+
     def tearDown(self):
         shutil.rmtree(self.root, ignore_errors=True)
 
@@ -11,6 +11,7 @@ import boto3
 
 from stonemason.pyramid import MetaTile, MetaTileIndex, Pyramid, TileCluster
 from stonemason.formatbundle import MapType, TileFormat, FormatBundle
+from stonemason.storage.concept import ObjectNotModified
 from stonemason.storage.tilestorage import S3ClusterStorage, S3MetaTileStorage
 
 TEST_BUCKET_NAME = 'tilestorage'
@@ -61,6 +62,29 @@ class TestS3ClusterStorage(unittest.TestCase):
 
         storage.close()
 
+    def test_etag(self):
+        storage = S3ClusterStorage(bucket=TEST_BUCKET_NAME,
+                                   prefix='testlayer',
+                                   levels=self.pyramid.levels,
+                                   stride=self.pyramid.stride,
+                                   format=self.format,
+                                   compressed=True)
+        storage.put(self.metatile)
+
+        # etag of the stored zip file, not of the metatile data
+        cluster = storage.get(self.metatile.index)
+        self.assertIsNotNone(cluster.etag)
+        self.assertNotEqual(cluster.etag, self.metatile.etag)
+        self.assertRaises(ObjectNotModified, storage.get,
+                          self.metatile.index, etag=cluster.etag)
+
+        storage.put(self.metatile._replace(mtime=1.))
+        self.assertNotEqual(storage.get(self.metatile.index,
+                                        etag=cluster.etag).etag,
+                            cluster.etag)
+
+        storage.close()
+
     def test_keymode_simple(self):
         storage = S3ClusterStorage(bucket=TEST_BUCKET_NAME,
                                    prefix='testlayer',
@@ -135,6 +159,8 @@ class TestS3MetaTileStorage(unittest.TestCase):
         self.assertAlmostEqual(metatile.mtime, self.metatile.mtime, 0)
         self.assertEqual(metatile.etag, self.metatile.etag)
         self.assertEqual(metatile.mimetype, self.metatile.mimetype)
+        self.assertRaises(ObjectNotModified, storage.get,
+                          self.metatile.index, etag=metatile.etag)
 
         self.assertListEqual(self.pyramid.levels, storage.levels)
         self.assertEqual(self.pyramid.stride, storage.stride)
@@ -68,6 +68,14 @@ class TestMemTileCache(unittest.TestCase):
         self.cache.retire('layer', TileIndex(2, 2, 3))
         self.assertFalse(self.cache.has('layer', TileIndex(2, 2, 3)))
 
+    def test_retire_multi(self):
+        self.cache.put_multi('layer3', [Tile(TileIndex(2, 2, 3), b'tile1'),
+                                        Tile(TileIndex(2, 2, 2), b'tile2')])
+        self.cache.retire_multi('layer3', [TileIndex(2, 2, 3),
+                                           TileIndex(2, 2, 2)])
+        self.assertFalse(self.cache.has('layer3', TileIndex(2, 2, 3)))
+        self.assertFalse(self.cache.has('layer3', TileIndex(2, 2, 2)))
+
     def test_put_multi(self):
         tiles = [Tile(TileIndex(2, 2, 3), b'tile1', 'text/plain', 1.2),
                  Tile(TileIndex(3, 4, 5), b'tile2', 'text/plain', 1.2),
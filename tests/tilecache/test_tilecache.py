@@ -16,6 +16,7 @@ class TestNullTileCache(unittest.TestCase):
         self.assertIsNone(cache.get('tag', TileIndex(3, 4, 5)))
         self.assertFalse(cache.has('tag', TileIndex(3, 4, 5)))
         self.assertFalse(cache.has_all('tag', []))
+        self.assertIsNone(cache.retire_multi('tag', [TileIndex(3, 4, 5)]))
 
 
 
@@ -0,0 +1,63 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import io
+import os
+import unittest
+
+from PIL import Image
+
+from stonemason.util.postprocessing.downsample import downsample
+from tests import DATA_DIRECTORY, ImageTestCase
+
+
+class TestDownsample(ImageTestCase):
+    def setUp(self):
+        grid_image = os.path.join(DATA_DIRECTORY, 'grid_crop', 'grid.png')
+        self.grid_image = Image.open(grid_image)
+        self.grid_image.load()
+
+    def test_downsample(self):
+        # split into quarters then put them back
+        pieces = list()
+        for left in (0, 512):
+            for top in (0, 512):
+                quarter = self.grid_image.crop((left, top,
+                                                left + 512, top + 512))
+                buf = io.BytesIO()
+                quarter.save(buf, 'PNG')
+                pieces.append(((left, top), buf.getvalue()))
+
+        for resample in ['nearest', 'bilinear', 'lanczos']:
+            image = downsample(pieces, (512, 512), resample=resample)
+            self.assertEqual(image.size, (512, 512))
+            expected = self.grid_image.resize((512, 512),
+                                              getattr(Image, resample.upper()))
+            if image.mode != expected.mode:
+                expected = expected.convert(image.mode)
+            self.assertImageEqual(expected, image)
+
+    def test_missing_pieces(self):
+        red = Image.new('RGBA', (256, 256), (255, 0, 0, 255))
+        image = downsample([((256, 256), red)], (256, 256))
+        self.assertEqual(image.mode, 'RGBA')
+        self.assertEqual(image.getpixel((0, 0)), (0, 0, 0, 0))
+        self.assertEqual(image.getpixel((255, 255)), (255, 0, 0, 255))
+
+    def test_mixed_mode(self):
+        image = downsample([((0, 0), Image.new('RGB', (256, 256), 'red')),
+                            ((0, 256), Image.new('P', (256, 256)))],
+                           (256, 256))
+        self.assertEqual(image.mode, 'RGBA')
+        self.assertEqual(image.getpixel((0, 0)), (255, 0, 0, 255))
+
+    def test_invalid_resample(self):
+        red = Image.new('RGB', (256, 256), 'red')
+        self.assertRaises(ValueError, downsample, [((0, 0), red)],
+                          (256, 256), 'magic')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+# -*- encoding: utf-8 -*-
+
+__author__ = 'kotaimen'
+__date__ = '10/17/16'
+
+import os
+import unittest
+
+from stonemason.util.sysinfo import get_rss, get_cpu_times, get_memory
+
+
+class TestSysInfo(unittest.TestCase):
+    def test_get_rss(self):
+        rss = get_rss()
+        self.assertGreater(rss, 0)
+
+        # grows after allocating a large buffer
+        data = b'x' * (64 * 1048576)
+        self.assertGreater(get_rss(), rss + 32 * 1048576)
+        del data
+
+    @unittest.skipUnless(os.path.exists('/proc/stat'), 'requires procfs')
+    def test_get_cpu_times(self):
+        times = get_cpu_times()
+        self.assertGreater(times.total, 0)
+        self.assertLessEqual(times.busy + times.iowait, times.total)
+
+        # busy time never goes back
+        sum(range(1000000))
+        self.assertGreaterEqual(get_cpu_times().busy, times.busy)
+
+    @unittest.skipUnless(os.path.exists('/proc/meminfo'), 'requires procfs')
+    def test_get_memory(self):
+        available, total = get_memory()
+        self.assertGreater(available, 0)
+        self.assertLessEqual(available, total)
+
+
+if __name__ == '__main__':
+    unittest.main()
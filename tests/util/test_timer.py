@@ -8,7 +8,7 @@ import time
 import io
 import re
 
-from stonemason.util.timer import Timer, human_duration
+from stonemason.util.timer import Timer, StageTimer, human_duration
 
 
 class TestTimer(unittest.TestCase):
@@ -45,6 +45,23 @@ class TestTimer(unittest.TestCase):
         self.assertIsNotNone(
             re.match(r'Time taken: [01]\.\d+s', writer.message))
 
+    def test_stage_timer(self):
+        timer = StageTimer()
+        with timer.stage('render'):
+            time.sleep(0.05)
+        with timer.stage('store'):
+            pass
+        try:
+            with timer.stage('render'):
+                time.sleep(0.05)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertListEqual(list(timer.stages), ['render', 'store'])
+        self.assertGreaterEqual(timer.stages['render'], 0.09)
+        self.assertAlmostEqual(timer.get_time(), sum(timer.stages.values()))
+
 
 if __name__ == '__main__':
     unittest.main()